@@ -25,6 +25,12 @@ def create_app(config_name=None):
     jwt.init_app(app)
     CORS(app)
     
+    from app.services.agent_log_sink import agent_log_sink
+    agent_log_sink.init_app(app)
+    
+    from app.celery_app import celery_init_app
+    celery_init_app(app)
+    
     # Register blueprints
     from app.routes import auth, crops, fertilization, irrigation, disease, harvest, marketplace, dashboard, weather, soil
     
@@ -42,6 +48,17 @@ def create_app(config_name=None):
     from app.routes import agents
     app.register_blueprint(agents.bp, url_prefix='/api/v1/agent')
     
+    from app.services.scheduler import init_scheduler
+    init_scheduler(app)
+    
+    from app.services.dynamic_knowledge_service import KnowledgeFetchPending
+    
+    @app.errorhandler(KnowledgeFetchPending)
+    def knowledge_fetch_pending(e):
+        # The crop is being researched right now; the client should retry, not treat it as unknown
+        return {'status': 'pending', 'message': str(e), 'retry_after': e.retry_after}, 202, \
+            {'Retry-After': str(e.retry_after)}
+    
     # Health check endpoint
     @app.route('/health', methods=['GET'])
     def health_check():
@@ -1,7 +1,6 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
-from app import db
-from app.models import AgentLog
+from app.services.agent_log_sink import agent_log_sink
 import time
 
 class BaseAgent(ABC):
@@ -19,10 +18,10 @@ class BaseAgent(ABC):
     def log_execution(self, user_id: int = None, crop_id: int = None, 
                      action: str = None, input_data: dict = None, 
                      output_data: dict = None, status: str = 'success'):
-        """Log agent execution to database"""
+        """Hand the execution record to the background log sink"""
         execution_time = time.time() - self.execution_start if self.execution_start else 0
         
-        log = AgentLog(
+        agent_log_sink.submit(
             agent_type=self.agent_type,
             user_id=user_id,
             crop_id=crop_id,
@@ -32,19 +31,16 @@ class BaseAgent(ABC):
             status=status,
             execution_time=execution_time
         )
-        db.session.add(log)
-        try:
-            db.session.commit()
-        except Exception as e:
-            db.session.rollback()
-            print(f"Failed to log agent execution: {e}")
     
     def run(self, **kwargs) -> dict:
         """Wrapper to execute agent with logging"""
         self.execution_start = time.time()
         
+        # user_id/crop_id are only used for logging; execute() does not accept them
+        execute_kwargs = {k: v for k, v in kwargs.items() if k not in ('user_id', 'crop_id')}
+        
         try:
-            result = self.execute(**kwargs)
+            result = self.execute(**execute_kwargs)
             self.log_execution(
                 user_id=kwargs.get('user_id'),
                 crop_id=kwargs.get('crop_id'),
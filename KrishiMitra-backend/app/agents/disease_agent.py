@@ -1,5 +1,9 @@
 from app.agents.base_agent import BaseAgent
-from app.knowledge.crop_knowledge_base import get_crop_data
+from app.knowledge.crop_knowledge_base import CROP_DATABASE, get_crop_data
+from app.knowledge.crop_resolver import crop_resolver
+from app.knowledge.symptom_index import symptom_index
+from app.services.price_forecast import HORIZONS, price_forecast_service
+from app.services.price_history import price_history_service
 from datetime import datetime, timedelta
 
 class DiseaseDetectionAgent(BaseAgent):
@@ -38,30 +42,16 @@ class DiseaseDetectionAgent(BaseAgent):
                 "recommendation": "Consult agricultural expert for diagnosis"
             }
         
-        # Match symptoms to diseases
-        symptoms_lower = symptoms.lower()
-        disease_matches = []
-        
-        for disease_name, disease_info in diseases.items():
-            symptom_list = disease_info.get("symptoms", [])
-            
-            # Count matching symptoms
-            matches = 0
-            for symptom in symptom_list:
-                if any(word in symptoms_lower for word in symptom.lower().split()):
-                    matches += 1
-            
-            if matches > 0:
-                confidence = int((matches / len(symptom_list)) * 100)
-                disease_matches.append({
-                    "disease_key": disease_name,
-                    "disease_info": disease_info,
-                    "confidence": confidence,
-                    "matches": matches
-                })
-        
-        # Sort by confidence
-        disease_matches.sort(key=lambda x: x["confidence"], reverse=True)
+        # Index under the canonical crop id, so aliases ("Paddy", "तूर") are not indexed as extra crops
+        resolved = crop_resolver.resolve(crop_name)
+        crop_key = resolved.crop_id if resolved and CROP_DATABASE.get(resolved.crop_id) is crop_data \
+            else crop_name.lower().strip()
+        
+        # Match symptoms to diseases via the precompiled symptom index (best first)
+        disease_matches = [match for match in symptom_index.match(crop_key, symptoms, crop_data)
+                           if match["disease_key"] in diseases]
+        for match in disease_matches:
+            match["disease_info"] = diseases[match["disease_key"]]
         
         if not disease_matches:
             return {
@@ -297,20 +287,32 @@ class HarvestPredictionAgent(BaseAgent):
         }
 
 
+STORAGE_COST_PER_QUINTAL_MONTH = 75  # ₹, midpoint of the ₹50-100 quoted in risk_factors
+
+FORECAST_BASIS = {
+    'district': "district price history",
+    'state': "state price history",
+    'national': "national price history",
+    'seasonal_prior': "crop calendar seasonality (no stored price history)"
+}
+
+
 class PricePredictionAgent(BaseAgent):
-    """Rule-based Agent for predicting crop prices and suggesting selling strategy"""
+    """Agent for predicting crop prices from the seasonal price forecast and suggesting selling strategy"""
     
     def __init__(self):
         super().__init__('price_prediction_agent')
     
-    def execute(self, crop_name: str, harvest_date: str, current_price: float = None) -> dict:
+    def execute(self, crop_name: str, harvest_date: str, current_price: float = None,
+                state: str = None, district: str = None) -> dict:
         """
-        Predict future prices and recommend selling strategy using market calendar rules
+        Predict future prices and recommend selling strategy from the seasonal price forecast
         
         Args:
             crop_name: Name of crop
             harvest_date: Expected harvest date (YYYY-MM-DD)
             current_price: Current market price (optional)
+            state, district: Farmer's region, for regional price history (optional)
         
         Returns:
             Price predictions and selling strategy
@@ -328,12 +330,12 @@ class PricePredictionAgent(BaseAgent):
         avg_price = market_calendar.get("avg_price_per_quintal", 
                                         market_calendar.get("avg_price_per_ton", 3000))
         peak_price = market_calendar.get("price_variation", {}).get("peak", avg_price * 1.1)
-        off_price = market_calendar.get("price_variation", {}).get("off_season", avg_price * 0.9)
         peak_months = market_calendar.get("peak_demand_months", [])
         
-        # Use current price if provided, otherwise use average
+        # Use current price if provided, otherwise recent stored prices, otherwise the forecast's
         if current_price is None:
-            current_price = avg_price
+            recent = price_history_service.recent_price(crop_name, state=state)
+            current_price = recent['price'] if recent else None
         
         # Parse harvest date
         try:
@@ -345,61 +347,53 @@ class PricePredictionAgent(BaseAgent):
         harvest_month = harvest_dt.month
         in_peak_season = harvest_month in peak_months
         
-        # Price trend based on season
-        if in_peak_season:
-            trend = "stable_to_rising"
-            trend_analysis = f"Harvest in peak demand season ({harvest_dt.strftime('%B')})"
-        else:
+        # Forecast at harvest and 1 week, 2 weeks and 1 month after it
+        one_week_date = harvest_dt + timedelta(days=HORIZONS['1_week'])
+        two_week_date = harvest_dt + timedelta(days=HORIZONS['2_weeks'])
+        one_month_date = harvest_dt + timedelta(days=HORIZONS['1_month'])
+        forecast = price_forecast_service.forecast(
+            crop_name,
+            [harvest_dt.date(), one_week_date.date(), two_week_date.date(), one_month_date.date()],
+            current_price=current_price, average_price=avg_price, state=state, district=district,
+            crop_data=crop_data
+        )
+        current_price = current_price or forecast["current_price"]
+        harvest_price, one_week_price, two_week_price, one_month_price = forecast["prices"]
+        _, one_week_confidence, two_week_confidence, one_month_confidence = forecast["confidence"]
+        
+        # Price trend after harvest
+        month_change = (one_month_price - harvest_price) / harvest_price * 100
+        if month_change > 2:
+            trend = "rising"
+        elif month_change < -2:
             trend = "falling"
-            trend_analysis = "Harvest outside peak demand period"
-        
-        # Generate price predictions
-        # 1 week prediction
-        one_week_date = harvest_dt + timedelta(days=7)
-        one_week_month = one_week_date.month
-        if one_week_month in peak_months:
-            one_week_price = current_price * 1.03
         else:
-            one_week_price = current_price * 0.98
-        
-        # 2 weeks prediction
-        two_week_date = harvest_dt + timedelta(days=14)
-        two_week_month = two_week_date.month
-        if two_week_month in peak_months:
-            two_week_price = current_price * 1.08
-        else:
-            two_week_price = current_price * 0.95
-        
-        # 1 month prediction
-        one_month_date = harvest_dt + timedelta(days=30)
-        one_month_month = one_month_date.month
-        if one_month_month in peak_months:
-            one_month_price = current_price * 1.12
-        else:
-            one_month_price = current_price * 0.92
-        
-        # Selling strategy
-        if in_peak_season:
+            trend = "stable"
+        season_note = "peak demand season" if in_peak_season else "outside peak demand period"
+        trend_analysis = f"Harvest {season_note} ({harvest_dt.strftime('%B')}); prices {trend} in the month after"
+        
+        # Selling strategy: best forecast price net of storage
+        options = [
+            (harvest_price, harvest_dt, 0),
+            (one_week_price, one_week_date, HORIZONS['1_week']),
+            (two_week_price, two_week_date, HORIZONS['2_weeks']),
+            (one_month_price, one_month_date, HORIZONS['1_month'])
+        ]
+        best_price, best_date, best_days = max(
+            options, key=lambda option: option[0] - STORAGE_COST_PER_QUINTAL_MONTH * option[2] / 30
+        )
+        optimal_date = best_date.strftime("%Y-%m-%d")
+        expected_price = int(best_price)
+        if best_days == 0:
+            recommendation = "Sell immediately"
+            reasoning = "Prices not expected to rise enough after harvest to cover storage costs."
+        elif best_days <= HORIZONS['1_week']:
             recommendation = "Sell within 1-2 weeks"
-            optimal_date = (harvest_dt + timedelta(days=7)).strftime("%Y-%m-%d")
-            expected_price = int(one_week_price)
-            reasoning = f"Peak demand season. Prices favorable now."
+            reasoning = f"Prices expected to peak about a week after harvest ({season_note})."
         else:
-            # Check if peak season is approaching
-            months_to_peak = min([abs(month - harvest_month) if abs(month - harvest_month) <= 6 
-                                 else 12 - abs(month - harvest_month) 
-                                 for month in peak_months])
-            
-            if months_to_peak <= 2:
-                recommendation = "Hold for 2-4 weeks for peak season"
-                optimal_date = one_month_date.strftime("%Y-%m-%d")
-                expected_price = int(peak_price)
-                reasoning = f"Peak season approaching in {months_to_peak} month(s). Hold for better prices."
-            else:
-                recommendation = "Sell immediately"
-                optimal_date = harvest_dt.strftime("%Y-%m-%d")
-                expected_price = int(current_price)
-                reasoning = "Peak season distant. Avoid storage costs."
+            recommendation = "Hold for 2-4 weeks"
+            reasoning = (f"Prices expected to rise {round((best_price - harvest_price) / harvest_price * 100, 1)}% "
+                         f"by {optimal_date}. Hold for better prices.")
         
         potential_gain = expected_price - current_price
         
@@ -407,23 +401,24 @@ class PricePredictionAgent(BaseAgent):
             "current_price_analysis": {
                 "current_price_per_quintal": int(current_price),
                 "market_status": "Peak season" if in_peak_season else "Off-season",
-                "trend": trend
+                "trend": trend,
+                "trend_analysis": trend_analysis
             },
             "price_predictions": {
                 "1_week": {
                     "price": int(one_week_price),
                     "change_percent": round(((one_week_price - current_price) / current_price) * 100, 1),
-                    "confidence": 80
+                    "confidence": one_week_confidence
                 },
                 "2_weeks": {
                     "price": int(two_week_price),
                     "change_percent": round(((two_week_price - current_price) / current_price) * 100, 1),
-                    "confidence": 70
+                    "confidence": two_week_confidence
                 },
                 "1_month": {
                     "price": int(one_month_price),
                     "change_percent": round(((one_month_price - current_price) / current_price) * 100, 1),
-                    "confidence": 60
+                    "confidence": one_month_confidence
                 }
             },
             "selling_strategy": {
@@ -437,6 +432,7 @@ class PricePredictionAgent(BaseAgent):
                 f"Peak demand months: {', '.join([datetime(2026, m, 1).strftime('%B') for m in peak_months])}",
                 f"Average market price: ₹{int(avg_price)}/quintal",
                 f"Peak season price: ₹{int(peak_price)}/quintal",
+                f"Forecast from {FORECAST_BASIS[forecast['basis']]}",
                 "Store in proper conditions to avoid quality deterioration"
             ],
             "risk_factors": [
@@ -468,5 +464,5 @@ class PricePredictionAgent(BaseAgent):
                 "FPO/Cooperative societies",
                 "Direct to food processors/mills"
             ],
-            "analysis_method": "rule_based_knowledge_base"
+            "analysis_method": "seasonal_price_forecast"
         }
@@ -221,6 +221,14 @@ class IrrigationAgent(BaseAgent):
                 location['longitude']
         )
         
+        return self.evaluate_daily_rules(crop_name, weather)
+    
+    def evaluate_daily_rules(self, crop_name: str, weather: dict) -> dict:
+        """
+        Apply the daily irrigation rules to an already-fetched weather analysis,
+        so a batch sweep can reuse one forecast for every crop in a region.
+        Returns alert dict if action is needed.
+        """
         rain_predicted = weather.get('rain_expected_24h', False)
         rainfall_mm = weather.get('total_rainfall_mm', 0)
         
@@ -1,7 +1,14 @@
 from app.agents.base_agent import BaseAgent
 from app.knowledge.crop_knowledge_base import get_crop_data
+from app.services.data_gov_service import data_gov_service
+from app.services.mandi_locator import mandi_locator
+from app.services.price_history import price_history_service
+from app.utils.geo import haversine_km
+from app.config import Config
 from typing import List, Dict
-import math
+import logging
+
+logger = logging.getLogger(__name__)
 
 class PriceAnalysisAgent(BaseAgent):
     """Rule-based Agent for analyzing market prices and providing selling recommendations"""
@@ -15,7 +22,8 @@ class PriceAnalysisAgent(BaseAgent):
         
         Args:
             crop_name: Name of crop to analyze
-            markets: List of market data [{name, price, location: {lat, lon}}]
+            markets: List of market data [{name, price, location: {lat, lon}}];
+                when empty, live prices at mandis near user_location are used
             user_location: {latitude, longitude, location_name}
         
         Returns:
@@ -34,18 +42,26 @@ class PriceAnalysisAgent(BaseAgent):
         avg_price = market_calendar.get("avg_price_per_quintal", 
                                         market_calendar.get("avg_price_per_ton", 3000))
         
-        # Calculate distances and analyze markets
+        # Prefer the real average of the last month's stored prices
+        recent = price_history_service.recent_price(crop_name, days=30)
+        if recent:
+            avg_price = recent['price']
+        
+        if not markets and user_location.get('latitude') and user_location.get('longitude'):
+            markets = self._nearby_markets(crop_name, user_location)
+        
+        # Calculate distances to all markets at once and analyze markets
+        distances = haversine_km(
+            float(user_location['latitude']),
+            float(user_location['longitude']),
+            [market['location']['latitude'] for market in markets],
+            [market['location']['longitude'] for market in markets]
+        )
+        
         market_analysis = []
-        for market in markets:
-            distance = self._calculate_distance(
-                user_location['latitude'],
-                user_location['longitude'],
-                market['location']['latitude'],
-                market['location']['longitude']
-            )
-            
-            # Calculate transport cost (₹5 per km per quintal as baseline)
-            transport_cost_per_quintal = distance * 5
+        for market, distance in zip(markets, distances.tolist()):
+            # Calculate transport cost (₹ per km per quintal, ₹5 baseline)
+            transport_cost_per_quintal = distance * Config.TRANSPORT_COST_PER_KM_QUINTAL
             
             # Net price after transport
             net_price = market['price'] - transport_cost_per_quintal
@@ -183,23 +199,24 @@ class PriceAnalysisAgent(BaseAgent):
             "analysis_method": "rule_based_knowledge_base"
         }
     
-    def _calculate_distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-        """Calculate distance between two points using Haversine formula"""
-        # Earth radius in kilometers
-        R = 6371
-        
-        # Convert to radians
-        lat1_rad = math.radians(lat1)
-        lat2_rad = math.radians(lat2)
-        delta_lat = math.radians(lat2 - lat1)
-        delta_lon = math.radians(lon2 - lon1)
-        
-        # Haversine formula
-        a = math.sin(delta_lat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lon/2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        distance = R * c
-        
-        return distance
+    def _nearby_markets(self, crop_name: str, user_location: dict, limit: int = 20) -> list:
+        """Live AGMARKNET prices at gazetteer mandis near the farmer, one entry per market"""
+        try:
+            rows = mandi_locator.rank_markets(data_gov_service.get_store(), float(user_location['latitude']),
+                                              float(user_location['longitude']), commodities=[crop_name],
+                                              limit=limit * 3)
+        except Exception as e:
+            logger.warning(f"Nearby market lookup failed: {e}")
+            return []
+        
+        markets = {}
+        for row in rows:  # Best net price first, so the first row per market wins
+            markets.setdefault((row['state'], row['market']), {
+                'name': row['market'],
+                'price': row['modal_price'],
+                'location': {'latitude': row['latitude'], 'longitude': row['longitude']}
+            })
+        return list(markets.values())[:limit]
 
 # Instantiate the agent
 price_analysis_agent = PriceAnalysisAgent()
@@ -0,0 +1,21 @@
+"""
+Celery integration - background workers share the Flask app's config and
+run every task inside an application context
+"""
+
+from celery import Celery, Task
+
+
+def celery_init_app(app) -> Celery:
+    """Create the Celery app for a Flask app and register it as the default"""
+    
+    class FlaskTask(Task):
+        def __call__(self, *args, **kwargs):
+            with app.app_context():
+                return self.run(*args, **kwargs)
+    
+    celery_app = Celery(app.name, task_cls=FlaskTask)
+    celery_app.config_from_object(app.config['CELERY'])
+    celery_app.set_default()
+    app.extensions['celery'] = celery_app
+    return celery_app
@@ -11,6 +11,9 @@ from app.knowledge.crop_knowledge_base import (
     get_fertilizer_price,
     calculate_days_from_stage
 )
+from app.knowledge.symptom_index import symptom_index
+from app.knowledge.suitability_matrix import suitability_matrix
+from app.knowledge.crop_resolver import crop_resolver
 
 __all__ = [
     'CROP_DATABASE',
@@ -21,5 +24,8 @@ __all__ = [
     'is_npk_in_range',
     'is_season_suitable',
     'get_fertilizer_price',
-    'calculate_days_from_stage'
+    'calculate_days_from_stage',
+    'symptom_index',
+    'suitability_matrix',
+    'crop_resolver'
 ]
@@ -0,0 +1,133 @@
+"""
+Commodity Aliases - Canonical crop ids for AGMARKNET commodity names,
+Marathi crop names and common spellings.
+
+AGMARKNET names follow "Name (Other Name)(Form)", e.g. "Arhar (Tur/Red
+Gram)(Whole)". An unlisted name is tried whole, then by its leading name,
+then by each bracketed name. So "Arhar (Tur/Red Gram)(Split)" still
+resolves to tur, while "Green Gram (Moong)(Whole)" does not become gram.
+
+Every commodity has a canonical id: the knowledge-base crop id when it
+names a crop, otherwise its normalized leading name ("Onion(Red)" ->
+"onion"). Joining prices to crops is then an exact dict lookup.
+
+Processed products (dal, milled rice) trade well above the farm-gate
+crop, so they get canonical ids of their own and never enter the crop's
+price series. They still resolve to their crop for knowledge lookups.
+AGMARKNET's "Rice" is milled rice, while the crop id "rice" means paddy.
+Row names therefore go through canonical_commodity and crop names being
+queried go through query_commodity.
+"""
+
+from app.knowledge import crop_knowledge_base as kb
+from functools import lru_cache
+from typing import Dict, Optional
+import re
+
+# crop id -> AGMARKNET commodity names and common spellings
+COMMODITY_ALIASES = {
+    'sugarcane': ('Sugarcane', 'Sugar Cane', 'Ganna'),
+    'cotton': ('Cotton', 'Kapas', 'Kapus', 'Kapas(Cotton)', 'Bt Cotton', 'Narma'),
+    'rice': ('Paddy', 'Paddy(Dhan)(Common)', 'Paddy(Dhan)(Basmati)', 'Dhan'),
+    'jowar': ('Jowar(Sorghum)', 'Jowar', 'Jwari', 'Jawar', 'Sorghum'),
+    'wheat': ('Wheat', 'Gehun', 'Gahu', 'Gehu'),
+    'tur': ('Arhar (Tur/Red Gram)(Whole)', 'Tur', 'Toor', 'Tuar', 'Arhar', 'Red Gram', 'Redgram',
+            'Pigeon Pea'),
+    'soybean': ('Soyabean', 'Soybean', 'Soya Bean', 'Soya', 'Soy'),
+    'groundnut': ('Groundnut', 'Groundnut pods (raw)', 'Groundnut (Split)', 'Ground Nut Seed',
+                  'Peanut', 'Mungfali', 'Bhuimug'),
+    'sunflower': ('Sunflower', 'Sunflower Seed', 'Surajmukhi', 'Suryaphul'),
+    'gram': ('Bengal Gram(Gram)(Whole)', 'Kabuli Chana(Chickpeas-White)', 'Gram', 'Bengal Gram', 'Chana',
+             'Chickpea', 'Chick Pea', 'Harbhara'),
+}
+
+# processed commodity id -> (crop id, AGMARKNET names and common spellings)
+PROCESSED_COMMODITIES = {
+    'tur dal': ('tur', ('Arhar Dal(Tur Dal)', 'Arhar Dal', 'Tur Dal', 'Toor Dal', 'Tuar Dal')),
+    'chana dal': ('gram', ('Bengal Gram Dal (Chana Dal)', 'Bengal Gram Dal', 'Chana Dal')),
+    'milled rice': ('rice', ('Rice', 'Basmati Rice', 'Tandul', 'Chawal')),
+}
+
+_BRACKETED = re.compile(r'\(([^()]*)\)')
+_SEPARATORS = re.compile(r'[()\[\]/,.&+_-]+')
+
+
+def normalize_commodity(name) -> str:
+    """'Arhar (Tur/Red Gram)(Whole)' -> 'arhar tur red gram whole' (Devanagari kept as is)"""
+    return ' '.join(_SEPARATORS.sub(' ', str(name or '').lower()).split())
+
+
+def _leading_name(name) -> str:
+    return normalize_commodity(str(name or '').split('(')[0])
+
+
+def _candidates(name) -> list:
+    """The whole name, its leading name, then each bracketed name"""
+    candidates = [normalize_commodity(name), _leading_name(name)]
+    return candidates + [normalize_commodity(part) for part in _BRACKETED.findall(str(name or ''))]
+
+
+def _crop_names() -> Dict[str, str]:
+    names = {}
+    for crop_id, crop_data in kb.CROP_DATABASE.items():
+        names[normalize_commodity(crop_id)] = crop_id
+        if crop_data.get('marathi_name'):
+            names[normalize_commodity(crop_data['marathi_name'])] = crop_id
+    return names
+
+
+# normalized crop id or Marathi name -> crop id
+CROP_NAMES = _crop_names()
+
+
+def _build_index() -> Dict[str, str]:
+    index = dict(CROP_NAMES)
+    for crop_id, aliases in COMMODITY_ALIASES.items():
+        for alias in aliases:
+            index.setdefault(normalize_commodity(alias), crop_id)
+    for crop_id, aliases in PROCESSED_COMMODITIES.values():
+        for alias in aliases:
+            index.setdefault(normalize_commodity(alias), crop_id)
+    return index
+
+
+# normalized alias -> crop id (processed products resolve to their crop)
+ALIAS_INDEX = _build_index()
+
+# normalized alias -> processed commodity id
+PROCESSED_INDEX = {normalize_commodity(alias): commodity_id
+                   for commodity_id, (_, aliases) in PROCESSED_COMMODITIES.items() for alias in aliases}
+
+
+@lru_cache(maxsize=4096)
+def resolve_crop(name) -> Optional[str]:
+    """Knowledge-base crop id for a commodity name or alias, or None"""
+    for candidate in _candidates(name):
+        if candidate in ALIAS_INDEX:
+            return ALIAS_INDEX[candidate]
+    return None
+
+
+@lru_cache(maxsize=4096)
+def canonical_commodity(name) -> str:
+    """
+    Price series id of an AGMARKNET commodity name: the processed commodity
+    id for processed products, the crop id for known crops, otherwise the
+    normalized leading name ('' for no name)
+    """
+    for candidate in _candidates(name):
+        if candidate in PROCESSED_INDEX:
+            return PROCESSED_INDEX[candidate]
+        if candidate in ALIAS_INDEX:
+            return ALIAS_INDEX[candidate]
+    return _leading_name(name) or normalize_commodity(name)
+
+
+@lru_cache(maxsize=4096)
+def query_commodity(name) -> str:
+    """
+    Price series id for a crop name being looked up. A crop id or Marathi
+    name means the farm-gate crop ('rice' is paddy, not milled rice); other
+    names are read as commodity names.
+    """
+    return CROP_NAMES.get(normalize_commodity(name)) or canonical_commodity(name)
@@ -6,6 +6,9 @@ Contains agricultural rules, schedules, and data for rule-based agent decisions
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
+# Bump whenever CROP_DATABASE changes so precompiled indexes are rebuilt
+KB_VERSION = 1
+
 # Top 10 Maharashtra crops agricultural knowledge base
 CROP_DATABASE = {
     "sugarcane": {
@@ -770,21 +773,44 @@ def get_crop_data(crop_name: str) -> Optional[Dict]:
     """
     Get complete crop data by name (case-insensitive)
     1. Check static database
-    2. Check dynamic knowledge service (search & store)
+    2. Resolve aliases and varieties of static crops
+    3. Check crops already stored by the dynamic knowledge service
+    4. Resolve misspellings of static crops
+    5. Fetch a new crop with the dynamic knowledge service (search & store)
+    
+    Raises KnowledgeFetchPending while another request is still fetching
+    the crop, so callers can answer "try again" rather than "not found".
     """
     crop_name_lower = crop_name.lower().strip()
     
     # 1. Check static DB
     if crop_name_lower in CROP_DATABASE:
         return CROP_DATABASE[crop_name_lower]
+    
+    # 2. Aliases and varieties of static crops ("Soyabean", "Tur dal", "तूर", "Paddy")
+    from app.knowledge.crop_resolver import crop_resolver
+    match = crop_resolver.resolve(crop_name, fuzzy=False)
+    if match:
+        return CROP_DATABASE[match.crop_id]
         
-    # 2. Check Dynamic Service
+    # 3-5. Check Dynamic Service; a learned crop wins over a fuzzy match
     try:
-        from app.services.dynamic_knowledge_service import dynamic_knowledge_service
-        return dynamic_knowledge_service.fetch_and_store(crop_name)
+        from app.services.dynamic_knowledge_service import KnowledgeFetchPending, dynamic_knowledge_service
     except ImportError:
         # Fallback if service not available (e.g. tests)
         return None
+    try:
+        stored = dynamic_knowledge_service.get_stored(crop_name)
+        if stored:
+            return stored
+        
+        match = crop_resolver.resolve(crop_name)
+        if match:
+            return CROP_DATABASE[match.crop_id]
+        
+        return dynamic_knowledge_service.fetch_and_store(crop_name)
+    except KnowledgeFetchPending:
+        raise
     except Exception as e:
         print(f"Error fetching dynamic data for {crop_name}: {e}")
         return None
@@ -812,53 +838,10 @@ def match_crop_to_soil(soil_npk: Dict[str, float], current_month: int = None) ->
     if current_month is None:
         current_month = datetime.now().month
     
-    results = []
-    
-    for crop_name, crop_data in CROP_DATABASE.items():
-        score = 0
-        reasons = []
-        
-        # NPK matching (40% weightage)
-        npk_req = crop_data["soil_requirements"]["npk_requirements"]
-        n_match = is_npk_in_range(soil_npk.get("nitrogen", 0), npk_req["nitrogen"])
-        p_match = is_npk_in_range(soil_npk.get("phosphorus", 0), npk_req["phosphorus"])
-        k_match = is_npk_in_range(soil_npk.get("potassium", 0), npk_req["potassium"])
-        
-        npk_score = (n_match + p_match + k_match) / 3 * 40
-        score += npk_score
-        
-        if npk_score > 30:
-            reasons.append(f"Good NPK match (Score: {npk_score:.0f}/40)")
-        
-        # Season matching (30% weightage)
-        season_match = is_season_suitable(crop_data["seasons"], current_month)
-        season_score = 30 if season_match else 10
-        score += season_score
-        
-        if season_match:
-            reasons.append("Suitable season for planting")
-        
-        # Market price (30% weightage) - higher price = better
-        avg_price = crop_data["market_calendar"].get("avg_price_per_quintal", crop_data["market_calendar"].get("avg_price_per_ton", 0))
-        market_score = min(30, (avg_price / 10000) * 30)  # Normalize
-        score += market_score
-        
-        if market_score > 20:
-            reasons.append(f"Good market price (₹{avg_price})")
-        
-        results.append({
-            "crop_name": crop_name,
-            "marathi_name": crop_data["marathi_name"],
-            "suitability_score": round(score, 1),
-            "reasons": reasons,
-            "expected_yield": crop_data["expected_yield"],
-            "duration_months": crop_data["duration_months"],
-            "avg_price": avg_price
-        })
-    
-    # Sort by suitability score
-    results.sort(key=lambda x: x["suitability_score"], reverse=True)
-    return results
+    # Scored against the precompiled suitability matrix (same rules as
+    # is_npk_in_range / is_season_suitable, vectorized over all crops)
+    from app.knowledge.suitability_matrix import suitability_matrix
+    return suitability_matrix.rank([soil_npk], [current_month])[0]
 
 
 def is_npk_in_range(value: float, req_range: Dict[str, float], tolerance: float = 0.15) -> float:
@@ -0,0 +1,171 @@
+"""
+Crop Resolver - Maps free-text crop names to knowledge-base crop ids, so
+spellings and aliases of known crops never reach the dynamic knowledge
+fetch (web search, scraping and an LLM call per new name).
+
+Exact lookups cover crop ids, Marathi names, AGMARKNET names and common
+spellings (commodity_aliases), and variety names. Anything else is matched
+fuzzily: a trigram index proposes candidate names and a normalized edit
+distance scores them. A fuzzy match is accepted only at MIN_CONFIDENCE or
+above, and only when it is clearly ahead of the best name of any other
+crop. Names of other crops that look like known ones (green gram vs red
+gram) are indexed too, so their near-misses resolve to nothing.
+"""
+
+from app.knowledge import crop_knowledge_base as kb
+from app.knowledge.commodity_aliases import ALIAS_INDEX, normalize_commodity, resolve_crop
+from collections import defaultdict
+from typing import Dict, NamedTuple, Optional
+import re
+import threading
+
+# 1 - edit distance / length of the longer name. Names of up to 5
+# characters may differ by one edit at most (4 or fewer: none), 6-9 by one,
+# 10-14 by two
+MIN_CONFIDENCE = 0.8
+AMBIGUITY_MARGIN = 0.1   # lead required over the best candidate of another crop
+MAX_CANDIDATES = 8       # names (by shared trigrams) scored by edit distance
+
+# Crops grown in the region (and by-products) outside the database whose
+# names are a few edits from a known crop's; they and their misspellings
+# never resolve, so they reach the dynamic knowledge fetch
+OTHER_CROPS = (
+    'Green Gram', 'Moong', 'Mung', 'मूग', 'Black Gram', 'Urad', 'Udid', 'उडीद', 'Horse Gram', 'Kulthi', 'Hulga',
+    'Moth Bean', 'Matki', 'मटकी', 'Lentil', 'Masoor', 'Guar', 'Gawar', 'Gavar', 'Cluster Bean', 'गवार',
+    'Safflower', 'Kardai', 'Kardi', 'करडई', 'Bajra', 'Bajri', 'Pearl Millet', 'बाजरी', 'Ragi', 'Nachni',
+    'Finger Millet', 'नाचणी', 'Maize', 'Makka', 'Corn', 'मका', 'Sesame', 'Til', 'तीळ', 'Niger', 'Karale',
+    'Linseed', 'Jawas', 'Mustard', 'Sarson', 'Castor', 'Sugar Beet', 'Cotton Seed', 'Rice Bran', 'Wheat Bran'
+)
+
+# Long vowel signs and nasal marks fold to their common short forms, so
+# तुर / तूर and हरभरा / हरबरा differ by at most an edit
+DEVANAGARI_FOLDING = str.maketrans({'ी': 'ि', 'ू': 'ु', 'ँ': 'ं', '़': None})
+REPEATED = re.compile(r'(.)\1+')
+
+
+class CropMatch(NamedTuple):
+    crop_id: str
+    confidence: float
+    matched: str   # the indexed name that matched
+    method: str    # 'alias', 'variety' or 'fuzzy'
+
+
+def fold(name: str) -> str:
+    """Normalized name with doubled letters collapsed and Devanagari vowels folded"""
+    return REPEATED.sub(r'\1', normalize_commodity(name).translate(DEVANAGARI_FOLDING))
+
+
+def trigrams(text: str) -> set:
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Edit distance with adjacent transpositions ('whaet' is one edit from 'wheat')"""
+    before, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i]
+        for j in range(1, len(b) + 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        before, previous = previous, current
+    return previous[-1]
+
+
+class CropResolver:
+    """Exact and trigram/edit-distance lookups over names of the static crop database"""
+    
+    def __init__(self):
+        self._varieties = {}  # normalized variety -> crop id
+        self._names = []  # folded name per name id
+        self._crops = []  # crop id (None for OTHER_CROPS) per name id
+        self._gram_counts = []  # trigrams per name id
+        self._postings = defaultdict(list)  # trigram -> name ids
+        self._built = False
+        self._lock = threading.Lock()
+    
+    def build(self, crops: Dict[str, dict] = None):
+        """Index crop ids, aliases, Marathi names and varieties of the static database (or the given crops)"""
+        crops = kb.CROP_DATABASE if crops is None else crops
+        
+        names = {}  # folded name -> crop id (first wins)
+        varieties = {}
+        for alias, crop_id in ALIAS_INDEX.items():
+            if crop_id in crops:
+                names.setdefault(fold(alias), crop_id)
+        for crop_id, crop_data in crops.items():
+            for name in [crop_id, crop_data.get('marathi_name')] + list(crop_data.get('varieties', [])):
+                if name:
+                    names.setdefault(fold(name), crop_id)
+            for variety in crop_data.get('varieties', []):
+                varieties.setdefault(normalize_commodity(variety), crop_id)
+        for name in OTHER_CROPS:
+            names.setdefault(fold(name), None)
+        
+        postings = defaultdict(list)
+        for name_id, name in enumerate(names):
+            for gram in trigrams(name):
+                postings[gram].append(name_id)
+        
+        with self._lock:
+            self._varieties = varieties
+            self._names = list(names)
+            self._crops = list(names.values())
+            self._gram_counts = [len(trigrams(name)) for name in names]
+            self._postings = postings
+            self._built = True
+    
+    def resolve(self, name: str, fuzzy: bool = True) -> Optional[CropMatch]:
+        """
+        The known crop a name refers to, or None if it is not a close enough
+        match for any (it may be a genuinely new crop). With fuzzy=False only
+        exact alias and variety matches are returned.
+        """
+        if not self._built:
+            self.build()
+        
+        key = normalize_commodity(name)
+        if not key:
+            return None
+        crop_id = resolve_crop(name)
+        if crop_id is not None:
+            return CropMatch(crop_id, 1.0, key, 'alias')
+        if key in self._varieties:
+            return CropMatch(self._varieties[key], 1.0, key, 'variety')
+        return self._fuzzy(fold(name)) if fuzzy else None
+    
+    def _fuzzy(self, query: str) -> Optional[CropMatch]:
+        query_grams = trigrams(query)
+        shared = defaultdict(int)
+        for gram in query_grams:
+            for name_id in self._postings.get(gram, ()):
+                shared[name_id] += 1
+        
+        # Dice coefficient on trigrams picks the candidates worth an edit distance
+        candidates = sorted(
+            shared, key=lambda name_id: -2 * shared[name_id] / (len(query_grams) + self._gram_counts[name_id])
+        )[:MAX_CANDIDATES]
+        
+        best_per_crop = {}
+        for name_id in candidates:
+            name = self._names[name_id]
+            similarity = 1 - edit_distance(query, name) / max(len(query), len(name))
+            crop_id = self._crops[name_id]
+            if similarity > best_per_crop.get(crop_id, (-1.0, ''))[0]:
+                best_per_crop[crop_id] = (similarity, name)
+        
+        ranked = sorted(best_per_crop.items(), key=lambda item: -item[1][0])
+        if not ranked or ranked[0][1][0] < MIN_CONFIDENCE:
+            return None
+        if len(ranked) > 1 and ranked[0][1][0] - ranked[1][1][0] < AMBIGUITY_MARGIN:
+            return None
+        crop_id, (score, name) = ranked[0]
+        if crop_id is None:
+            return None
+        return CropMatch(crop_id, round(score, 2), name, 'fuzzy')
+
+
+# Singleton instance
+crop_resolver = CropResolver()
@@ -0,0 +1,187 @@
+"""
+Mandi Gazetteer - Offline coordinates for AGMARKNET market (APMC) names.
+
+AGMARKNET records carry state, district and market names but no location.
+The built-in table covers Maharashtra APMCs and major markets in
+neighbouring states; coordinates are approximate town centres. A CSV with
+columns state,district,market,latitude,longitude (MANDI_GAZETTEER_PATH)
+adds or overrides entries, e.g. a full geocoded AGMARKNET market list.
+"""
+
+from typing import List, NamedTuple
+import csv
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+
+class Mandi(NamedTuple):
+    state: str
+    district: str
+    market: str
+    latitude: float
+    longitude: float
+
+
+# (state, district, market as spelled by AGMARKNET, latitude, longitude)
+MANDI_GAZETTEER = [
+    # Maharashtra - Pune division
+    ('Maharashtra', 'Pune', 'Pune', 18.5204, 73.8567),
+    ('Maharashtra', 'Pune', 'Pune(Pimpri)', 18.6298, 73.7997),
+    ('Maharashtra', 'Pune', 'Pune(Manjri)', 18.4980, 73.9700),
+    ('Maharashtra', 'Pune', 'Baramati', 18.1515, 74.5777),
+    ('Maharashtra', 'Pune', 'Indapur', 18.1164, 75.0276),
+    ('Maharashtra', 'Pune', 'Junnar', 19.2000, 73.8800),
+    ('Maharashtra', 'Pune', 'Shirur', 18.8270, 74.3730),
+    ('Maharashtra', 'Pune', 'Daund', 18.4649, 74.5824),
+    ('Maharashtra', 'Pune', 'Manchar', 19.0050, 73.9440),
+    ('Maharashtra', 'Pune', 'Khed(Chakan)', 18.7600, 73.8600),
+    ('Maharashtra', 'Satara', 'Satara', 17.6805, 74.0183),
+    ('Maharashtra', 'Satara', 'Karad', 17.2890, 74.1810),
+    ('Maharashtra', 'Satara', 'Phaltan', 17.9900, 74.4300),
+    ('Maharashtra', 'Satara', 'Lonand', 18.0400, 74.1900),
+    ('Maharashtra', 'Sangli', 'Sangli', 16.8524, 74.5815),
+    ('Maharashtra', 'Sangli', 'Islampur', 17.0500, 74.2700),
+    ('Maharashtra', 'Sangli', 'Tasgaon', 17.0300, 74.6000),
+    ('Maharashtra', 'Kolhapur', 'Kolhapur', 16.7050, 74.2433),
+    ('Maharashtra', 'Kolhapur', 'Jaysingpur', 16.7800, 74.5600),
+    ('Maharashtra', 'Solapur', 'Solapur', 17.6599, 75.9064),
+    ('Maharashtra', 'Solapur', 'Pandharpur', 17.6800, 75.3300),
+    ('Maharashtra', 'Solapur', 'Barshi', 18.2300, 75.6900),
+    ('Maharashtra', 'Solapur', 'Akluj', 17.8800, 75.0200),
+    ('Maharashtra', 'Solapur', 'Mangalwedha', 17.5100, 75.4500),
+    ('Maharashtra', 'Solapur', 'Kurduwadi', 18.0900, 75.4200),
+    # Maharashtra - Nashik division
+    ('Maharashtra', 'Nashik', 'Nashik', 19.9975, 73.7898),
+    ('Maharashtra', 'Nashik', 'Lasalgaon', 20.1500, 74.2333),
+    ('Maharashtra', 'Nashik', 'Pimpalgaon Baswant', 20.1667, 73.9833),
+    ('Maharashtra', 'Nashik', 'Yeola', 20.0420, 74.4890),
+    ('Maharashtra', 'Nashik', 'Malegaon', 20.5579, 74.5287),
+    ('Maharashtra', 'Nashik', 'Manmad', 20.2520, 74.4370),
+    ('Maharashtra', 'Nashik', 'Sinnar', 19.8500, 74.0000),
+    ('Maharashtra', 'Nashik', 'Niphad', 20.0800, 74.1100),
+    ('Maharashtra', 'Nashik', 'Kalwan', 20.5000, 74.0300),
+    ('Maharashtra', 'Nashik', 'Chandvad', 20.3300, 74.2500),
+    ('Maharashtra', 'Nashik', 'Satana', 20.6000, 74.2000),
+    ('Maharashtra', 'Ahmednagar', 'Ahmednagar', 19.0948, 74.7480),
+    ('Maharashtra', 'Ahmednagar', 'Rahuri', 19.3900, 74.6500),
+    ('Maharashtra', 'Ahmednagar', 'Shrirampur', 19.6200, 74.6600),
+    ('Maharashtra', 'Ahmednagar', 'Sangamner', 19.5700, 74.2100),
+    ('Maharashtra', 'Ahmednagar', 'Kopargaon', 19.8800, 74.4800),
+    ('Maharashtra', 'Ahmednagar', 'Rahata', 19.7100, 74.4800),
+    ('Maharashtra', 'Ahmednagar', 'Parner', 19.0000, 74.4300),
+    ('Maharashtra', 'Ahmednagar', 'Shevgaon', 19.3500, 75.2200),
+    ('Maharashtra', 'Jalgaon', 'Jalgaon', 21.0077, 75.5626),
+    ('Maharashtra', 'Jalgaon', 'Amalner', 21.0400, 75.0600),
+    ('Maharashtra', 'Jalgaon', 'Chopda', 21.2500, 75.3000),
+    ('Maharashtra', 'Dhule', 'Dhule', 20.9042, 74.7749),
+    ('Maharashtra', 'Dhule', 'Shirpur', 21.3500, 74.8800),
+    ('Maharashtra', 'Nandurbar', 'Nandurbar', 21.3700, 74.2400),
+    # Maharashtra - Marathwada
+    ('Maharashtra', 'Aurangabad', 'Aurangabad', 19.8762, 75.3433),
+    ('Maharashtra', 'Aurangabad', 'Vaijapur', 19.9200, 74.7300),
+    ('Maharashtra', 'Aurangabad', 'Gangapur', 19.7000, 75.0100),
+    ('Maharashtra', 'Aurangabad', 'Paithan', 19.4800, 75.3800),
+    ('Maharashtra', 'Aurangabad', 'Kannad', 20.2600, 75.1400),
+    ('Maharashtra', 'Jalna', 'Jalna', 19.8347, 75.8816),
+    ('Maharashtra', 'Jalna', 'Ambad', 19.6100, 75.7900),
+    ('Maharashtra', 'Beed', 'Beed', 18.9891, 75.7601),
+    ('Maharashtra', 'Beed', 'Majalgaon', 19.1500, 76.2300),
+    ('Maharashtra', 'Beed', 'Kaij', 18.7100, 76.0900),
+    ('Maharashtra', 'Beed', 'Ambejogai', 18.7300, 76.3800),
+    ('Maharashtra', 'Latur', 'Latur', 18.4088, 76.5604),
+    ('Maharashtra', 'Latur', 'Udgir', 18.3900, 77.1200),
+    ('Maharashtra', 'Latur', 'Ausa', 18.2500, 76.5000),
+    ('Maharashtra', 'Latur', 'Nilanga', 18.1200, 76.7500),
+    ('Maharashtra', 'Osmanabad', 'Osmanabad', 18.1860, 76.0419),
+    ('Maharashtra', 'Osmanabad', 'Tuljapur', 18.0100, 76.0700),
+    ('Maharashtra', 'Nanded', 'Nanded', 19.1383, 77.3210),
+    ('Maharashtra', 'Hingoli', 'Hingoli', 19.7200, 77.1500),
+    ('Maharashtra', 'Parbhani', 'Parbhani', 19.2700, 76.7700),
+    ('Maharashtra', 'Parbhani', 'Jintur', 19.6100, 76.6900),
+    # Maharashtra - Vidarbha
+    ('Maharashtra', 'Akola', 'Akola', 20.7002, 77.0082),
+    ('Maharashtra', 'Amarawati', 'Amarawati', 20.9374, 77.7796),
+    ('Maharashtra', 'Amarawati', 'Achalpur', 21.2600, 77.5100),
+    ('Maharashtra', 'Yavatmal', 'Yavatmal', 20.3899, 78.1307),
+    ('Maharashtra', 'Yavatmal', 'Digras', 20.1000, 77.7200),
+    ('Maharashtra', 'Yavatmal', 'Wani', 20.0600, 78.9500),
+    ('Maharashtra', 'Washim', 'Washim', 20.1100, 77.1300),
+    ('Maharashtra', 'Washim', 'Karanja', 20.4800, 77.4800),
+    ('Maharashtra', 'Buldhana', 'Buldhana', 20.5300, 76.1800),
+    ('Maharashtra', 'Buldhana', 'Khamgaon', 20.7000, 76.5700),
+    ('Maharashtra', 'Buldhana', 'Malkapur', 20.8850, 76.2000),
+    ('Maharashtra', 'Nagpur', 'Nagpur', 21.1458, 79.0882),
+    ('Maharashtra', 'Nagpur', 'Kalmeshwar', 21.2300, 78.9200),
+    ('Maharashtra', 'Nagpur', 'Katol', 21.2700, 78.5900),
+    ('Maharashtra', 'Nagpur', 'Umred', 20.8500, 79.3300),
+    ('Maharashtra', 'Wardha', 'Wardha', 20.7453, 78.6022),
+    ('Maharashtra', 'Wardha', 'Hinganghat', 20.5500, 78.8400),
+    ('Maharashtra', 'Chandrapur', 'Chandrapur', 19.9615, 79.2961),
+    ('Maharashtra', 'Bhandara', 'Bhandara', 21.1700, 79.6500),
+    ('Maharashtra', 'Gondiya', 'Gondiya', 21.4600, 80.2000),
+    # Maharashtra - Konkan
+    ('Maharashtra', 'Mumbai', 'Mumbai', 19.0771, 73.0100),
+    ('Maharashtra', 'Ratnagiri', 'Ratnagiri', 16.9902, 73.3120),
+    # Neighbouring states
+    ('Karnataka', 'Bangalore', 'Bangalore', 12.9716, 77.5946),
+    ('Karnataka', 'Dharwad', 'Hubli (Amaragol)', 15.3647, 75.1240),
+    ('Karnataka', 'Belgaum', 'Belgaum', 15.8497, 74.4977),
+    ('Karnataka', 'Kalburgi', 'Gulbarga', 17.3297, 76.8343),
+    ('Karnataka', 'Bijapur', 'Bijapur', 16.8302, 75.7100),
+    ('Karnataka', 'Davangere', 'Davangere', 14.4644, 75.9218),
+    ('Karnataka', 'Raichur', 'Raichur', 16.2076, 77.3463),
+    ('Karnataka', 'Bidar', 'Bidar', 17.9104, 77.5199),
+    ('Madhya Pradesh', 'Indore', 'Indore', 22.7196, 75.8577),
+    ('Madhya Pradesh', 'Bhopal', 'Bhopal', 23.2599, 77.4126),
+    ('Madhya Pradesh', 'Ujjain', 'Ujjain', 23.1765, 75.7885),
+    ('Madhya Pradesh', 'Khargone', 'Khargone', 21.8230, 75.6100),
+    ('Madhya Pradesh', 'Dewas', 'Dewas', 22.9660, 76.0500),
+    ('Gujarat', 'Ahmedabad', 'Ahmedabad', 23.0225, 72.5714),
+    ('Gujarat', 'Rajkot', 'Rajkot', 22.3039, 70.8022),
+    ('Gujarat', 'Rajkot', 'Gondal', 21.9600, 70.8000),
+    ('Gujarat', 'Surat', 'Surat', 21.1702, 72.8311),
+    ('Gujarat', 'Mehsana', 'Unjha', 23.8000, 72.3900),
+    ('Telangana', 'Warangal', 'Warangal', 17.9689, 79.5941),
+    ('Telangana', 'Adilabad', 'Adilabad', 19.6641, 78.5320),
+    ('Telangana', 'Nizamabad', 'Nizamabad', 18.6725, 78.0941),
+    ('Andhra Pradesh', 'Guntur', 'Guntur', 16.3067, 80.4365),
+    ('Andhra Pradesh', 'Kurnool', 'Kurnool', 15.8281, 78.0373),
+    ('Rajasthan', 'Kota', 'Kota', 25.2138, 75.8648),
+    ('Rajasthan', 'Jaipur', 'Jaipur (Grain)', 26.9124, 75.7873),
+    ('Punjab', 'Ludhiana', 'Khanna', 30.7000, 76.2200),
+    ('Uttar Pradesh', 'Agra', 'Agra', 27.1767, 78.0081),
+    ('Uttar Pradesh', 'Lucknow', 'Lucknow', 26.8467, 80.9462),
+    ('NCT of Delhi', 'Delhi', 'Azadpur', 28.7070, 77.1760),
+]
+
+
+def normalize_market_name(name) -> str:
+    """'Pune(Pimpri) APMC' -> 'pune pimpri' (case, punctuation and 'APMC' ignored)"""
+    text = re.sub(r'[^a-z0-9]+', ' ', str(name or '').lower())
+    return ' '.join(word for word in text.split() if word != 'apmc')
+
+
+def load_gazetteer(path: str = None) -> List[Mandi]:
+    """Built-in entries plus (overriding on state + market) the rows of an optional CSV"""
+    entries = {}
+    for row in MANDI_GAZETTEER:
+        mandi = Mandi(*row)
+        entries[(normalize_market_name(mandi.state), normalize_market_name(mandi.market))] = mandi
+    
+    if path and os.path.exists(path):
+        try:
+            with open(path, newline='', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    try:
+                        mandi = Mandi(row['state'], row['district'], row['market'],
+                                      float(row['latitude']), float(row['longitude']))
+                    except (KeyError, TypeError, ValueError):
+                        continue
+                    entries[(normalize_market_name(mandi.state), normalize_market_name(mandi.market))] = mandi
+        except OSError as e:
+            logger.error(f"Failed to read mandi gazetteer {path}: {e}")
+    
+    return list(entries.values())
@@ -0,0 +1,150 @@
+"""
+Suitability Matrix - The crop database compiled into NumPy arrays (NPK
+ranges, planting-month bitmask, market score) so crops can be ranked for
+many soil samples in one vectorized pass
+"""
+
+from app.knowledge import crop_knowledge_base as kb
+from typing import Dict, List, Sequence
+import numpy as np
+import threading
+
+NUTRIENTS = ('nitrogen', 'phosphorus', 'potassium')
+NPK_TOLERANCE = 0.15
+
+# Weightage: NPK 40, season 30 (10 when out of season), market price 30
+NPK_WEIGHT = 40
+SEASON_SCORE = 30
+OFF_SEASON_SCORE = 10
+MARKET_WEIGHT = 30
+MARKET_PRICE_SCALE = 10000
+
+
+def _avg_price(crop_data: dict) -> float:
+    calendar = crop_data["market_calendar"]
+    return calendar.get("avg_price_per_quintal", calendar.get("avg_price_per_ton", 0))
+
+
+class SuitabilityMatrix:
+    """
+    Arrays are indexed [crop] or [crop, nutrient]; the season bitmask has bit
+    (month - 1) set when the crop can be planted in that month. Compiled once
+    per kb.KB_VERSION and rebuilt automatically when it changes.
+    """
+    
+    def __init__(self):
+        self.crop_names = []
+        self._version = None
+        self._lock = threading.Lock()
+    
+    def build(self, crops: Dict[str, dict] = None):
+        """Compile the static crop database (or the given crops)"""
+        crops = kb.CROP_DATABASE if crops is None else crops
+        
+        crop_names = list(crops)
+        npk_min = np.array([[crops[name]["soil_requirements"]["npk_requirements"][n]["min"] for n in NUTRIENTS]
+                            for name in crop_names], dtype=float).reshape(-1, 3)
+        npk_max = np.array([[crops[name]["soil_requirements"]["npk_requirements"][n]["max"] for n in NUTRIENTS]
+                            for name in crop_names], dtype=float).reshape(-1, 3)
+        season_mask = np.array([
+            sum(1 << (month - 1) for month in range(1, 13) if kb.is_season_suitable(crops[name]["seasons"], month))
+            for name in crop_names
+        ], dtype=np.int64)
+        avg_price = np.array([_avg_price(crops[name]) for name in crop_names], dtype=float)
+        
+        with self._lock:
+            self.crop_names = crop_names
+            self.crops = crops
+            self.npk_low = npk_min * (1 - NPK_TOLERANCE)
+            self.npk_high = npk_max * (1 + NPK_TOLERANCE)
+            self.npk_optimal = (npk_min + npk_max) / 2
+            self.season_mask = season_mask
+            self.avg_price = avg_price
+            self.market_score = np.minimum(MARKET_WEIGHT, avg_price / MARKET_PRICE_SCALE * MARKET_WEIGHT)
+            self._version = (kb.KB_VERSION, len(crops)) if crops is kb.CROP_DATABASE else None
+    
+    def _ensure_built(self):
+        if self._version != (kb.KB_VERSION, len(kb.CROP_DATABASE)):
+            self.build()
+    
+    def score(self, soil_samples: Sequence[dict], months: Sequence[int]) -> Dict[str, np.ndarray]:
+        """
+        Score every crop for every soil sample.
+
+        Args:
+            soil_samples: [{nitrogen, phosphorus, potassium}, ...] (missing values count as 0)
+            months: Planting month for each sample
+
+        Returns:
+            [sample, crop] arrays: 'total', 'npk', 'season_match', plus [crop] 'market'
+        """
+        self._ensure_built()
+        
+        values = np.array([[float(sample.get(n, 0) or 0) for n in NUTRIENTS] for sample in soil_samples],
+                          dtype=float).reshape(-1, 1, 3)
+        low, high, optimal = self.npk_low[None], self.npk_high[None], self.npk_optimal[None]
+        
+        # is_npk_in_range for all (sample, crop, nutrient) cells at once
+        with np.errstate(divide='ignore', invalid='ignore'):
+            in_range = (values >= low) & (values <= high)
+            closeness = np.maximum(0.7, 1 - np.abs(values - optimal) / optimal)
+            below = np.maximum(0, 1 - (low - values) / low)
+            above = np.maximum(0, 1 - (values - high) / high)
+            nutrient_match = np.where(in_range, closeness, np.where(values < low, below, above))
+        nutrient_match = np.nan_to_num(nutrient_match, nan=0.0)
+        npk = nutrient_match.sum(axis=2) / 3 * NPK_WEIGHT
+        
+        month_bits = np.left_shift(1, np.asarray(months, dtype=np.int64) - 1)
+        season_match = (self.season_mask[None, :] & month_bits[:, None]) != 0
+        season = np.where(season_match, SEASON_SCORE, OFF_SEASON_SCORE)
+        
+        return {
+            'total': npk + season + self.market_score[None, :],
+            'npk': npk,
+            'season_match': season_match,
+            'market': self.market_score
+        }
+    
+    def rank(self, soil_samples: Sequence[dict], months: Sequence[int], top_k: int = None) -> List[List[dict]]:
+        """
+        Ranked crop suggestions per sample, in match_crop_to_soil's format.
+        Ties keep knowledge-base order, as the stable sort there did.
+        """
+        scores = self.score(soil_samples, months)
+        rounded = np.round(scores['total'], 1)
+        order = np.argsort(-rounded, axis=1, kind='stable')
+        if top_k is not None:
+            order = order[:, :top_k]
+        
+        results = []
+        for sample_index, crop_indexes in enumerate(order):
+            ranked = []
+            for crop_index in crop_indexes:
+                crop_name = self.crop_names[crop_index]
+                crop_data = self.crops[crop_name]
+                npk_score = scores['npk'][sample_index, crop_index]
+                avg_price = _avg_price(crop_data)
+                
+                reasons = []
+                if npk_score > 30:
+                    reasons.append(f"Good NPK match (Score: {npk_score:.0f}/40)")
+                if scores['season_match'][sample_index, crop_index]:
+                    reasons.append("Suitable season for planting")
+                if scores['market'][crop_index] > 20:
+                    reasons.append(f"Good market price (₹{avg_price})")
+                
+                ranked.append({
+                    "crop_name": crop_name,
+                    "marathi_name": crop_data["marathi_name"],
+                    "suitability_score": float(rounded[sample_index, crop_index]),
+                    "reasons": reasons,
+                    "expected_yield": crop_data["expected_yield"],
+                    "duration_months": crop_data["duration_months"],
+                    "avg_price": avg_price
+                })
+            results.append(ranked)
+        return results
+
+
+# Singleton instance
+suitability_matrix = SuitabilityMatrix()
@@ -0,0 +1,158 @@
+"""
+Symptom Index - Precompiled inverted index from symptom terms to
+(crop, disease) postings, used for fast disease diagnosis
+"""
+
+from app.knowledge.crop_knowledge_base import CROP_DATABASE
+from collections import defaultdict
+from typing import Dict, List, Optional
+import math
+import re
+import threading
+
+STOP_WORDS = frozenset([
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'have',
+    'in', 'into', 'is', 'it', 'its', 'my', 'of', 'on', 'or', 'the', 'their', 'there',
+    'to', 'was', 'were', 'with', 'like', 'some', 'very', 'also', 'all', 'plant', 'plants',
+    'crop', 'crops', 'seen', 'see', 'showing', 'shows', 'getting', 'becoming'
+])
+
+TOKEN_PATTERN = re.compile(r'[a-z]+')
+
+
+def stem(word: str) -> str:
+    """Light suffix stripping so 'leaves'/'leaf' and 'spots'/'spot' share a term"""
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    if len(word) > 4 and word.endswith('ves'):
+        return word[:-3] + 'f'
+    if len(word) > 5 and word.endswith('ing'):
+        return word[:-3]
+    if len(word) > 4 and word.endswith('ed'):
+        return word[:-2]
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, split on non-letters, drop stop words and short tokens, stem"""
+    return [stem(token) for token in TOKEN_PATTERN.findall(text.lower())
+            if token not in STOP_WORDS and len(token) > 2]
+
+
+class SymptomIndex:
+    """
+    Inverted index: term -> crop -> [(disease, symptom position)].
+
+    A disease's symptom phrase counts as matched when any of its terms appears
+    in the observed symptoms. Confidence is matched phrases / total phrases;
+    the TF-IDF score of the matched terms breaks ties between diseases.
+    """
+    
+    def __init__(self):
+        self._postings = defaultdict(lambda: defaultdict(list))
+        self._symptom_counts = {}  # (crop, disease) -> number of symptom phrases
+        self._document_frequency = defaultdict(int)  # term -> number of diseases using it
+        self._crops = set()
+        self._built = False
+        self._lock = threading.Lock()
+    
+    @property
+    def disease_count(self) -> int:
+        return len(self._symptom_counts)
+    
+    def build(self, crops: Dict[str, dict] = None):
+        """Index the static database plus any stored dynamic knowledge"""
+        if crops is None:
+            crops = dict(CROP_DATABASE)
+            try:
+                from app.services.dynamic_knowledge_service import dynamic_knowledge_service
+                for name, data in dynamic_knowledge_service.dynamic_knowledge.items():
+                    crops.setdefault(name, data)
+            except Exception:
+                pass
+        
+        with self._lock:
+            for crop_name, crop_data in crops.items():
+                self._add_crop(crop_name, crop_data)
+            self._built = True
+    
+    def add_crop(self, crop_name: str, crop_data: dict):
+        """Index a crop learned after startup (e.g. fetched dynamically)"""
+        with self._lock:
+            self._add_crop(crop_name, crop_data)
+    
+    def _add_crop(self, crop_name: str, crop_data: dict):
+        crop = crop_name.lower().strip()
+        if crop in self._crops:
+            return
+        self._crops.add(crop)
+        
+        for disease, info in (crop_data or {}).get('common_diseases', {}).items():
+            symptoms = info.get('symptoms', []) if isinstance(info, dict) else []
+            if not symptoms:
+                continue
+            self._symptom_counts[(crop, disease)] = len(symptoms)
+            
+            terms_seen = set()
+            for position, symptom in enumerate(symptoms):
+                for term in set(tokenize(symptom)):
+                    self._postings[term][crop].append((disease, position))
+                    terms_seen.add(term)
+            for term in terms_seen:
+                self._document_frequency[term] += 1
+    
+    def _ensure_ready(self, crop: str, crop_data: Optional[dict]):
+        if not self._built:
+            self.build()
+        if crop not in self._crops and crop_data:
+            self.add_crop(crop, crop_data)
+    
+    def match(self, crop_name: str, symptoms: str, crop_data: dict = None) -> List[Dict]:
+        """
+        Rank the crop's diseases against observed symptoms.
+
+        Args:
+            crop_name: Crop key
+            symptoms: Free-text symptom description
+            crop_data: Crop record, indexed on the fly if the crop is new
+
+        Returns:
+            [{'disease_key', 'matches', 'confidence', 'score'}] best first
+        """
+        crop = crop_name.lower().strip()
+        self._ensure_ready(crop, crop_data)
+        
+        query_terms = defaultdict(int)
+        for term in tokenize(symptoms):
+            query_terms[term] += 1
+        
+        matched_phrases = defaultdict(set)
+        scores = defaultdict(float)
+        total = max(self.disease_count, 1)
+        for term, frequency in query_terms.items():
+            postings = self._postings.get(term, {}).get(crop)
+            if not postings:
+                continue
+            idf = math.log(1 + total / self._document_frequency[term])
+            for disease, position in postings:
+                matched_phrases[disease].add(position)
+                scores[disease] += frequency * idf
+        
+        results = []
+        for disease, positions in matched_phrases.items():
+            symptom_total = self._symptom_counts[(crop, disease)]
+            results.append({
+                'disease_key': disease,
+                'matches': len(positions),
+                'confidence': int((len(positions) / symptom_total) * 100),
+                'score': round(scores[disease], 4)
+            })
+        
+        results.sort(key=lambda x: (x['confidence'], x['score']), reverse=True)
+        return results
+
+
+# Singleton instance
+symptom_index = SymptomIndex()
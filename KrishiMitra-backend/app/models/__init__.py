@@ -3,6 +3,9 @@ from app.models.user import User
 from app.models.crop import Crop
 from app.models.fertilization import SoilData, FertilizationPlan, IrrigationSchedule
 from app.models.disease import DiseaseDetection, HarvestPrediction, PricePrediction, AgentLog
+from app.models.agent_job import AgentJob
+from app.models.alert import Alert
+from app.models.market_price import MarketPriceHistory
 
 __all__ = [
     'User',
@@ -13,5 +16,8 @@ __all__ = [
     'DiseaseDetection',
     'HarvestPrediction',
     'PricePrediction',
-    'AgentLog'
+    'AgentLog',
+    'AgentJob',
+    'Alert',
+    'MarketPriceHistory'
 ]
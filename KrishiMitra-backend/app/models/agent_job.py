@@ -0,0 +1,43 @@
+from app import db
+from datetime import datetime
+from sqlalchemy import JSON
+import uuid
+
+class AgentJob(db.Model):
+    """Background agent workflow (e.g. running all agents for a new crop)"""
+    __tablename__ = 'agent_jobs'
+    
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    crop_id = db.Column(db.Integer, db.ForeignKey('crops.id', ondelete='CASCADE'))
+    job_type = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(30), default='queued')  # queued, running, completed, completed_with_errors, failed
+    current_stage = db.Column(db.String(50))
+    params = db.Column(JSON)  # Request inputs the stages need
+    stage_results = db.Column(JSON, default=dict)  # Per-stage status, persisted as each stage finishes
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    
+    @property
+    def is_finished(self):
+        return self.status in ('completed', 'completed_with_errors', 'failed')
+    
+    def to_dict(self):
+        """Convert to dictionary"""
+        return {
+            'job_id': self.id,
+            'job_type': self.job_type,
+            'crop_id': self.crop_id,
+            'status': self.status,
+            'current_stage': self.current_stage,
+            'stage_results': self.stage_results or {},
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+    
+    def __repr__(self):
+        return f'<AgentJob {self.job_type} {self.id} - {self.status}>'
@@ -0,0 +1,32 @@
+from app import db
+from datetime import datetime
+
+class Alert(db.Model):
+    """Proactive alerts generated by the daily sweep (stage changes, irrigation advice)"""
+    __tablename__ = 'alerts'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    crop_id = db.Column(db.Integer, db.ForeignKey('crops.id', ondelete='CASCADE'), index=True)
+    alert_type = db.Column(db.String(50), nullable=False)  # stage_update, irrigation_skip, irrigation_advisory
+    severity = db.Column(db.String(20))
+    message = db.Column(db.Text, nullable=False)
+    icon = db.Column(db.String(50))
+    is_read = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    
+    def to_dict(self):
+        """Convert to dictionary"""
+        return {
+            'id': self.id,
+            'crop_id': self.crop_id,
+            'type': self.alert_type,
+            'severity': self.severity,
+            'message': self.message,
+            'icon': self.icon,
+            'is_read': self.is_read,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+    
+    def __repr__(self):
+        return f'<Alert {self.alert_type} - crop {self.crop_id}>'
@@ -26,9 +26,16 @@ class Crop(db.Model):
     disease_detections = db.relationship('DiseaseDetection', backref='crop', lazy='dynamic', cascade='all, delete-orphan')
     harvest_predictions = db.relationship('HarvestPrediction', backref='crop', lazy='dynamic', cascade='all, delete-orphan')
     price_predictions = db.relationship('PricePrediction', backref='crop', lazy='dynamic', cascade='all, delete-orphan')
+    agent_jobs = db.relationship('AgentJob', backref='crop', lazy='dynamic', cascade='all, delete-orphan')
+    alerts = db.relationship('Alert', backref='crop', lazy='dynamic', cascade='all, delete-orphan')
     
-    def to_dict(self, include_agents=False):
-        """Convert to dictionary"""
+    def to_dict(self, include_agents=False, preloaded=None):
+        """
+        Convert to dictionary
+        
+        preloaded: latest agent records from load_crop_children(); when omitted
+        they are fetched for this crop alone. Use serialize_crops() for lists.
+        """
         data = {
             'id': self.id,
             'user_id': self.user_id,
@@ -45,10 +52,17 @@ class Crop(db.Model):
         }
         
         if include_agents:
+            if preloaded is None:
+                from app.services.crop_loader import load_crop_children, SERIALIZED_CHILDREN
+                preloaded = load_crop_children([self.id], include=SERIALIZED_CHILDREN)[self.id]
+            
+            fertilization = preloaded.get('fertilization')
+            irrigation = preloaded.get('irrigation')
+            harvest = preloaded.get('harvest')
             data['agent_recommendations'] = self.agent_recommendations
-            data['fertilization'] = self.fertilization_plans.first().to_dict() if self.fertilization_plans.first() else None
-            data['irrigation'] = self.irrigation_schedules.first().to_dict() if self.irrigation_schedules.first() else None
-            data['harvest_prediction'] = self.harvest_predictions.first().to_dict() if self.harvest_predictions.first() else None
+            data['fertilization'] = fertilization.to_dict() if fertilization else None
+            data['irrigation'] = irrigation.to_dict() if irrigation else None
+            data['harvest_prediction'] = harvest.to_dict() if harvest else None
         
         return data
     
@@ -0,0 +1,41 @@
+from app import db
+from datetime import datetime
+
+class MarketPriceHistory(db.Model):
+    """Daily AGMARKNET price quote, one row per (market, commodity, variety, arrival date)"""
+    __tablename__ = 'market_price_history'
+    __table_args__ = (
+        db.UniqueConstraint('market', 'commodity', 'variety', 'arrival_date', name='uq_market_price_quote'),
+        db.Index('ix_market_price_commodity_id_date', 'commodity_id', 'arrival_date'),
+        db.Index('ix_market_price_location', 'state', 'district'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    state = db.Column(db.String(100), nullable=False)
+    district = db.Column(db.String(100), nullable=False)
+    market = db.Column(db.String(150), nullable=False)
+    commodity = db.Column(db.String(150), nullable=False)
+    commodity_id = db.Column(db.String(150), nullable=False, default='')  # canonical_commodity(commodity)
+    variety = db.Column(db.String(150), nullable=False, default='')
+    arrival_date = db.Column(db.Date, nullable=False, index=True)
+    min_price = db.Column(db.Float)
+    max_price = db.Column(db.Float)
+    modal_price = db.Column(db.Float, nullable=False)  # Rs per quintal
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        """Convert to dictionary"""
+        return {
+            'state': self.state,
+            'district': self.district,
+            'market': self.market,
+            'commodity': self.commodity,
+            'variety': self.variety,
+            'arrival_date': self.arrival_date.isoformat() if self.arrival_date else None,
+            'min_price': self.min_price,
+            'max_price': self.max_price,
+            'modal_price': self.modal_price
+        }
+    
+    def __repr__(self):
+        return f'<MarketPriceHistory {self.market} {self.commodity} {self.arrival_date}>'
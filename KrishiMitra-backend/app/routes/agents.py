@@ -1,9 +1,8 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.services.agent_orchestrator import orchestrator
-from app.models import User, Crop
-from app.services.stage_manager import stage_manager
-from app.agents.irrigation_agent import IrrigationAgent
+from app.models import User
+from app.services.daily_sweep import run_daily_sweep
 import logging
 
 bp = Blueprint('agents', __name__)
@@ -119,57 +118,12 @@ def run_daily_check():
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
-            
-        crops = Crop.query.filter_by(user_id=user_id).all()
-        alerts = []
-        updated_stages = []
         
-        irrigation_agent = IrrigationAgent()
+        # Same region-batched sweep the scheduler runs, scoped to this user;
+        # alerts are returned directly rather than stored
+        sweep = run_daily_sweep(user_id=user_id, persist_alerts=False)
+        alerts = [{k: v for k, v in alert.items() if k != 'user_id'} for alert in sweep['alerts']]
         
-        for crop in crops:
-            # 1. Update Growth Stage
-            if crop.sowing_date:
-                stage_info = stage_manager.calculate_current_stage(crop.crop_name, crop.sowing_date)
-                new_stage = stage_info.get("stage")
-                
-                # Check if stage changed
-                if new_stage and new_stage != crop.current_stage:
-                    crop.current_stage = new_stage
-                    updated_stages.append({
-                        "crop": crop.crop_name,
-                        "old_stage": crop.current_stage,
-                        "new_stage": new_stage
-                    })
-                    # Add Stage Change Alert
-                    alerts.append({
-                        "type": "stage_update",
-                        "severity": "low",
-                        "message": f"{crop.crop_name} is now in {new_stage} stage.",
-                        "crop_id": crop.id
-                    })
-            
-            # 2. Run Contextual Agent Checks
-            # Construct location
-            location = {
-                "latitude": float(user.latitude) if user.latitude else 0,
-                "longitude": float(user.longitude) if user.longitude else 0,
-                "location_name": user.location or "India"
-            }
-            
-            # Check Irrigation
-            try:
-                irrig_alert = irrigation_agent.check_daily_status(
-                    crop_name=crop.crop_name,
-                    growth_stage=crop.current_stage or "Vegetative",
-                    sowing_date=crop.sowing_date,
-                    location=location
-                )
-                if irrig_alert:
-                    irrig_alert['crop_id'] = crop.id
-                    alerts.append(irrig_alert)
-            except Exception as e:
-                logger.warning(f"Irrigation check failed for {crop.crop_name}: {e}")
-
         # FORCE TEST ALERT (Debugging)
         if not alerts:
             alerts.append({
@@ -179,14 +133,10 @@ def run_daily_check():
                 "icon": "verified"
             })
 
-        # Commit stage updates
-        from app import db
-        db.session.commit()
-        
         return jsonify({
             'status': 'success',
             'alerts': alerts,
-            'stage_updates': updated_stages
+            'stage_updates': sweep['stage_updates']
         })
 
     except Exception as e:
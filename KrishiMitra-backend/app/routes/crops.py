@@ -1,10 +1,18 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, url_for
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
-from app.models import Crop, User, FertilizationPlan, IrrigationSchedule, HarvestPrediction, PricePrediction
-from app.agents import (crop_planning_agent, fertilization_agent, irrigation_agent,
-                        harvest_prediction_agent, price_prediction_agent)
+from app.models import Crop, User, AgentJob
+from app.services.crop_loader import serialize_crops
+from app.services.crop_pipeline import create_crop_job, run_pipeline
+from app.tasks import enqueue_crop_pipeline
+from app.agents import crop_planning_agent
+from app.knowledge import suitability_matrix
 from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_PLOTS = 1000
 
 bp = Blueprint('crops', __name__)
 
@@ -42,10 +50,68 @@ def auto_plan_crop():
     })
 
 
+@bp.route('/auto-plan/batch', methods=['POST'])
+@jwt_required()
+def auto_plan_batch():
+    """
+    Rank crops for many plots in one request (e.g. an FPO's member farms).
+    
+    Expected JSON Input:
+    {
+        "plots": [{"plot_id": "A-12", "soil_data": {"nitrogen": 240, "phosphorus": 18, "potassium": 160}}, ...],
+        "month": 6 (optional, defaults to current month),
+        "top_k": 5 (optional)
+    }
+    """
+    data = request.get_json() or {}
+    plots = data.get('plots') or []
+    
+    if not isinstance(plots, list) or not plots:
+        return jsonify({'error': 'plots must be a non-empty list'}), 400
+    if len(plots) > MAX_BATCH_PLOTS:
+        return jsonify({'error': f'At most {MAX_BATCH_PLOTS} plots per request'}), 400
+    
+    try:
+        month = int(data.get('month') or datetime.now().month)
+        top_k = int(data.get('top_k', 5))
+        soil_samples = [
+            {nutrient: float((plot.get('soil_data') or {}).get(nutrient) or 0)
+             for nutrient in ('nitrogen', 'phosphorus', 'potassium')}
+            for plot in plots
+        ]
+    except (TypeError, ValueError, AttributeError):
+        return jsonify({'error': 'Soil values, month and top_k must be numeric'}), 400
+    
+    if not 1 <= month <= 12:
+        return jsonify({'error': 'month must be between 1 and 12'}), 400
+    
+    # One vectorized pass over every (plot, crop) pair
+    rankings = suitability_matrix.rank(soil_samples, [month] * len(plots), top_k=max(1, top_k))
+    
+    return jsonify({
+        'month': month,
+        'results': [
+            {
+                'plot_id': plot.get('plot_id', index),
+                'recommendations': [
+                    {
+                        'crop_name': crop['crop_name'],
+                        'marathi_name': crop['marathi_name'],
+                        'suitability_score': crop['suitability_score'],
+                        'reasons': crop['reasons']
+                    }
+                    for crop in ranking
+                ]
+            }
+            for index, (plot, ranking) in enumerate(zip(plots, rankings))
+        ]
+    })
+
+
 @bp.route('/add', methods=['POST'])
 @jwt_required()
 def add_crop():
-    """Add crop and trigger all agents automatically"""
+    """Add crop and queue all agents as a background job (poll /jobs/<job_id>)"""
     user_id = int(get_jwt_identity())
     user = User.query.get(user_id)
     
@@ -68,123 +134,49 @@ def add_crop():
     )
     
     db.session.add(crop)
-    db.session.commit()
-    
-    # Trigger all agents automatically
-    agent_results = {}
+    db.session.flush()
     
-    # 1. Fertilization Agent
-    try:
-        fert_plan = fertilization_agent.run(
-            user_id=user_id,
-            crop_id=crop.id,
-            crop_name=crop.crop_name,
-            current_soil_npk=data.get('soil_npk', {'nitrogen': 0, 'phosphorus': 0, 'potassium': 0}),
-            growth_stage='sowing',
-            land_area=float(crop.land_area)
-        )
-        
-        # Save fertilization plan
-        fertilization = FertilizationPlan(
-            crop_id=crop.id,
-            agent_plan=fert_plan,
-            npk_requirement=fert_plan.get('npk_requirement'),
-            recommended_fertilizers=fert_plan.get('fertilizer_plan'),
-            cheaper_alternatives=fert_plan.get('cheaper_alternatives'),
-            estimated_cost=fert_plan.get('total_cost_per_acre'),
-            savings_potential=fert_plan.get('potential_savings')
-        )
-        db.session.add(fertilization)
-        agent_results['fertilization'] = 'success'
-    except Exception as e:
-        agent_results['fertilization'] = f'error: {str(e)}'
+    # Agents run as a background workflow; progress is tracked on the job
+    job = create_crop_job(crop, params={
+        'soil_npk': data.get('soil_npk'),
+        'soil_moisture': data.get('soil_moisture', 50)
+    })
+    db.session.commit()
     
-    # 2. Irrigation Agent
     try:
-        location = {
-            'latitude': float(user.latitude) if user.latitude else 0,
-            'longitude': float(user.longitude) if user.longitude else 0
-        }
-        
-        irrigation_schedule = irrigation_agent.run(
-            user_id=user_id,
-            crop_id=crop.id,
-            crop_name=crop.crop_name,
-            growth_stage='sowing',
-            soil_moisture=data.get('soil_moisture', 50),
-            irrigation_type=crop.irrigation_type or 'drip',
-            location=location
-        )
-        
-        # Save irrigation schedule
-        irrigation = IrrigationSchedule(
-            crop_id=crop.id,
-            agent_schedule=irrigation_schedule,
-            water_requirement=irrigation_schedule.get('next_irrigation', {}).get('water_amount_mm'),
-            optimal_times=irrigation_schedule.get('next_7_days_schedule')
-        )
-        db.session.add(irrigation)
-        agent_results['irrigation'] = 'success'
+        enqueue_crop_pipeline(job.id)
     except Exception as e:
-        agent_results['irrigation'] = f'error: {str(e)}'
+        # No broker reachable (e.g. local dev without Redis): run the agents inline
+        logger.warning(f"Celery unavailable, running crop pipeline inline: {e}")
+        run_pipeline(job.id)
     
-    # 3. Harvest Prediction Agent
-    try:
-        harvest_pred = harvest_prediction_agent.run(
-            user_id=user_id,
-            crop_id=crop.id,
-            crop_name=crop.crop_name,
-            sowing_date=crop.sowing_date.isoformat(),
-            growth_data={'days_since_sowing': 0, 'current_stage': 'sowing', 'health_status': 'good'}
-        )
-        
-        # Save harvest prediction
-        harvest = HarvestPrediction(
-            crop_id=crop.id,
-            predicted_yield=harvest_pred.get('yield_prediction', {}).get('estimated_yield_per_acre'),
-            yield_unit=harvest_pred.get('yield_prediction', {}).get('unit'),
-            predicted_date=datetime.fromisoformat(harvest_pred.get('predicted_harvest_date')) if harvest_pred.get('predicted_harvest_date') else None,
-            agent_analysis=harvest_pred,
-            confidence_level=harvest_pred.get('confidence_level')
-        )
-        db.session.add(harvest)
-        agent_results['harvest_prediction'] = 'success'
-    except Exception as e:
-        agent_results['harvest_prediction'] = f'error: {str(e)}'
+    db.session.refresh(job)
+    return jsonify({
+        'message': 'Crop added successfully! Agents are analyzing it in the background.',
+        'crop': crop.to_dict(),
+        'job_id': job.id,
+        'job_status': job.status,
+        'status_url': url_for('crops.get_job_status', job_id=job.id)
+    }), 202
+
+
+@bp.route('/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_job_status(job_id):
+    """Status and per-stage results of a background agent workflow"""
+    user_id = int(get_jwt_identity())
+    job = AgentJob.query.filter_by(id=job_id, user_id=user_id).first()
     
-    # 4. Price Prediction Agent
-    try:
-        if harvest.predicted_date:
-            price_pred = price_prediction_agent.run(
-                user_id=user_id,
-                crop_id=crop.id,
-                crop_name=crop.crop_name,
-                harvest_date=harvest.predicted_date.isoformat()
-            )
-            
-            # Save price prediction
-            price = PricePrediction(
-                crop_id=crop.id,
-                crop_name=crop.crop_name,
-                current_price=price_pred.get('current_price_analysis', {}).get('current_price_per_quintal'),
-                predicted_prices=price_pred.get('price_predictions'),
-                optimal_selling_date=datetime.fromisoformat(price_pred.get('selling_strategy', {}).get('optimal_selling_date')) if price_pred.get('selling_strategy', {}).get('optimal_selling_date') else None,
-                market_trends=price_pred.get('market_insights'),
-                agent_recommendations=price_pred,
-                confidence_score=price_pred.get('price_predictions', {}).get('2_weeks', {}).get('confidence')
-            )
-            db.session.add(price)
-            agent_results['price_prediction'] = 'success'
-    except Exception as e:
-        agent_results['price_prediction'] = f'error: {str(e)}'
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
     
-    db.session.commit()
+    response = {'job': job.to_dict()}
+    if job.is_finished and job.crop_id:
+        crop = db.session.get(Crop, job.crop_id)
+        if crop:
+            response['crop'] = crop.to_dict(include_agents=True)
     
-    return jsonify({
-        'message': 'Crop added successfully! All agents activated.',
-        'crop': crop.to_dict(include_agents=True),
-        'agent_execution': agent_results
-    }), 201
+    return jsonify(response)
 
 
 @bp.route('/', methods=['GET'])
@@ -195,7 +187,7 @@ def get_crops():
     crops = Crop.query.filter_by(user_id=user_id).all()
     
     return jsonify({
-        'crops': [crop.to_dict(include_agents=True) for crop in crops]
+        'crops': serialize_crops(crops, include_agents=True)
     })
 
 
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models import Crop, FertilizationPlan, IrrigationSchedule, DiseaseDetection, HarvestPrediction, PricePrediction, AgentLog
+from app import db
+from app.models import Crop, AgentLog
+from app.services.crop_loader import load_crop_children
 from sqlalchemy import func
 
 bp = Blueprint('dashboard', __name__)
@@ -23,17 +25,21 @@ def get_dashboard():
         'agent_insights': {}
     }
     
+    # Latest agent records for all crops in one query per table
+    children = load_crop_children([crop.id for crop in crops])
+    
     for crop in crops:
         crop_data = crop.to_dict()
+        latest = children[crop.id]
         
         # Fertilization
-        fert = FertilizationPlan.query.filter_by(crop_id=crop.id).first()
+        fert = latest['fertilization']
         if fert:
             crop_data['fertilization_cost'] = float(fert.estimated_cost) if fert.estimated_cost else 0
             crop_data['savings_potential'] = float(fert.savings_potential) if fert.savings_potential else 0
         
         # Irrigation
-        irrig = IrrigationSchedule.query.filter_by(crop_id=crop.id).first()
+        irrig = latest['irrigation']
         if irrig and irrig.agent_schedule:
             next_irrigation = irrig.agent_schedule.get('next_irrigation', {})
             if next_irrigation.get('date'):
@@ -45,26 +51,24 @@ def get_dashboard():
                 })
         
         # Disease alerts
-        recent_diseases = DiseaseDetection.query.filter_by(crop_id=crop.id)\
-            .order_by(DiseaseDetection.detected_at.desc()).limit(1).all()
-        for disease in recent_diseases:
-            if disease.severity in ['High', 'Severe', 'Moderate']:
-                dashboard_data['alerts'].append({
-                    'type': 'disease',
-                    'severity': disease.severity,
-                    'crop': crop.crop_name,
-                    'disease': disease.detected_disease,
-                    'action_required': 'Apply treatment immediately'
-                })
+        disease = latest['disease']
+        if disease and disease.severity in ['High', 'Severe', 'Moderate']:
+            dashboard_data['alerts'].append({
+                'type': 'disease',
+                'severity': disease.severity,
+                'crop': crop.crop_name,
+                'disease': disease.detected_disease,
+                'action_required': 'Apply treatment immediately'
+            })
         
         # Harvest predictions
-        harvest = HarvestPrediction.query.filter_by(crop_id=crop.id).first()
+        harvest = latest['harvest']
         if harvest and harvest.predicted_date:
             crop_data['harvest_date'] = harvest.predicted_date.isoformat()
             crop_data['predicted_yield'] = float(harvest.predicted_yield) if harvest.predicted_yield else 0
         
         # Price predictions
-        price = PricePrediction.query.filter_by(crop_id=crop.id).first()
+        price = latest['price']
         if price:
             crop_data['optimal_selling_date'] = price.optimal_selling_date.isoformat() if price.optimal_selling_date else None
             crop_data['current_price'] = float(price.current_price) if price.current_price else 0
@@ -84,10 +88,13 @@ def get_alerts():
     
     # Check all crops for time-sensitive actions
     crops = Crop.query.filter_by(user_id=user_id).all()
+    children = load_crop_children([crop.id for crop in crops],
+                                  include=['irrigation', 'disease'],
+                                  limits={'disease': 3})
     
     for crop in crops:
         # Irrigation alerts
-        irrig = IrrigationSchedule.query.filter_by(crop_id=crop.id).first()
+        irrig = children[crop.id]['irrigation']
         if irrig and irrig.agent_schedule:
             if irrig.agent_schedule.get('should_irrigate_now'):
                 alerts.append({
@@ -99,8 +106,7 @@ def get_alerts():
                 })
         
         # Disease alerts
-        diseases = DiseaseDetection.query.filter_by(crop_id=crop.id)\
-            .order_by(DiseaseDetection.detected_at.desc()).limit(3).all()
+        diseases = children[crop.id]['disease']
         for disease in diseases:
             if disease.severity in ['High', 'Severe']:
                 alerts.append({
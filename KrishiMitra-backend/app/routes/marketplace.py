@@ -3,6 +3,10 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.agents import fertilization_agent
 from app.agents.price_analysis_agent import price_analysis_agent
 from app.services.data_gov_service import data_gov_service
+from app.services.mandi_locator import mandi_locator
+from app.services.price_forecast import MODEL_VERSION, price_forecast_service
+from app.services.price_history import price_history_service
+from app.config import Config
 from app.models import User
 
 bp = Blueprint('marketplace', __name__)
@@ -48,16 +52,15 @@ def get_crop_prices():
         return jsonify({'error': 'State and district required'}), 400
     
     try:
-        # Fetch market data
-        markets = data_gov_service.get_nearby_markets(state, district, commodities)
-        processed = data_gov_service.process_market_data(markets)
+        # Index lookup on the cached market snapshot
+        total, markets = data_gov_service.search_markets(state, district, commodities, limit=50)
         
         return jsonify({
             'state': state,
             'district': district,
             'commodities': commodities,
-            'markets_found': len(processed),
-            'markets': processed[:50]  # Limit to 50 results
+            'markets_found': total,
+            'markets': markets  # Limited to 50 results
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -66,7 +69,7 @@ def get_crop_prices():
 @bp.route('/nearby-markets', methods=['GET'])
 @jwt_required()
 def get_nearby_markets():
-    """Get nearby markets with prices based on user location"""
+    """Get markets near the user's location with live prices, best net price first"""
     user_id = int(get_jwt_identity())
     user = User.query.get(user_id)
     
@@ -77,21 +80,103 @@ def get_nearby_markets():
     commodity = request.args.get('commodity', None)
     state = request.args.get('state', None)
     district = request.args.get('district', None)
+    radius_km = request.args.get('radius_km', Config.MANDI_SEARCH_RADIUS_KM, type=float)
+    limit = request.args.get('limit', 30, type=int)
+    
+    # ?lat=&lon= override the saved farm location
+    latitude = request.args.get('lat', type=float)
+    longitude = request.args.get('lon', type=float)
+    if latitude is None or longitude is None:
+        latitude = float(user.latitude) if user.latitude is not None else None
+        longitude = float(user.longitude) if user.longitude is not None else None
     
     try:
-        # Use user's location to determine state/district if not provided
-        # For now, fetch all and filter
         commodities = [commodity] if commodity else None
-        markets = data_gov_service.get_nearby_markets(state or '', district or '', commodities)
-        processed = data_gov_service.process_market_data(markets)
+        if latitude is None or longitude is None:
+            # No coordinates to search around: fall back to the state/district lookup
+            _, processed = data_gov_service.search_markets(state, district, commodities, limit=limit)
+            nearest = []
+        else:
+            processed = mandi_locator.rank_markets(data_gov_service.get_store(), latitude, longitude,
+                                                   commodities, radius_km, limit, state, district)
+            nearest = mandi_locator.nearest_mandis(latitude, longitude, k=10, radius_km=radius_km)
         
         return jsonify({
             'user_location': {
-                'latitude': user.latitude,
-                'longitude': user.longitude,
-                'address': user.address
+                'latitude': latitude,
+                'longitude': longitude,
+                'address': user.location
             },
-            'markets': processed[:30]
+            'radius_km': radius_km,
+            'markets': processed,
+            'nearest_mandis': nearest
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/price-history', methods=['GET'])
+@jwt_required()
+def get_price_history():
+    """Stored AGMARKNET prices for a commodity: weekly/monthly OHLC and rolling statistics"""
+    commodity = request.args.get('commodity', '').strip()
+    if not commodity:
+        return jsonify({'error': 'Commodity required'}), 400
+    
+    period = request.args.get('period', 'week')
+    if period not in ('week', 'month'):
+        return jsonify({'error': "period must be 'week' or 'month'"}), 400
+    
+    filters = {
+        'state': request.args.get('state'),
+        'district': request.args.get('district'),
+        'market': request.args.get('market')
+    }
+    days = request.args.get('days', 180, type=int)
+    window = request.args.get('window', 7, type=int)
+    
+    try:
+        return jsonify({
+            'commodity': commodity,
+            **filters,
+            'period': period,
+            'ohlc': price_history_service.ohlc(commodity, period=period, days=days, **filters),
+            'rolling': price_history_service.rolling(commodity, window=max(window, 1), days=days, **filters)
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/price-forecast', methods=['GET'])
+@jwt_required()
+def get_price_forecast():
+    """Seasonal price forecasts for every commodity traded in a district"""
+    user_id = int(get_jwt_identity())
+    user = User.query.get(user_id)
+    
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    
+    state = request.args.get('state')
+    district = request.args.get('district')
+    if not (state and district):
+        # Default to the district of the mandi nearest the farm (or ?lat=&lon=)
+        latitude = request.args.get('lat', type=float)
+        longitude = request.args.get('lon', type=float)
+        if latitude is None or longitude is None:
+            latitude = float(user.latitude) if user.latitude is not None else None
+            longitude = float(user.longitude) if user.longitude is not None else None
+        nearest = mandi_locator.nearest_mandis(latitude, longitude, k=1) if latitude is not None and longitude is not None else []
+        if not nearest:
+            return jsonify({'error': 'State and district (or a location) required'}), 400
+        state, district = nearest[0]['state'], nearest[0]['district']
+    
+    try:
+        return jsonify({
+            'state': state,
+            'district': district,
+            'model_version': MODEL_VERSION,
+            'forecasts': price_forecast_service.forecast_district(state, district)
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -109,16 +194,16 @@ def analyze_crop_prices():
     
     data = request.get_json()
     crop_name = data.get('crop_name', '')
-    markets = data.get('markets', [])
+    markets = data.get('markets', [])  # Optional: without it, live prices at nearby mandis are used
     
-    if not crop_name or not markets:
-        return jsonify({'error': 'Crop name and markets data required'}), 400
+    if not crop_name:
+        return jsonify({'error': 'Crop name required'}), 400
     
     try:
         user_location = {
-            'latitude': user.latitude or 0,
-            'longitude': user.longitude or 0,
-            'address': user.address or 'Unknown'
+            'latitude': float(user.latitude or 0),
+            'longitude': float(user.longitude or 0),
+            'address': user.location or 'Unknown'
         }
         
         # Run AI analysis
@@ -0,0 +1,153 @@
+"""
+Agent Executor - Runs independent agents concurrently with dependency ordering,
+per-agent timeouts and per-agent timing
+"""
+
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from flask import current_app, has_app_context
+from app.config import Config
+from typing import Callable, Dict, Iterable, List
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class AgentTask:
+    """A single unit of work for the executor"""
+    
+    def __init__(self, name: str, func: Callable, kwargs: dict = None,
+                 depends_on: Iterable[str] = (), timeout: float = None):
+        """
+        Args:
+            name: Unique task name, used as the key in results and timings
+            func: Callable to run. Tasks with dependencies receive an extra
+                  ``upstream`` keyword holding the results of their dependencies.
+            kwargs: Keyword arguments passed to func
+            depends_on: Names of tasks that must finish successfully first
+            timeout: Seconds allowed for this task once started (None = executor default)
+        """
+        self.name = name
+        self.func = func
+        self.kwargs = kwargs or {}
+        self.depends_on = tuple(depends_on)
+        self.timeout = timeout
+
+
+class AgentExecutor:
+    """Dependency-aware thread pool executor for agent tasks"""
+    
+    def __init__(self, max_workers: int = None, default_timeout: float = None):
+        self.max_workers = max_workers or Config.AGENT_MAX_WORKERS
+        self.default_timeout = default_timeout or Config.AGENT_TIMEOUT_SECONDS
+        self._pool = None
+    
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        # Created lazily so forked gunicorn workers each get their own threads.
+        # Timed-out tasks cannot be killed, so the pool is shared rather than
+        # shut down per call (which would block until stragglers finish).
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix='agent')
+        return self._pool
+    
+    def run(self, tasks: List[AgentTask]) -> Dict[str, dict]:
+        """
+        Execute tasks, starting each one as soon as its dependencies complete.
+
+        Returns:
+            {"results": {name: result}, "timings": {name: {status, duration_ms, ...}}}
+            Tasks that fail, time out or are skipped get an error dict as result.
+        """
+        by_name = {task.name: task for task in tasks}
+        for task in tasks:
+            missing = [dep for dep in task.depends_on if dep not in by_name]
+            if missing:
+                raise ValueError(f"Task '{task.name}' depends on unknown task(s): {missing}")
+        
+        results = {}
+        timings = {}
+        pending = list(tasks)
+        running = {}  # future -> (task, start_time, deadline)
+        run_start = time.perf_counter()
+        
+        while pending or running:
+            # Launch or skip everything whose dependencies are resolved
+            for task in list(pending):
+                failed = [dep for dep in task.depends_on
+                          if dep in timings and timings[dep]['status'] != 'success']
+                if failed:
+                    pending.remove(task)
+                    results[task.name] = {
+                        "error": f"Skipped because dependency failed: {', '.join(failed)}",
+                        "agent": task.name
+                    }
+                    timings[task.name] = {"status": "skipped", "duration_ms": 0}
+                    continue
+                
+                if all(dep in timings for dep in task.depends_on):
+                    pending.remove(task)
+                    kwargs = dict(task.kwargs)
+                    if task.depends_on:
+                        kwargs['upstream'] = {dep: results[dep] for dep in task.depends_on}
+                    start = time.perf_counter()
+                    timeout = task.timeout or self.default_timeout
+                    future = self.pool.submit(self._wrap(task.func), **kwargs)
+                    running[future] = (task, start, start + timeout)
+            
+            if not running:
+                if pending:
+                    raise ValueError(f"Circular dependency between tasks: "
+                                     f"{[task.name for task in pending]}")
+                break
+            
+            next_deadline = min(deadline for _, _, deadline in running.values())
+            done, _ = wait(list(running), timeout=max(0, next_deadline - time.perf_counter()),
+                           return_when=FIRST_COMPLETED)
+            
+            now = time.perf_counter()
+            for future in done:
+                task, start, _ = running.pop(future)
+                duration_ms = round((now - start) * 1000, 1)
+                try:
+                    result = future.result()
+                    status = "error" if isinstance(result, dict) and result.get("error") else "success"
+                except Exception as e:
+                    logger.error(f"Agent task '{task.name}' failed: {str(e)}")
+                    result = {"error": str(e), "agent": task.name}
+                    status = "error"
+                results[task.name] = result
+                timings[task.name] = {"status": status, "duration_ms": duration_ms}
+            
+            for future, (task, start, deadline) in list(running.items()):
+                if now >= deadline:
+                    running.pop(future)
+                    future.cancel()
+                    timeout = task.timeout or self.default_timeout
+                    logger.warning(f"Agent task '{task.name}' timed out after {timeout}s")
+                    results[task.name] = {"error": f"Timed out after {timeout}s", "agent": task.name}
+                    timings[task.name] = {"status": "timeout",
+                                          "duration_ms": round((now - start) * 1000, 1)}
+        
+        logger.info(f"Executed {len(tasks)} agent task(s) in "
+                    f"{(time.perf_counter() - run_start) * 1000:.1f}ms")
+        return {"results": results, "timings": timings}
+    
+    @staticmethod
+    def _wrap(func: Callable) -> Callable:
+        """Propagate the Flask app context into worker threads when present"""
+        if not has_app_context():
+            return func
+        
+        app = current_app._get_current_object()
+        
+        def run_in_context(**kwargs):
+            with app.app_context():
+                return func(**kwargs)
+        
+        return run_in_context
+
+
+# Singleton instance
+agent_executor = AgentExecutor()
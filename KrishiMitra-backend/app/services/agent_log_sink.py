@@ -0,0 +1,200 @@
+"""
+Agent Log Sink - Buffers AgentLog records in a bounded queue and bulk-inserts
+them from a background thread, so agent telemetry never adds commit latency
+to user requests
+"""
+
+from flask import current_app, has_app_context
+from datetime import datetime
+from app import db
+from app.models import AgentLog
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DROP_POLICIES = ('drop_newest', 'drop_oldest', 'block')
+
+
+class AgentLogSink:
+    """Background, batched writer for AgentLog rows"""
+    
+    def __init__(self):
+        self.app = None
+        self.async_enabled = True
+        self.queue_size = 10000
+        self.batch_size = 200
+        self.flush_interval = 2.0
+        self.drop_policy = 'drop_oldest'
+        self.large_payload_bytes = 16384
+        self.payload_sample_rate = 0.1
+        
+        self._queue = None
+        self._worker = None
+        self._pid = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._atexit_registered = False
+        self.stats = {'submitted': 0, 'written': 0, 'dropped': 0, 'payloads_sampled_out': 0, 'write_errors': 0}
+    
+    def init_app(self, app):
+        """Read sink settings from the app config"""
+        self.app = app
+        self.async_enabled = app.config.get('AGENT_LOG_ASYNC', True)
+        self.queue_size = app.config.get('AGENT_LOG_QUEUE_SIZE', self.queue_size)
+        self.batch_size = app.config.get('AGENT_LOG_BATCH_SIZE', self.batch_size)
+        self.flush_interval = app.config.get('AGENT_LOG_FLUSH_INTERVAL', self.flush_interval)
+        self.drop_policy = app.config.get('AGENT_LOG_DROP_POLICY', self.drop_policy)
+        self.large_payload_bytes = app.config.get('AGENT_LOG_LARGE_PAYLOAD_BYTES', self.large_payload_bytes)
+        self.payload_sample_rate = app.config.get('AGENT_LOG_PAYLOAD_SAMPLE_RATE', self.payload_sample_rate)
+        
+        if self.drop_policy not in DROP_POLICIES:
+            raise ValueError(f"AGENT_LOG_DROP_POLICY must be one of {DROP_POLICIES}")
+        
+        app.extensions['agent_log_sink'] = self
+        if not self._atexit_registered:
+            atexit.register(self.shutdown)
+            self._atexit_registered = True
+    
+    def submit(self, agent_type: str, user_id: int = None, crop_id: int = None,
+               action: str = None, input_data: dict = None, output_data: dict = None,
+               status: str = 'success', execution_time: float = 0):
+        """Queue one agent execution record (never blocks the caller unless policy is 'block')"""
+        record = {
+            'agent_type': agent_type,
+            'user_id': user_id,
+            'crop_id': crop_id,
+            'action': action,
+            'input_data': self._prepare_payload(input_data),
+            'output_data': self._prepare_payload(output_data),
+            'status': status,
+            'execution_time': round(execution_time, 3),
+            'created_at': datetime.utcnow()
+        }
+        self.stats['submitted'] += 1
+        
+        if not self.async_enabled:
+            self._write_batch([record])
+            return
+        
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self._handle_full_queue(record)
+    
+    def flush(self):
+        """Write everything currently queued (used by tests and on shutdown)"""
+        if self._queue is None:
+            return
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.batch_size:
+                self._write_batch(batch)
+                batch = []
+        if batch:
+            self._write_batch(batch)
+    
+    def shutdown(self):
+        self._stop.set()
+        if self._worker is not None and self._pid == os.getpid():
+            self._worker.join(timeout=self.flush_interval + 1)
+        self.flush()
+    
+    def _prepare_payload(self, payload):
+        """Make payload JSON-safe and sample out oversized ones"""
+        if payload is None:
+            return None
+        try:
+            serialized = json.dumps(payload, default=str, ensure_ascii=False)
+        except (TypeError, ValueError):
+            serialized = json.dumps(str(payload))
+        
+        size = len(serialized.encode('utf-8'))
+        if size > self.large_payload_bytes and random.random() >= self.payload_sample_rate:
+            self.stats['payloads_sampled_out'] += 1
+            return {'_omitted': True, 'size_bytes': size}
+        return json.loads(serialized)
+    
+    def _handle_full_queue(self, record: dict):
+        if self.drop_policy == 'drop_newest':
+            self.stats['dropped'] += 1
+            return
+        
+        if self.drop_policy == 'drop_oldest':
+            try:
+                self._queue.get_nowait()
+                self.stats['dropped'] += 1
+            except queue.Empty:
+                pass
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                self.stats['dropped'] += 1
+            return
+        
+        # 'block': apply backpressure for at most one flush interval
+        try:
+            self._queue.put(record, timeout=self.flush_interval)
+        except queue.Full:
+            self.stats['dropped'] += 1
+    
+    def _ensure_worker(self):
+        # Started lazily and restarted after fork, so every gunicorn worker has its own writer
+        if self._worker is not None and self._pid == os.getpid() and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._pid == os.getpid() and self._worker.is_alive():
+                return
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self.queue_size)
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._worker = threading.Thread(target=self._run, name='agent-log-sink', daemon=True)
+            self._worker.start()
+    
+    def _run(self):
+        while not self._stop.is_set():
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            if batch:
+                self._write_batch(batch)
+    
+    def _write_batch(self, records: list):
+        """Bulk-insert records on a dedicated connection, outside any request session"""
+        app = self.app or (current_app._get_current_object() if has_app_context() else None)
+        if app is None:
+            logger.error(f"Dropping {len(records)} agent log(s): sink has no application")
+            self.stats['dropped'] += len(records)
+            return
+        
+        try:
+            with app.app_context():
+                with db.engine.begin() as connection:
+                    connection.execute(AgentLog.__table__.insert(), records)
+            self.stats['written'] += len(records)
+        except Exception as e:
+            self.stats['write_errors'] += 1
+            logger.error(f"Failed to write {len(records)} agent log(s): {e}")
+
+
+# Singleton instance
+agent_log_sink = AgentLogSink()
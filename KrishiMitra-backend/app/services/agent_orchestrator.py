@@ -8,6 +8,7 @@ from app.agents.irrigation_agent import IrrigationAgent
 from app.agents.disease_agent import DiseaseDetectionAgent, HarvestPredictionAgent, PricePredictionAgent
 from app.agents.price_analysis_agent import PriceAnalysisAgent
 from app.services.summarization_service import summarization_service
+from app.services.agent_executor import AgentTask, agent_executor
 from typing import Dict, List, Optional
 import logging
 
@@ -25,6 +26,7 @@ class AgentOrchestrator:
         self.harvest_agent = HarvestPredictionAgent()
         self.price_prediction_agent = PricePredictionAgent()
         self.price_analysis_agent = PriceAnalysisAgent()
+        self.executor = agent_executor
     
     def analyze_crop_planning(self, soil_data: dict, location: dict, 
                              user_preferences: dict = None, summarize: bool = True) -> dict:
@@ -137,13 +139,16 @@ class AgentOrchestrator:
             return {"error": str(e), "agent": "harvest_prediction"}
     
     def analyze_price_trend(self, crop_name: str, harvest_date: str, 
-                           current_price: float = None, summarize: bool = False) -> dict:
+                           current_price: float = None, summarize: bool = False,
+                           state: str = None, district: str = None) -> dict:
         """Execute price trend prediction (usually embedded in comprehensive analysis)"""
         try:
             agent_result = self.price_prediction_agent.execute(
                 crop_name=crop_name,
                 harvest_date=harvest_date,
-                current_price=current_price
+                current_price=current_price,
+                state=state,
+                district=district
             )
             
             return agent_result
@@ -183,7 +188,10 @@ class AgentOrchestrator:
             summarize: Whether to generate AI summary
         
         Returns:
-            Combined results from all applicable agents with optional summary
+            Combined results from all applicable agents with optional summary.
+            Agents run concurrently; ``agent_timings`` reports status and
+            duration per agent and agents exceeding their timeout are listed
+            in ``agents_timed_out`` instead of failing the whole analysis.
         """
         results = {
             "crop_name": crop_name,
@@ -191,55 +199,64 @@ class AgentOrchestrator:
             "agents_executed": []
         }
         
-        # Execute each agent if data is available
+        # Build tasks for each agent whose data is available; independent
+        # agents run concurrently so latency is bounded by the slowest one
+        tasks = []
         if analysis_data.get("soil_data") and analysis_data.get("location"):
-            results["crop_planning"] = self.analyze_crop_planning(
-                soil_data=analysis_data["soil_data"],
-                location=analysis_data["location"],
-                user_preferences=analysis_data.get("user_preferences"),
-                summarize=False  # Don't summarize individual agents
-            )
-            results["agents_executed"].append("crop_planning")
+            tasks.append(AgentTask("crop_planning", self.analyze_crop_planning, {
+                "soil_data": analysis_data["soil_data"],
+                "location": analysis_data["location"],
+                "user_preferences": analysis_data.get("user_preferences"),
+                "summarize": False  # Don't summarize individual agents
+            }))
         
         if analysis_data.get("soil_npk") and analysis_data.get("growth_stage"):
-            results["fertilization"] = self.analyze_fertilization(
-                crop_name=crop_name,
-                current_soil_npk=analysis_data["soil_npk"],
-                growth_stage=analysis_data["growth_stage"],
-                land_area=analysis_data.get("land_area", 1.0),
-                summarize=False
-            )
-            results["agents_executed"].append("fertilization")
+            tasks.append(AgentTask("fertilization", self.analyze_fertilization, {
+                "crop_name": crop_name,
+                "current_soil_npk": analysis_data["soil_npk"],
+                "growth_stage": analysis_data["growth_stage"],
+                "land_area": analysis_data.get("land_area", 1.0),
+                "summarize": False
+            }))
         
         if analysis_data.get("soil_moisture") and analysis_data.get("irrigation_type") and analysis_data.get("location"):
-            results["irrigation"] = self.analyze_irrigation(
-                crop_name=crop_name,
-                growth_stage=analysis_data.get("growth_stage", "vegetative"),
-                soil_moisture=analysis_data["soil_moisture"],
-                irrigation_type=analysis_data["irrigation_type"],
-                location=analysis_data["location"],
-                summarize=False
-            )
-            results["agents_executed"].append("irrigation")
+            tasks.append(AgentTask("irrigation", self.analyze_irrigation, {
+                "crop_name": crop_name,
+                "growth_stage": analysis_data.get("growth_stage", "vegetative"),
+                "soil_moisture": analysis_data["soil_moisture"],
+                "irrigation_type": analysis_data["irrigation_type"],
+                "location": analysis_data["location"],
+                "summarize": False
+            }))
         
         if analysis_data.get("sowing_date") and analysis_data.get("growth_data"):
-            results["harvest"] = self.analyze_harvest(
-                crop_name=crop_name,
-                sowing_date=analysis_data["sowing_date"],
-                growth_data=analysis_data["growth_data"],
-                weather_history=analysis_data.get("weather_history"),
-                summarize=False
-            )
-            results["agents_executed"].append("harvest")
+            tasks.append(AgentTask("harvest", self.analyze_harvest, {
+                "crop_name": crop_name,
+                "sowing_date": analysis_data["sowing_date"],
+                "growth_data": analysis_data["growth_data"],
+                "weather_history": analysis_data.get("weather_history"),
+                "summarize": False
+            }))
         
         if analysis_data.get("markets") and analysis_data.get("location"):
-            results["market_analysis"] = self.analyze_markets(
-                crop_name=crop_name,
-                markets=analysis_data["markets"],
-                user_location=analysis_data["location"],
-                summarize=False
-            )
-            results["agents_executed"].append("market_analysis")
+            tasks.append(AgentTask("market_analysis", self.analyze_markets, {
+                "crop_name": crop_name,
+                "markets": analysis_data["markets"],
+                "user_location": analysis_data["location"],
+                "summarize": False
+            }))
+        
+        execution = self.executor.run(tasks)
+        results["agent_timings"] = execution["timings"]
+        
+        # Keep results in declaration order; timed-out agents are reported
+        # separately so the summary only covers agents that actually finished
+        for task in tasks:
+            results[task.name] = execution["results"][task.name]
+            if execution["timings"][task.name]["status"] == "timeout":
+                results.setdefault("agents_timed_out", []).append(task.name)
+            else:
+                results["agents_executed"].append(task.name)
         
         # Generate comprehensive summary using Gemini
         if summarize and len(results["agents_executed"]) > 0:
@@ -0,0 +1,95 @@
+"""
+Crop Loader - Batched loading of agent records (fertilization, irrigation,
+disease, harvest, price) for many crops in a constant number of queries
+"""
+
+from app import db
+from app.models import FertilizationPlan, IrrigationSchedule, DiseaseDetection, HarvestPrediction, PricePrediction
+from sqlalchemy import func
+from typing import Dict, Iterable, List
+
+# Child tables loaded per crop and the column that defines "latest"
+CHILD_MODELS = {
+    'fertilization': (FertilizationPlan, FertilizationPlan.created_at),
+    'irrigation': (IrrigationSchedule, IrrigationSchedule.created_at),
+    'disease': (DiseaseDetection, DiseaseDetection.detected_at),
+    'harvest': (HarvestPrediction, HarvestPrediction.created_at),
+    'price': (PricePrediction, PricePrediction.created_at),
+}
+
+# Child records embedded by Crop.to_dict(include_agents=True)
+SERIALIZED_CHILDREN = ('fertilization', 'irrigation', 'harvest')
+
+
+def latest_rows_by_crop(model, order_column, crop_ids: Iterable[int], limit: int = 1) -> Dict[int, List]:
+    """
+    Fetch the latest `limit` rows of `model` for every crop in one query.
+
+    Uses ROW_NUMBER() partitioned by crop_id, so the cost is one round trip
+    regardless of how many crops are requested.
+
+    Returns:
+        {crop_id: [rows newest first]} for crops that have at least one row
+    """
+    crop_ids = list(crop_ids)
+    if not crop_ids:
+        return {}
+    
+    rank = func.row_number().over(
+        partition_by=model.crop_id,
+        order_by=(order_column.desc(), model.id.desc())
+    ).label('rank')
+    ranked = db.session.query(model.id.label('id'), rank)\
+        .filter(model.crop_id.in_(crop_ids)).subquery()
+    
+    rows = model.query.join(ranked, model.id == ranked.c.id)\
+        .filter(ranked.c.rank <= limit)\
+        .order_by(model.crop_id, ranked.c.rank).all()
+    
+    grouped = {}
+    for row in rows:
+        grouped.setdefault(row.crop_id, []).append(row)
+    return grouped
+
+
+def load_crop_children(crop_ids: Iterable[int], include: Iterable[str] = None,
+                       limits: Dict[str, int] = None) -> Dict[int, dict]:
+    """
+    Load the latest agent records for a batch of crops (one query per child table).
+
+    Args:
+        crop_ids: Crop primary keys
+        include: Subset of CHILD_MODELS keys to load (default: all)
+        limits: Rows per crop for a child type, e.g. {'disease': 3} (default 1)
+
+    Returns:
+        {crop_id: {'fertilization': row|None, ..., 'disease': [rows]}}
+        Child types loaded with a limit above 1 are returned as lists.
+    """
+    crop_ids = list(crop_ids)
+    include = list(include) if include else list(CHILD_MODELS)
+    limits = limits or {}
+    
+    children = {crop_id: {} for crop_id in crop_ids}
+    for name in include:
+        model, order_column = CHILD_MODELS[name]
+        limit = limits.get(name, 1)
+        rows_by_crop = latest_rows_by_crop(model, order_column, crop_ids, limit=limit)
+        for crop_id in crop_ids:
+            rows = rows_by_crop.get(crop_id, [])
+            children[crop_id][name] = rows if limit > 1 else (rows[0] if rows else None)
+    
+    return children
+
+
+def serialize_crops(crops: List, include_agents: bool = True) -> List[dict]:
+    """
+    Serialize a list of crops, preloading their agent records in bulk.
+
+    Costs one query per embedded child table instead of several per crop.
+    """
+    if not include_agents:
+        return [crop.to_dict() for crop in crops]
+    
+    children = load_crop_children([crop.id for crop in crops], include=SERIALIZED_CHILDREN)
+    return [crop.to_dict(include_agents=True, preloaded=children[crop.id]) for crop in crops]
@@ -0,0 +1,202 @@
+"""
+Crop Pipeline - Agent stages run for a newly added crop. Each stage saves its
+agent record and its status on the AgentJob as soon as it finishes, so
+progress is visible while the rest of the workflow runs.
+"""
+
+from app import db
+from app.models import (AgentJob, Crop, User, FertilizationPlan, IrrigationSchedule,
+                        HarvestPrediction, PricePrediction)
+from app.agents import (fertilization_agent, irrigation_agent,
+                        harvest_prediction_agent, price_prediction_agent)
+from app.services.mandi_locator import mandi_locator
+from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+STAGES = ('fertilization', 'irrigation', 'harvest_prediction', 'price_prediction')
+
+
+def _fertilization_stage(crop: Crop, user: User, params: dict) -> str:
+    fert_plan = fertilization_agent.run(
+        user_id=user.id,
+        crop_id=crop.id,
+        crop_name=crop.crop_name,
+        current_soil_npk=params.get('soil_npk') or {'nitrogen': 0, 'phosphorus': 0, 'potassium': 0},
+        growth_stage='sowing',
+        land_area=float(crop.land_area)
+    )
+    
+    db.session.add(FertilizationPlan(
+        crop_id=crop.id,
+        agent_plan=fert_plan,
+        npk_requirement=fert_plan.get('npk_requirement'),
+        recommended_fertilizers=fert_plan.get('fertilizer_plan'),
+        cheaper_alternatives=fert_plan.get('cheaper_alternatives'),
+        estimated_cost=fert_plan.get('total_cost_per_acre'),
+        savings_potential=fert_plan.get('potential_savings')
+    ))
+    return 'success'
+
+
+def _irrigation_stage(crop: Crop, user: User, params: dict) -> str:
+    location = {
+        'latitude': float(user.latitude) if user.latitude else 0,
+        'longitude': float(user.longitude) if user.longitude else 0
+    }
+    
+    irrigation_schedule = irrigation_agent.run(
+        user_id=user.id,
+        crop_id=crop.id,
+        crop_name=crop.crop_name,
+        growth_stage='sowing',
+        soil_moisture=params.get('soil_moisture', 50),
+        irrigation_type=crop.irrigation_type or 'drip',
+        location=location
+    )
+    
+    db.session.add(IrrigationSchedule(
+        crop_id=crop.id,
+        agent_schedule=irrigation_schedule,
+        water_requirement=irrigation_schedule.get('next_irrigation', {}).get('water_amount_mm'),
+        optimal_times=irrigation_schedule.get('next_7_days_schedule')
+    ))
+    return 'success'
+
+
+def _harvest_stage(crop: Crop, user: User, params: dict) -> str:
+    harvest_pred = harvest_prediction_agent.run(
+        user_id=user.id,
+        crop_id=crop.id,
+        crop_name=crop.crop_name,
+        sowing_date=crop.sowing_date.isoformat(),
+        growth_data={'days_since_sowing': 0, 'current_stage': 'sowing', 'health_status': 'good'}
+    )
+    
+    db.session.add(HarvestPrediction(
+        crop_id=crop.id,
+        predicted_yield=harvest_pred.get('yield_prediction', {}).get('estimated_yield_per_acre'),
+        yield_unit=harvest_pred.get('yield_prediction', {}).get('unit'),
+        predicted_date=datetime.fromisoformat(harvest_pred.get('predicted_harvest_date')) if harvest_pred.get('predicted_harvest_date') else None,
+        agent_analysis=harvest_pred,
+        confidence_level=harvest_pred.get('confidence_level')
+    ))
+    return 'success'
+
+
+def _price_stage(crop: Crop, user: User, params: dict) -> str:
+    # Depends on the harvest stage's predicted date
+    harvest = crop.harvest_predictions.order_by(HarvestPrediction.created_at.desc()).first()
+    if not harvest or not harvest.predicted_date:
+        return 'skipped'
+    
+    # Regional price history from the district of the farm's nearest mandi
+    region = {}
+    if user.latitude is not None and user.longitude is not None:
+        nearest = mandi_locator.nearest_mandis(float(user.latitude), float(user.longitude), k=1)
+        if nearest:
+            region = {'state': nearest[0]['state'], 'district': nearest[0]['district']}
+    
+    price_pred = price_prediction_agent.run(
+        user_id=user.id,
+        crop_id=crop.id,
+        crop_name=crop.crop_name,
+        harvest_date=harvest.predicted_date.isoformat(),
+        **region
+    )
+    
+    selling_date = price_pred.get('selling_strategy', {}).get('optimal_selling_date')
+    db.session.add(PricePrediction(
+        crop_id=crop.id,
+        crop_name=crop.crop_name,
+        current_price=price_pred.get('current_price_analysis', {}).get('current_price_per_quintal'),
+        predicted_prices=price_pred.get('price_predictions'),
+        optimal_selling_date=datetime.fromisoformat(selling_date) if selling_date else None,
+        market_trends=price_pred.get('market_insights'),
+        agent_recommendations=price_pred,
+        confidence_score=price_pred.get('price_predictions', {}).get('2_weeks', {}).get('confidence')
+    ))
+    return 'success'
+
+
+STAGE_HANDLERS = {
+    'fertilization': _fertilization_stage,
+    'irrigation': _irrigation_stage,
+    'harvest_prediction': _harvest_stage,
+    'price_prediction': _price_stage,
+}
+
+
+def create_crop_job(crop: Crop, params: dict = None) -> AgentJob:
+    """Queue record for the crop setup workflow (caller commits)"""
+    job = AgentJob(
+        user_id=crop.user_id,
+        crop_id=crop.id,
+        job_type='crop_setup',
+        status='queued',
+        params=params or {},
+        stage_results={}
+    )
+    db.session.add(job)
+    return job
+
+
+def run_stage(job_id: str, stage: str) -> dict:
+    """
+    Run one pipeline stage and persist its agent record and status.
+
+    A failing stage is recorded and the workflow moves on, matching the
+    previous behaviour where one agent error did not block the others.
+    """
+    job = db.session.get(AgentJob, job_id)
+    if job is None:
+        logger.warning(f"Agent job {job_id} not found; skipping stage {stage}")
+        return {'status': 'skipped'}
+    
+    crop = db.session.get(Crop, job.crop_id)
+    user = db.session.get(User, job.user_id)
+    if crop is None or user is None:
+        job.status = 'failed'
+        job.error = 'Crop no longer exists'
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        return {'status': 'skipped'}
+    
+    job.status = 'running'
+    job.current_stage = stage
+    job.started_at = job.started_at or datetime.utcnow()
+    db.session.commit()
+    
+    try:
+        result = {'status': STAGE_HANDLERS[stage](crop, user, job.params or {})}
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Crop pipeline stage {stage} failed for job {job_id}: {e}")
+        result = {'status': 'error', 'error': str(e)}
+    
+    job = db.session.get(AgentJob, job_id)
+    job.stage_results = {**(job.stage_results or {}), stage: result}
+    db.session.commit()
+    return result
+
+
+def finish_job(job_id: str):
+    """Mark the workflow finished once every stage has run"""
+    job = db.session.get(AgentJob, job_id)
+    if job is None or job.status == 'failed':
+        return
+    
+    failed = [stage for stage, result in (job.stage_results or {}).items() if result.get('status') == 'error']
+    job.status = 'completed_with_errors' if failed else 'completed'
+    job.current_stage = None
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+
+
+def run_pipeline(job_id: str):
+    """Run every stage inline (used when no Celery broker is reachable)"""
+    for stage in STAGES:
+        run_stage(job_id, stage)
+    finish_job(job_id)
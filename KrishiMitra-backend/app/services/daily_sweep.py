@@ -0,0 +1,162 @@
+"""
+Daily Sweep - Region-batched proactive checks for every crop.
+
+Crops are grouped by the geohash cell of their farm so each cell's forecast is
+fetched once, the stage and irrigation rules are evaluated for the whole group,
+and alerts and stage changes are written in bulk. Upstream weather calls scale
+with the number of cells, not the number of crops.
+"""
+
+from app import db
+from app.config import Config
+from app.models import Crop, User, Alert
+from app.agents import irrigation_agent
+from app.services.stage_manager import stage_manager
+from app.services.weather_service import weather_service
+from app.utils.geo import decode_geohash, group_by_geohash
+from app.utils.locks import file_lock
+from datetime import date, datetime
+from sqlalchemy import case, insert, update
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _fetch_cell_weather(cell: str) -> dict:
+    """One forecast analysis per cell, requested for the cell's center"""
+    lat, lon = decode_geohash(cell)
+    return weather_service.analyze_for_irrigation(lat, lon)
+
+
+def write_stages(stages: dict, chunk_size: int = 500):
+    """
+    Write {crop_id: stage} back with one UPDATE ... SET current_stage = CASE id ...
+    per chunk, instead of one UPDATE per crop (caller commits)
+    """
+    items = list(stages.items())
+    for start in range(0, len(items), chunk_size):
+        chunk = dict(items[start:start + chunk_size])
+        db.session.execute(
+            update(Crop)
+            .where(Crop.id.in_(chunk))
+            .values(current_stage=case(chunk, value=Crop.id), updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+
+
+def run_daily_sweep(user_id: int = None, persist_alerts: bool = True,
+                    precision: int = None) -> dict:
+    """
+    Update growth stages and generate irrigation alerts for all crops
+    (or one user's crops).
+
+    Args:
+        user_id: Restrict the sweep to one user's crops
+        persist_alerts: Bulk-insert generated alerts into the alerts table
+        precision: Geohash precision for grouping (default from config)
+
+    Returns:
+        {'alerts': [...], 'stage_updates': [...], 'crops_checked', 'cells', 'weather_calls'}
+    """
+    precision = precision or Config.DAILY_SWEEP_GEOHASH_PRECISION
+    
+    query = db.session.query(Crop, User.latitude, User.longitude).join(User, Crop.user_id == User.id)
+    if user_id is not None:
+        query = query.filter(Crop.user_id == user_id)
+    rows = query.all()
+    
+    alerts = []
+    stage_updates = []
+    stage_rows = {}
+    
+    # 1. Growth stages, computed for every crop at once (no upstream calls)
+    dated = [crop for crop, _, _ in rows if crop.sowing_date]
+    stages = stage_manager.calculate_stages([crop.crop_name for crop in dated],
+                                            [crop.sowing_date for crop in dated])["stage"]
+    for crop, new_stage in zip(dated, stages):
+        if new_stage != crop.current_stage:
+            stage_updates.append({
+                "crop": crop.crop_name,
+                "old_stage": crop.current_stage,
+                "new_stage": new_stage
+            })
+            stage_rows[crop.id] = new_stage
+            alerts.append({
+                "type": "stage_update",
+                "severity": "low",
+                "message": f"{crop.crop_name} is now in {new_stage} stage.",
+                "crop_id": crop.id,
+                "user_id": crop.user_id
+            })
+    
+    # 2. Irrigation rules, one forecast per geohash cell
+    located = [(crop, float(lat), float(lon)) for crop, lat, lon in rows if lat and lon]
+    cells = group_by_geohash(located, precision)
+    weather_calls = 0
+    
+    for cell, crops in cells.items():
+        try:
+            weather = _fetch_cell_weather(cell)
+            weather_calls += 1
+        except Exception as e:
+            logger.warning(f"Weather fetch failed for cell {cell} ({len(crops)} crops): {e}")
+            continue
+        
+        for crop in crops:
+            alert = irrigation_agent.evaluate_daily_rules(crop.crop_name, weather)
+            if alert:
+                alerts.append({**alert, "crop_id": crop.id, "user_id": crop.user_id})
+    
+    # 3. Bulk writes
+    if stage_rows:
+        write_stages(stage_rows)
+    if persist_alerts and alerts:
+        now = datetime.utcnow()
+        db.session.execute(insert(Alert), [
+            {
+                "user_id": alert["user_id"],
+                "crop_id": alert.get("crop_id"),
+                "alert_type": alert["type"],
+                "severity": alert.get("severity"),
+                "message": alert["message"],
+                "icon": alert.get("icon"),
+                "created_at": now
+            }
+            for alert in alerts
+        ])
+    db.session.commit()
+    
+    return {
+        "alerts": alerts,
+        "stage_updates": stage_updates,
+        "crops_checked": len(rows),
+        "cells": len(cells),
+        "weather_calls": weather_calls
+    }
+
+
+def run_scheduled_sweep(app):
+    """
+    Scheduler entry point: run the sweep once per day across all workers.
+
+    The lock file records the last sweep date so workers that acquire the
+    lock after the sweep already ran today skip it.
+    """
+    lock_path = app.config.get('DAILY_SWEEP_LOCK_PATH', Config.DAILY_SWEEP_LOCK_PATH)
+    with file_lock(lock_path, blocking=False) as acquired:
+        if not acquired:
+            return
+        
+        # The lock file's content is the date of the last completed sweep
+        today = date.today().isoformat()
+        with open(lock_path, 'r') as f:
+            if f.read().strip() == today:
+                return
+        
+        with app.app_context():
+            result = run_daily_sweep()
+        logger.info(f"Daily sweep: {result['crops_checked']} crops, {result['cells']} cells, "
+                    f"{len(result['alerts'])} alerts")
+        
+        with open(lock_path, 'w') as f:
+            f.write(today)
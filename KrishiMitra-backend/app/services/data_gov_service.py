@@ -1,5 +1,11 @@
-import requests
 from app.config import Config
+from app.utils.http_client import http_client
+from app.services.market_store import MarketStore
+from app.utils.locks import file_lock
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import threading
 import time
 
 class DataGovService:
@@ -9,77 +15,166 @@ class DataGovService:
         self.api_key = Config.DATA_GOV_API_KEY
         self.dataset_id = Config.DATASET_ID
         self.base_url = f"https://api.data.gov.in/resource/{self.dataset_id}"
-        self.cache = {}  # Simple in-memory cache
-        self.cache_time = 0
-        self.cache_duration = 3600  # 1 hour
+        self.cache_duration = Config.MARKET_REFRESH_INTERVAL
+        self.snapshot_path = Config.MARKET_SNAPSHOT_PATH  # Shared by all workers on the host
+        self.fetch_workers = Config.MARKET_FETCH_WORKERS
+        
+        self.records = []
+        self.store = MarketStore()  # Columnar snapshot of the current records
+        self.snapshot_time = 0  # When the loaded snapshot was downloaded
+        self._snapshot_mtime = None
+        self._refresh_lock = threading.Lock()
+        self._load_lock = threading.Lock()
     
-    def fetch_all_records(self, limit_per_page=1000, max_total=20000):
+    def fetch_all_records(self):
         """
-        Fetch all records from data.gov.in API with pagination
+        Current AGMARKNET records (stale-while-revalidate)
+        
+        Serves the shared snapshot immediately; if it is older than the refresh
+        interval a background refresh is started. Only a cold start with no
+        snapshot at all waits for the download.
        
         Returns:
             List of market records
         """
-        # Check cache first
-        if time.time() - self.cache_time < self.cache_duration and self.cache:
-            return self.cache.get('records', [])
+        self._load_snapshot()
+        
+        if not self.records:
+            self.refresh(blocking=True)
+        elif time.time() - self.snapshot_time >= self.cache_duration:
+            self._refresh_in_background()
         
-        all_records = []
-        offset = 0
+        return self.records
+    
+    def refresh(self, blocking: bool = False) -> bool:
+        """
+        Download a new snapshot and swap it in atomically
         
+        Only one thread per process and one process per host downloads at a
+        time; the others keep serving the previous snapshot.
+        
+        Returns:
+            True if a fresh snapshot is loaded
+        """
+        if not self._refresh_lock.acquire(blocking=blocking):
+            return False
         try:
-            while True:
-                params = {
-                    'api-key': self.api_key,
-                    'format': 'json',
-                    'limit': limit_per_page,
-                    'offset': offset
-                }
-                
-                response = requests.get(self.base_url, params=params, timeout=30)
-                response.raise_for_status()
+            with file_lock(f"{self.snapshot_path}.lock", blocking) as acquired:
+                if not acquired:
+                    return False
                 
-                data = response.json()
-                records = data.get('records', [])
+                # Another worker may have refreshed while we waited for the lock
+                self._load_snapshot()
+                if self.records and time.time() - self.snapshot_time < self.cache_duration / 2:
+                    return True
                 
+                records = self._download_records()
                 if not records:
-                    break
-                
-                all_records.extend(records)
-                offset += len(records)
-                
-                if offset >= max_total or len(records) < limit_per_page:
-                    break
-            
-            # Cache the results
-            self.cache['records'] = all_records
-            self.cache_time = time.time()
-            
-            return all_records
-            
+                    return False
+                self._write_snapshot(records)
+                self._load_snapshot()
+                return True
         except Exception as e:
             print(f"Data.gov.in API error: {e}")
-            # Return cached data if available
-            return self.cache.get('records', [])
+            return False
+        finally:
+            self._refresh_lock.release()
+    
+    def _refresh_in_background(self):
+        if self._refresh_lock.locked():
+            return
+        threading.Thread(target=self.refresh, name='market-refresh', daemon=True).start()
+    
+    def _fetch_page(self, offset: int, limit: int) -> dict:
+        params = {
+            'api-key': self.api_key,
+            'format': 'json',
+            'limit': limit,
+            'offset': offset
+        }
+        
+        # Large pages are slow to generate upstream, so allow a longer read timeout
+        response = http_client.get(self.base_url, params=params,
+                                   timeout=(Config.HTTP_CONNECT_TIMEOUT, 30))
+        response.raise_for_status()
+        return response.json()
     
-    def filter_by_location(self, records, state=None, district=None):
-        """Filter records by state and/or district"""
-        filtered = records
+    def _download_records(self, limit_per_page=1000, max_total=20000):
+        """Fetch the first page, then the remaining pages concurrently"""
+        first = self._fetch_page(0, limit_per_page)
+        records = list(first.get('records', []))
+        if len(records) < limit_per_page:
+            return records
         
-        if state:
-            state_lower = state.lower()
-            filtered = [r for r in filtered if r.get('state', '').lower().find(state_lower) != -1]
+        # The API reports the dataset size; without it, probe up to max_total
+        total = min(int(first.get('total') or max_total), max_total)
+        offsets = range(len(records), total, limit_per_page)
         
-        if district:
-            district_lower = district.lower()
-            filtered = [r for r in filtered if r.get('district', '').lower().find(district_lower) != -1]
+        with ThreadPoolExecutor(max_workers=self.fetch_workers) as pool:
+            pages = pool.map(lambda offset: self._fetch_page(offset, limit_per_page), offsets)
+            for page in pages:
+                records.extend(page.get('records', []))
         
-        return filtered
+        return records[:max_total]
     
-    def filter_by_commodity(self, records, commodity):
-        """Filter records by commodity name"""
-        commodity_lower = commodity.lower()
-        return [r for r in records if r.get('commodity', '').lower().find(commodity_lower) != -1]
+    def _write_snapshot(self, records: list):
+        """Write to a temp file and rename, so readers never see a partial snapshot"""
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'fetched_at': time.time(), 'records': records}, f)
+        os.replace(tmp_path, self.snapshot_path)
+    
+    def _load_snapshot(self):
+        """Load the shared snapshot if it changed on disk since the last load"""
+        try:
+            mtime = os.stat(self.snapshot_path).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._snapshot_mtime:
+            return
+        
+        with self._load_lock:
+            if mtime == self._snapshot_mtime:
+                return
+            try:
+                with open(self.snapshot_path, 'r') as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Error loading market snapshot: {e}")
+                return
+            
+            records = snapshot.get('records', [])
+            store = MarketStore(self.process_market_data(records))
+            self.records, self.store = records, store
+            self.snapshot_time = snapshot.get('fetched_at', 0)
+            self._snapshot_mtime = mtime
+    
+    def current_snapshot(self):
+        """(fetched_at, store) of the snapshot on disk, without triggering a download"""
+        self._load_snapshot()
+        return self.snapshot_time, self.store
+    
+    def get_store(self) -> MarketStore:
+        """Indexed store for the current snapshot (refreshed in the background if stale)"""
+        self.fetch_all_records()
+        return self.store
+    
+    def search_markets(self, state=None, district=None, commodities=None, limit=None):
+        """
+        Look up market prices by location and commodities via the store indexes
+        
+        Args:
+            state: State name (substring match, optional)
+            district: District name (substring match, optional)
+            commodities: Crop ids, aliases or AGMARKNET commodity names (optional)
+            limit: Maximum records to return
+        
+        Returns:
+            (total matching records, processed records up to limit)
+        """
+        store = self.get_store()
+        rows = store.query(state, district, commodities)
+        return len(rows), store.records(rows[:limit] if limit else rows)
     
     def get_nearby_markets(self, state, district, commodities=None):
         """
@@ -91,18 +186,10 @@ class DataGovService:
             commodities: List of commodity names (optional)
         
         Returns:
-            List of market records
+            List of processed market records
         """
-        records = self.fetch_all_records()
-        filtered = self.filter_by_location(records, state, district)
-        
-        if commodities:
-            commodity_records = []
-            for commodity in commodities:
-                commodity_records.extend(self.filter_by_commodity(filtered, commodity))
-            return commodity_records
-        
-        return filtered
+        _, markets = self.search_markets(state, district, commodities)
+        return markets
     
     def normalize_price(self, price_str):
         """Convert price string to float"""
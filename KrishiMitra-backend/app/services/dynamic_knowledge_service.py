@@ -1,52 +1,247 @@
 from duckduckgo_search import DDGS
-import requests
-from bs4 import BeautifulSoup
 from app.services.gemini_service import gemini_service
-import json
+from app.utils.http_client import HostThrottle, http_client
+from app.utils.html_text import extract_text
+from app.utils.locks import file_lock
+from app.utils.cache import build_cache
+from app.services.knowledge_store import KnowledgeStore
+from app.config import Config
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
+from urllib.parse import urlparse
+import codecs
 import os
 import logging
+import re
+import threading
 import time
 
 logger = logging.getLogger(__name__)
 
+SEARCH_HOST = 'duckduckgo.com'
+MAX_SOURCES = 5  # Pages passed to Gemini
+MAX_SOURCE_CHARS = 3000  # Text kept per page
+PENDING_RETRY_SECONDS = 10  # Suggested client retry interval while a fetch runs
+
+
+class KnowledgeFetchPending(Exception):
+    """A fetch for this crop is still running (here or in another worker); ask again later"""
+    
+    def __init__(self, crop_name: str, retry_after: int = PENDING_RETRY_SECONDS):
+        super().__init__(f"Knowledge for '{crop_name}' is still being fetched; try again shortly")
+        self.crop_name = crop_name
+        self.retry_after = retry_after
+
+
 class DynamicKnowledgeService:
     """Service to fetch, structure, and store agricultural data for new crops"""
     
-    def __init__(self, storage_file='app/knowledge/dynamic_knowledge.json'):
-        self.storage_file = storage_file
-        self.dynamic_knowledge = self._load_knowledge()
+    def __init__(self, store_path: str = None, legacy_file: str = 'app/knowledge/dynamic_knowledge.json',
+                 lock_dir: str = None, wait_seconds: float = None, negative_cache=None):
+        self.store_path = store_path or Config.KNOWLEDGE_STORE_PATH  # Shared by all workers on the host
+        self.legacy_file = legacy_file
+        self.lock_dir = lock_dir or Config.DYNAMIC_KNOWLEDGE_LOCK_DIR
+        self.wait_seconds = Config.DYNAMIC_KNOWLEDGE_WAIT_SECONDS if wait_seconds is None else wait_seconds
         
-    def _load_knowledge(self) -> dict:
-        """Load persistent dynamic knowledge from JSON"""
-        if os.path.exists(self.storage_file):
-            try:
-                with open(self.storage_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.error(f"Failed to load dynamic knowledge: {e}")
-                return {}
-        return {}
-    
-    def _save_knowledge(self):
-        """Save dynamic knowledge to JSON"""
-        try:
-            os.makedirs(os.path.dirname(self.storage_file), exist_ok=True)
-            with open(self.storage_file, 'w') as f:
-                json.dump(self.dynamic_knowledge, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            logger.error(f"Failed to save dynamic knowledge: {e}")
-
+        # Local copy of the store, advanced to the store version it reflects
+        self._store = None
+        self._knowledge = {}
+        self._version = 0
+        self._data_version = None
+        self._refresh_lock = threading.Lock()
+        
+        # Single-flight: crop key -> Future of the fetch running in this process
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        
+        # Names whose fetch found nothing: crop key -> {'failures', 'retry_at'}
+        self._negative_cache = negative_cache
+        self.negative_base_ttl = Config.UNKNOWN_CROP_BASE_TTL
+        self.negative_max_ttl = Config.UNKNOWN_CROP_MAX_TTL
+        self._stats_lock = threading.Lock()
+        self.negative_hits = 0
+        self.negative_records = 0
+        self.fetch_attempts = 0
+        
+        # Cold-path fetching: bounded pool, streamed pages, per-host spacing
+        self.fetch_workers = Config.KNOWLEDGE_FETCH_WORKERS
+        self.max_page_bytes = Config.KNOWLEDGE_MAX_PAGE_BYTES
+        self.search_throttle = HostThrottle(Config.KNOWLEDGE_SEARCH_INTERVAL)
+        self.page_throttle = HostThrottle(Config.KNOWLEDGE_HOST_INTERVAL)
+    
+    @property
+    def store(self) -> KnowledgeStore:
+        """Knowledge store, opened on first use (imports the legacy JSON file once)"""
+        if self._store is None:
+            with self._refresh_lock:
+                if self._store is None:
+                    store = KnowledgeStore(self.store_path)
+                    if self.legacy_file:
+                        store.import_json(self.legacy_file)
+                    self._store = store
+        return self._store
+    
+    @property
+    def dynamic_knowledge(self) -> dict:
+        """All stored crops, including those other workers have added since the last look"""
+        self.refresh()
+        return self._knowledge
+    
+    def refresh(self):
+        """Pull only the rows written since this worker's last refresh"""
+        store = self.store
+        data_version = store.data_version()
+        if data_version == self._data_version:
+            return
+        with self._refresh_lock:
+            version, changed = store.changes_since(self._version)
+            if changed:
+                # Replaced rather than mutated so readers iterating the old dict are unaffected
+                self._knowledge = {**self._knowledge, **changed}
+            self._version = version
+            self._data_version = data_version
+    
+    def store_crop(self, crop_key: str, data: dict):
+        """Persist one crop (atomic upsert) and make it visible in this worker"""
+        store = self.store
+        # Under the refresh lock, so a concurrent refresh cannot swap in a dict without this crop
+        # (this connection's own commits leave data_version unchanged, so it would never be re-pulled)
+        with self._refresh_lock:
+            version = store.upsert(crop_key, data)
+            self._knowledge = {**self._knowledge, crop_key: data}
+            if version == self._version + 1:
+                # No other writes in between: skip re-pulling our own row
+                self._version = version
+    
+    @property
+    def negative_cache(self):
+        """Unknown-crop cache, created on first use and shared by workers (disk or Redis)"""
+        if self._negative_cache is None:
+            self._negative_cache = build_cache(
+                'unknown_crops',
+                backend=Config.UNKNOWN_CROP_CACHE_BACKEND,
+                max_entries=Config.UNKNOWN_CROP_CACHE_MAX_ENTRIES,
+                default_ttl=self.negative_max_ttl * 2,  # Keeps the failure count past the backoff window
+                path=Config.UNKNOWN_CROP_CACHE_PATH
+            )
+        return self._negative_cache
+    
+    def is_known_missing(self, crop_key: str) -> bool:
+        """True while a crop name is in its backoff window after a failed fetch"""
+        entry = self.negative_cache.get(crop_key)
+        if entry and time.time() < entry['retry_at']:
+            with self._stats_lock:
+                self.negative_hits += 1
+            return True
+        return False
+    
+    def _record_miss(self, crop_key: str):
+        """Back off exponentially: base TTL, then 2x, 4x, ... up to the max TTL"""
+        entry = self.negative_cache.get(crop_key) or {'failures': 0}
+        failures = entry['failures'] + 1
+        backoff = min(self.negative_max_ttl, self.negative_base_ttl * 2 ** (failures - 1))
+        self.negative_cache.set(crop_key, {'failures': failures, 'retry_at': time.time() + backoff})
+        with self._stats_lock:
+            self.negative_records += 1
+        logger.info(f"No knowledge found for '{crop_key}'; not retrying for {int(backoff)}s")
+    
+    def negative_cache_stats(self) -> dict:
+        """Counters for the unknown-crop cache (this process)"""
+        with self._stats_lock:
+            counters = {
+                'blocked_lookups': self.negative_hits,
+                'recorded_failures': self.negative_records,
+                'fetch_attempts': self.fetch_attempts
+            }
+        return {
+            **self.negative_cache.stats(),
+            **counters,
+            'base_ttl_seconds': self.negative_base_ttl,
+            'max_ttl_seconds': self.negative_max_ttl
+        }
+    
+    def get_stored(self, crop_name: str) -> dict:
+        """Stored knowledge for a crop, without fetching"""
+        return self.dynamic_knowledge.get(crop_name.lower().strip())
+    
     def fetch_and_store(self, crop_name: str) -> dict:
         """
         Fetch data for a new crop from web, structure it, and store it.
         Returns the structured crop data.
+        
+        Concurrent calls for the same crop are coalesced: within a process
+        followers wait on the leader's Future, and across worker processes a
+        per-crop file lock ensures only one of them fetches.
+        
+        Raises:
+            KnowledgeFetchPending: the caller waited wait_seconds and the
+                fetch is still in progress (None means nothing was found)
         """
         crop_key = crop_name.lower().strip()
         
         # Check if already exists in dynamic storage
-        if crop_key in self.dynamic_knowledge:
-            return self.dynamic_knowledge[crop_key]
+        stored = self.get_stored(crop_key)
+        if stored:
+            return stored
+        if self.is_known_missing(crop_key):
+            return None
         
+        with self._inflight_lock:
+            future = self._inflight.get(crop_key)
+            is_leader = future is None
+            if is_leader:
+                future = self._inflight[crop_key] = Future()
+        
+        if not is_leader:
+            try:
+                return future.result(timeout=self.wait_seconds)
+            except FutureTimeoutError:
+                logger.info(f"Knowledge fetch for {crop_name} still in progress")
+                raise KnowledgeFetchPending(crop_name) from None
+        
+        result = None
+        try:
+            result = self._fetch_once_across_workers(crop_name, crop_key)
+        except KnowledgeFetchPending as e:
+            future.set_exception(e)
+            raise
+        finally:
+            if not future.done():
+                future.set_result(result)
+            with self._inflight_lock:
+                self._inflight.pop(crop_key, None)
+        return result
+    
+    def _fetch_once_across_workers(self, crop_name: str, crop_key: str) -> dict:
+        """Fetch under the crop's file lock, or reuse what the lock holder stored"""
+        lock_path = os.path.join(self.lock_dir, f"{re.sub(r'[^a-z0-9]+', '_', crop_key)}.lock")
+        deadline = time.monotonic() + self.wait_seconds
+        
+        while True:
+            with file_lock(lock_path, blocking=False) as acquired:
+                if acquired:
+                    # Another worker may have stored it while we waited for the lock
+                    stored = self.get_stored(crop_key)
+                    if stored:
+                        return stored
+                    if self.is_known_missing(crop_key):
+                        return None
+                    
+                    with self._stats_lock:
+                        self.fetch_attempts += 1
+                    result = self._fetch(crop_name, crop_key)
+                    if result:
+                        self.negative_cache.delete(crop_key)
+                    else:
+                        self._record_miss(crop_key)
+                    return result
+            
+            if time.monotonic() >= deadline:
+                logger.info(f"Knowledge fetch for {crop_name} in progress in another worker")
+                raise KnowledgeFetchPending(crop_name)
+            time.sleep(0.5)
+    
+    def _fetch(self, crop_name: str, crop_key: str) -> dict:
+        """Search, scrape and structure a new crop, then store it"""
         logger.info(f"Fetching data for new crop: {crop_name}")
         
         # 1. Search Web (using DuckDuckGo as it's more robust to bots)
@@ -56,85 +251,103 @@ class DynamicKnowledgeService:
             f"{crop_name} crop diseases and treatment India"
         ]
         
-        raw_text_content = ""
-        urls_visited = []
-        
         try:
-            for query in search_queries:
-                logger.info(f"Searching for: {query}")
-                # Search top results
-                try:
-                    # DDGS().text returns list of dicts {'href': ..., 'title': ..., 'body': ...}
-                    # Use direct instantiation as it worked in debug script
-                    results = list(DDGS().text(query, max_results=3))
-                    logger.info(f"Search query executed, found {len(results)} results.")
-                    time.sleep(2) # Avoid rate limits
-                except Exception as e:
-                    logger.warning(f"Search query '{query}' failed: {e}")
-                    continue
-                
-                count = 0
-                for result in results:
-                    count += 1
-                    url = result.get('href')
-                    logger.info(f"Processing Result {count}: {url}")
-                    
-                    if not url or url in urls_visited:
-                        logger.info("Skipping (duplicate or no URL).")
-                        continue
-                        
-                    try:
-                        # Basic scraping
-                        # Use a timeout and robust headers
-                        logger.info(f"Scraping: {url}...")
-                        response = requests.get(url, timeout=10, headers={
-                            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                        })
-                        logger.info(f"Scrape Status: {response.status_code}")
-                        
-                        if response.status_code == 200:
-                            soup = BeautifulSoup(response.text, 'html.parser')
-                            # Extract useful text: headings and paragraphs
-                            # Remove script and style elements
-                            for script in soup(["script", "style", "nav", "footer", "header"]):
-                                script.extract()
-                                
-                            text = soup.get_text(separator=' ', strip=True)
-                            logger.info(f"Extracted {len(text)} chars from {url}")
-                            
-                            # Limit text length to avoid token limits later
-                            raw_text_content += f"\n\nSource: {url}\n{text[:3000]}" 
-                            urls_visited.append(url)
-                        else:
-                            logger.warning(f"Failed to scrape (Status {response.status_code}): {url}")
-                    except Exception as e:
-                        logger.warning(f"Failed to scrape {url}: {e}")
-                    
-                    if len(urls_visited) >= 5: # Limit total sources
-                        break
-                
-                if len(urls_visited) >= 5:
-                    break
+            sources = self._search_and_scrape(search_queries)
             
-            if not raw_text_content:
+            if not sources:
                 logger.error(f"No content found for {crop_name}. Search might have failed.")
                 return None
-                
+            
+            raw_text_content = ''.join(f"\n\nSource: {url}\n{text}" for url, text in sources)
+            
             # 2. Use Gemini to structure data using proper context
             structured_data = self._process_with_gemini(crop_name, raw_text_content)
             
             if structured_data:
                 # 3. Store in dynamic knowledge
-                self.dynamic_knowledge[crop_key] = structured_data
-                self._save_knowledge()
+                self.store_crop(crop_key, structured_data)
                 return structured_data
-            
+        
         except Exception as e:
             logger.error(f"Error in dynamic knowledge fetch for {crop_name}: {e}")
             return None
-            
+        
         return None
-
+    
+    def _search_and_scrape(self, queries: list) -> list:
+        """
+        Run the searches and page fetches on one bounded pool: pages start
+        downloading as soon as their search returns. Returns up to
+        MAX_SOURCES (url, text) pairs in search-rank order.
+        """
+        with ThreadPoolExecutor(max_workers=self.fetch_workers, thread_name_prefix='knowledge-fetch') as pool:
+            searches = [pool.submit(self._search, index, query) for index, query in enumerate(queries)]
+            pages = {}
+            ranks = {}  # url -> best rank over all queries
+            for search in as_completed(searches):
+                for rank, url in search.result():
+                    if url and url not in ranks:
+                        pages[url] = pool.submit(self._scrape, url)
+                    if url:
+                        ranks[url] = min(rank, ranks.get(url, rank))
+            
+            scraped = sorted((ranks[url], url, page.result()) for url, page in pages.items())
+        
+        return [(url, text) for _, url, text in scraped if text][:MAX_SOURCES]
+    
+    def _search(self, index: int, query: str) -> list:
+        """[((query index, result rank), url)] for one search query"""
+        logger.info(f"Searching for: {query}")
+        try:
+            self.search_throttle.wait(SEARCH_HOST)  # Avoid rate limits
+            # DDGS().text returns list of dicts {'href': ..., 'title': ..., 'body': ...}
+            results = list(DDGS().text(query, max_results=3))
+            logger.info(f"Search query executed, found {len(results)} results.")
+        except Exception as e:
+            logger.warning(f"Search query '{query}' failed: {e}")
+            return []
+        return [((index, rank), result.get('href')) for rank, result in enumerate(results)]
+    
+    def _scrape(self, url: str) -> str:
+        """
+        Stream a page and extract its text, stopping once MAX_SOURCE_CHARS of
+        text or max_page_bytes of HTML have been read
+        """
+        try:
+            self.page_throttle.wait(urlparse(url).netloc)
+            response = http_client.get(url, headers={
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+            }, stream=True)
+        except Exception as e:
+            logger.warning(f"Failed to scrape {url}: {e}")
+            return None
+        
+        try:
+            content_type = response.headers.get('Content-Type', 'text/html')
+            if response.status_code != 200 or not ('html' in content_type or 'text' in content_type):
+                logger.warning(f"Failed to scrape (Status {response.status_code}, {content_type}): {url}")
+                return None
+            
+            decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+            
+            def chunks():
+                remaining = self.max_page_bytes
+                for chunk in response.iter_content(chunk_size=16384):
+                    chunk = chunk[:remaining]
+                    remaining -= len(chunk)
+                    yield decoder.decode(chunk, final=remaining <= 0)
+                    if remaining <= 0:
+                        break
+            
+            text = extract_text(chunks(), max_chars=MAX_SOURCE_CHARS)
+            logger.info(f"Extracted {len(text)} chars from {url}")
+            return text or None
+        except Exception as e:
+            logger.warning(f"Failed to scrape {url}: {e}")
+            return None
+        finally:
+            response.close()  # Drops the rest of the body once we stop reading
+    
     def _process_with_gemini(self, crop_name: str, raw_text: str) -> dict:
         """Process raw text into standard knowledge base structure"""
         prompt = f"""You are an agricultural data scientist. 
@@ -1,33 +1,27 @@
-import google.generativeai as genai
-from app.config import Config
+from app.services.llm_gateway import get_llm_gateway
 import json
 
 class GeminiService:
-    """Service for interacting with Google Gemini AI"""
+    """Service for interacting with Google Gemini AI (calls go through the LLM gateway)"""
     
-    def __init__(self):
-        self.api_key = Config.GEMINI_API_KEY
-        if not self.api_key:
-            raise ValueError("GEMINI_API_KEY not configured")
-        genai.configure(api_key=self.api_key)
-        self.model = genai.GenerativeModel('gemini-pro')
+    def __init__(self, gateway=None):
+        self._gateway = gateway
     
-    def generate_response(self, prompt: str, temperature: float = 0.7) -> str:
+    @property
+    def gateway(self):
+        return self._gateway or get_llm_gateway()
+    
+    def generate_response(self, prompt: str, temperature: float = 0.7, timeout: float = None) -> str:
         """Generate response from Gemini AI"""
-        try:
-            response = self.model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=temperature,
-                )
-            )
-            return response.text
-        except Exception as e:
-            raise Exception(f"Gemini AI error: {str(e)}")
+        return self.gateway.generate(prompt, temperature=temperature, timeout=timeout)
+    
+    def generate_text_response(self, prompt: str, temperature: float = 0.7, timeout: float = None) -> str:
+        """Generate plain text (summaries), stripped of surrounding whitespace"""
+        return self.generate_response(prompt, temperature, timeout).strip()
     
-    def generate_json_response(self, prompt: str, temperature: float = 0.7) -> dict:
+    def generate_json_response(self, prompt: str, temperature: float = 0.7, timeout: float = None) -> dict:
         """Generate JSON response from Gemini AI"""
-        response_text = self.generate_response(prompt, temperature)
+        response_text = self.generate_response(prompt, temperature, timeout)
         
         # Clean markdown code blocks if present
         cleaned = response_text.strip()
@@ -0,0 +1,102 @@
+"""
+Knowledge Store - SQLite (WAL) store for dynamically learned crop knowledge,
+shared by all worker processes on a host.
+
+Each crop is one row, written with an atomic upsert that also bumps a store
+version counter. Workers keep the version they last read and pull only rows
+written after it, and only when PRAGMA data_version says another connection
+has committed since their last look.
+"""
+
+from typing import Dict, Tuple
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class KnowledgeStore:
+    """Per-crop rows keyed by normalized crop name, with a monotonically increasing version"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS crop_knowledge ('
+            'crop_key TEXT PRIMARY KEY, data TEXT NOT NULL, version INTEGER NOT NULL, updated_at REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS ix_crop_knowledge_version ON crop_knowledge (version)')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+        self._conn.execute("INSERT OR IGNORE INTO store_meta (key, value) VALUES ('version', 0)")
+    
+    def data_version(self) -> int:
+        """Changes whenever another connection commits (no table read)"""
+        with self._lock:
+            return self._conn.execute('PRAGMA data_version').fetchone()[0]
+    
+    def version(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT value FROM store_meta WHERE key = 'version'").fetchone()[0]
+    
+    def upsert(self, crop_key: str, data: dict) -> int:
+        """Insert or replace one crop atomically; returns the new store version"""
+        payload = json.dumps(data, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.execute("UPDATE store_meta SET value = value + 1 WHERE key = 'version'")
+                version = self._conn.execute("SELECT value FROM store_meta WHERE key = 'version'").fetchone()[0]
+                self._conn.execute(
+                    'INSERT INTO crop_knowledge (crop_key, data, version, updated_at) VALUES (?, ?, ?, ?) '
+                    'ON CONFLICT (crop_key) DO UPDATE SET '
+                    'data = excluded.data, version = excluded.version, updated_at = excluded.updated_at',
+                    (crop_key, payload, version, time.time())
+                )
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return version
+    
+    def get(self, crop_key: str) -> dict:
+        with self._lock:
+            row = self._conn.execute('SELECT data FROM crop_knowledge WHERE crop_key = ?', (crop_key,)).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def changes_since(self, version: int) -> Tuple[int, Dict[str, dict]]:
+        """(latest version, {crop_key: data}) for rows written after `version`"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT crop_key, data, version FROM crop_knowledge WHERE version > ? ORDER BY version',
+                (version,)
+            ).fetchall()
+        latest = max((row[2] for row in rows), default=version)
+        return latest, {crop_key: json.loads(data) for crop_key, data, _ in rows}
+    
+    def import_json(self, json_path: str) -> int:
+        """One-time migration from the old dynamic_knowledge.json (skips crops already stored)"""
+        if not os.path.exists(json_path):
+            return 0
+        try:
+            with open(json_path, 'r') as f:
+                legacy = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to read legacy knowledge file {json_path}: {e}")
+            return 0
+        
+        imported = 0
+        for crop_key, data in legacy.items():
+            if self.get(crop_key) is None:
+                self.upsert(crop_key, data)
+                imported += 1
+        if imported:
+            logger.info(f"Imported {imported} crops from {json_path} into {self.path}")
+        return imported
@@ -0,0 +1,254 @@
+"""
+LLM Gateway - Every LLM call goes through here: a per-worker concurrency
+cap, a deadline per call, retries with jittered backoff, and token and
+latency accounting. Backends are pluggable; the stub backend is a
+deterministic local stand-in for offline benchmarks and tests.
+"""
+
+from app.config import Config
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+import hashlib
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class LLMError(Exception):
+    """Base error for LLM calls made through the gateway"""
+    pass
+
+
+class LLMTimeoutError(LLMError):
+    """The call's deadline passed (waiting for a slot or for the backend)"""
+    pass
+
+
+class LLMRetryableError(LLMError):
+    """Transient backend failure (rate limit, overload) worth retrying"""
+    pass
+
+
+@dataclass
+class LLMResult:
+    text: str
+    prompt_tokens: int
+    output_tokens: int
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) when the backend reports none"""
+    return max(1, len(text) // 4) if text else 0
+
+
+class GeminiBackend:
+    """Google Gemini via google-generativeai"""
+    
+    name = 'gemini'
+    
+    def __init__(self, api_key: str = None, model_name: str = None):
+        self.api_key = api_key if api_key is not None else Config.GEMINI_API_KEY
+        self.model_name = model_name or Config.LLM_MODEL
+        self._model = None
+    
+    @property
+    def model(self):
+        # A missing key only fails LLM calls, not importing the app
+        if self._model is None:
+            if not self.api_key:
+                raise ValueError("GEMINI_API_KEY not configured")
+            import google.generativeai as genai
+            genai.configure(api_key=self.api_key)
+            self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+    
+    def generate(self, prompt: str, temperature: float) -> LLMResult:
+        import google.generativeai as genai
+        from google.api_core import exceptions as api_exceptions
+        
+        model = self.model
+        try:
+            response = model.generate_content(
+                prompt,
+                generation_config=genai.types.GenerationConfig(temperature=temperature)
+            )
+        except (api_exceptions.ResourceExhausted, api_exceptions.ServiceUnavailable,
+                api_exceptions.InternalServerError, api_exceptions.DeadlineExceeded) as e:
+            raise LLMRetryableError(f"Gemini AI error: {e}") from e
+        except Exception as e:
+            raise LLMError(f"Gemini AI error: {e}") from e
+        
+        text = response.text
+        usage = getattr(response, 'usage_metadata', None)
+        return LLMResult(
+            text=text,
+            prompt_tokens=getattr(usage, 'prompt_token_count', None) or estimate_tokens(prompt),
+            output_tokens=getattr(usage, 'candidates_token_count', None) or estimate_tokens(text)
+        )
+
+
+class StubBackend:
+    """
+    Deterministic local stand-in: the same prompt always gets the same reply
+    and the same simulated latency (base + per prompt token + hash jitter)
+    """
+    
+    name = 'stub'
+    
+    def __init__(self, base_latency_ms: float = None, ms_per_1k_tokens: float = 50.0, jitter_ms: float = None):
+        self.base_latency_ms = Config.LLM_STUB_LATENCY_MS if base_latency_ms is None else base_latency_ms
+        self.ms_per_1k_tokens = ms_per_1k_tokens
+        self.jitter_ms = self.base_latency_ms / 2 if jitter_ms is None else jitter_ms
+    
+    def latency_seconds(self, prompt: str) -> float:
+        digest = int(hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8], 16)
+        jitter = (digest / 0xFFFFFFFF) * self.jitter_ms
+        return (self.base_latency_ms + estimate_tokens(prompt) * self.ms_per_1k_tokens / 1000 + jitter) / 1000
+    
+    def generate(self, prompt: str, temperature: float) -> LLMResult:
+        time.sleep(self.latency_seconds(prompt))
+        digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:12]
+        if 'Return ONLY valid JSON' in prompt:
+            text = f'{{"stub": true, "digest": "{digest}"}}'
+        else:
+            text = f"[stub summary {digest}] Your crop plan looks good; follow the schedule above."
+        return LLMResult(text=text, prompt_tokens=estimate_tokens(prompt), output_tokens=estimate_tokens(text))
+
+
+BACKENDS = {
+    'gemini': GeminiBackend,
+    'stub': StubBackend,
+}
+
+
+class LLMGateway:
+    """
+    Bounded, deadline-aware access to an LLM backend.
+
+    At most max_concurrency backend calls run at once in this process; a
+    call that times out keeps its slot until the backend actually returns,
+    so the cap always reflects real upstream load.
+    """
+    
+    def __init__(self, backend=None, max_concurrency: int = None, timeout: float = None,
+                 max_retries: int = None, backoff: float = None, latency_window: int = 1000):
+        self.backend = backend or BACKENDS[Config.LLM_BACKEND]()
+        self.max_concurrency = max_concurrency or Config.LLM_MAX_CONCURRENCY
+        self.timeout = timeout or Config.LLM_TIMEOUT_SECONDS
+        self.max_retries = Config.LLM_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff = Config.LLM_BACKOFF_SECONDS if backoff is None else backoff
+        
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='llm')
+        self._stats_lock = threading.Lock()
+        self._latencies = deque(maxlen=latency_window)
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+    
+    def generate(self, prompt: str, temperature: float = 0.7, timeout: float = None) -> str:
+        """
+        Generate text within `timeout` seconds (default LLM_TIMEOUT_SECONDS).
+
+        Raises:
+            LLMTimeoutError: if no slot or reply arrives before the deadline
+            LLMError / ValueError: on backend failure after retries
+        """
+        started = time.monotonic()
+        deadline = started + (timeout or self.timeout)
+        attempt = 0
+        
+        while True:
+            try:
+                result = self._attempt(prompt, temperature, deadline)
+                self._record(started, result)
+                return result.text
+            except LLMRetryableError as e:
+                # Full jitter: sleep uniformly up to backoff * 2^attempt, if the deadline allows
+                delay = random.uniform(0, self.backoff * 2 ** attempt)
+                if attempt >= self.max_retries or time.monotonic() + delay >= deadline:
+                    self._record_failure(started)
+                    raise
+                attempt += 1
+                with self._stats_lock:
+                    self.retries += 1
+                logger.warning(f"LLM call failed ({e}); retry {attempt} in {delay:.2f}s")
+                time.sleep(delay)
+            except LLMTimeoutError:
+                with self._stats_lock:
+                    self.timeouts += 1
+                self._record_failure(started)
+                raise
+            except Exception:
+                self._record_failure(started)
+                raise
+    
+    def _attempt(self, prompt: str, temperature: float, deadline: float) -> LLMResult:
+        if not self._slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            raise LLMTimeoutError("Timed out waiting for an LLM slot")
+        
+        try:
+            future = self._executor.submit(self.backend.generate, prompt, temperature)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        
+        try:
+            return future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            raise LLMTimeoutError(f"LLM call exceeded its deadline ({self.backend.name})")
+    
+    def _record(self, started: float, result: LLMResult):
+        with self._stats_lock:
+            self.calls += 1
+            self.prompt_tokens += result.prompt_tokens
+            self.output_tokens += result.output_tokens
+            self._latencies.append(time.monotonic() - started)
+    
+    def _record_failure(self, started: float):
+        with self._stats_lock:
+            self.calls += 1
+            self.failures += 1
+            self._latencies.append(time.monotonic() - started)
+    
+    def stats(self) -> dict:
+        """Call, token and latency counters for this process (latency over the recent window)"""
+        with self._stats_lock:
+            latencies = sorted(self._latencies)
+            
+            def percentile(p):
+                return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 1) if latencies else 0.0
+            
+            return {
+                'backend': self.backend.name,
+                'calls': self.calls,
+                'failures': self.failures,
+                'timeouts': self.timeouts,
+                'retries': self.retries,
+                'prompt_tokens': self.prompt_tokens,
+                'output_tokens': self.output_tokens,
+                'latency_ms': {'p50': percentile(0.50), 'p95': percentile(0.95), 'p99': percentile(0.99)},
+                'max_concurrency': self.max_concurrency
+            }
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Process-wide gateway, created on first use"""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway()
+    return _gateway
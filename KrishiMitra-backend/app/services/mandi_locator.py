@@ -0,0 +1,213 @@
+"""
+Mandi Locator - Nearest-market search over the mandi gazetteer.
+
+Markets are bucketed into a fixed lat/lon grid; a radius query only
+computes (vectorized) haversine distances for markets in the grid cells
+overlapping the query's bounding box, and k-nearest queries widen the
+radius until enough markets are found. AGMARKNET price rows are joined to
+gazetteer entries once per market snapshot, so ranking every market near a
+farmer by net price (modal price minus transport) is a few array operations.
+"""
+
+from app.config import Config
+from app.knowledge.mandi_gazetteer import Mandi, load_gazetteer, normalize_market_name
+from app.utils.geo import EARTH_RADIUS_KM, haversine_km
+from typing import List, Sequence, Tuple
+import math
+import threading
+import numpy as np
+
+KM_PER_DEGREE_LAT = 111.32
+EMPTY_IDS = np.empty(0, dtype=np.int64)
+
+
+class MandiIndex:
+    """Grid-bucketed spatial index over mandi coordinates"""
+    
+    def __init__(self, mandis: Sequence[Mandi], cell_degrees: float = 0.5):
+        self.mandis = list(mandis)
+        self.cell_degrees = cell_degrees
+        self.lats = np.array([m.latitude for m in self.mandis], dtype=np.float64)
+        self.lons = np.array([m.longitude for m in self.mandis], dtype=np.float64)
+        
+        # (row, col) grid cell -> mandi ids
+        buckets = {}
+        for mandi_id, cell in enumerate(zip(self._cell(self.lats), self._cell(self.lons))):
+            buckets.setdefault(cell, []).append(mandi_id)
+        self.cells = {cell: np.array(ids, dtype=np.int64) for cell, ids in buckets.items()}
+    
+    def __len__(self):
+        return len(self.mandis)
+    
+    def _cell(self, degrees):
+        return np.floor(np.asarray(degrees) / self.cell_degrees).astype(np.int64).tolist()
+    
+    def within(self, lat: float, lon: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """(mandi ids, distances in km) within radius_km, nearest first"""
+        dlat = radius_km / KM_PER_DEGREE_LAT
+        dlon = radius_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(min(abs(lat) + dlat, 89.0))), 0.01))
+        rows = range(math.floor((lat - dlat) / self.cell_degrees), math.floor((lat + dlat) / self.cell_degrees) + 1)
+        cols = range(math.floor((lon - dlon) / self.cell_degrees), math.floor((lon + dlon) / self.cell_degrees) + 1)
+        
+        if len(rows) * len(cols) > len(self.cells):
+            candidates = np.arange(len(self.mandis), dtype=np.int64)
+        else:
+            found = [self.cells[(row, col)] for row in rows for col in cols if (row, col) in self.cells]
+            candidates = np.concatenate(found) if found else EMPTY_IDS
+        
+        distances = haversine_km(lat, lon, self.lats[candidates], self.lons[candidates])
+        inside = distances <= radius_km
+        candidates, distances = candidates[inside], distances[inside]
+        order = np.argsort(distances, kind='stable')
+        return candidates[order], distances[order]
+    
+    def nearest(self, lat: float, lon: float, k: int,
+                max_radius_km: float = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(mandi ids, distances in km) of the k nearest mandis, optionally within max_radius_km"""
+        k = min(k, len(self.mandis))
+        if k <= 0:
+            return EMPTY_IDS, np.empty(0)
+        
+        # Widen the search until k mandis are in range (half the globe covers everything)
+        max_radius_km = max_radius_km or math.pi * EARTH_RADIUS_KM
+        radius = min(50.0, max_radius_km)
+        while radius < max_radius_km:
+            ids, distances = self.within(lat, lon, radius)
+            if len(ids) >= k:
+                return ids[:k], distances[:k]
+            radius *= 2
+        
+        ids, distances = self.within(lat, lon, max_radius_km)
+        return ids[:k], distances[:k]
+
+
+class MandiLocator:
+    """Gazetteer lookups, nearest-mandi search and net-price ranking of live market rows"""
+    
+    def __init__(self, gazetteer_path: str = None, transport_cost_per_km: float = None):
+        self.gazetteer_path = gazetteer_path if gazetteer_path is not None else Config.MANDI_GAZETTEER_PATH
+        self.transport_cost_per_km = (Config.TRANSPORT_COST_PER_KM_QUINTAL if transport_cost_per_km is None
+                                      else transport_cost_per_km)
+        self._index = None
+        self._by_market = None
+        self._row_mandis = (None, None)  # (market store, mandi id per store row)
+        self._lock = threading.Lock()
+    
+    @property
+    def index(self) -> MandiIndex:
+        # Built on first use so importing the service reads no files
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    mandis = load_gazetteer(self.gazetteer_path)
+                    by_market = {}
+                    for mandi_id, mandi in enumerate(mandis):
+                        by_market[(normalize_market_name(mandi.state), normalize_market_name(mandi.market))] = mandi_id
+                        by_market.setdefault(('', normalize_market_name(mandi.market)), mandi_id)
+                    self._by_market = by_market
+                    self._index = MandiIndex(mandis)
+        return self._index
+    
+    def locate(self, state: str, district: str, market: str) -> int:
+        """
+        Gazetteer id for an AGMARKNET market, or -1 if unknown. Tries the exact
+        market name, then its name without the "(...)" suffix, then the
+        district headquarters' market.
+        """
+        self.index  # builds the name lookup on first use
+        state_key = normalize_market_name(state)
+        for name in (market, str(market or '').split('(')[0], district):
+            key = normalize_market_name(name)
+            if not key:
+                continue
+            for lookup in ((state_key, key), ('', key)):
+                if lookup in self._by_market:
+                    return self._by_market[lookup]
+        return -1
+    
+    def nearest_mandis(self, lat: float, lon: float, k: int = 10, radius_km: float = None) -> List[dict]:
+        """The k nearest gazetteer mandis (optionally within radius_km), nearest first"""
+        ids, distances = self.index.nearest(lat, lon, k, radius_km)
+        return [self._mandi_dict(mandi_id, distance) for mandi_id, distance in zip(ids, distances)]
+    
+    def _mandi_dict(self, mandi_id: int, distance: float) -> dict:
+        mandi = self.index.mandis[mandi_id]
+        return {
+            'state': mandi.state,
+            'district': mandi.district,
+            'market': mandi.market,
+            'latitude': mandi.latitude,
+            'longitude': mandi.longitude,
+            'distance_km': round(float(distance), 1)
+        }
+    
+    def _mandi_ids_for(self, store) -> np.ndarray:
+        """Gazetteer id for every row of a market store (memoized per snapshot)"""
+        cached_store, ids = self._row_mandis
+        if cached_store is store:
+            return ids
+        
+        by_name = {}
+        ids = np.empty(len(store), dtype=np.int64)
+        columns = zip(store.text['state'], store.text['district'], store.text['market'])
+        for row, name in enumerate(columns):
+            if name not in by_name:
+                by_name[name] = self.locate(*name)
+            ids[row] = by_name[name]
+        self._row_mandis = (store, ids)
+        return ids
+    
+    def rank_markets(self, store, lat: float, lon: float, commodities: List[str] = None,
+                     radius_km: float = None, limit: int = 20, state: str = None,
+                     district: str = None) -> List[dict]:
+        """
+        Market price rows within radius_km of a farmer, best net price first
+
+        Args:
+            store: MarketStore snapshot of AGMARKNET records
+            lat, lon: Farmer location
+            commodities: Commodity filters (substring match, optional)
+            radius_km: Search radius (default MANDI_SEARCH_RADIUS_KM)
+            limit: Maximum rows returned
+            state, district: Optional extra filters (substring match)
+
+        Returns:
+            Processed market records with location, distance_km,
+            transport_cost and net_price added
+        """
+        radius_km = radius_km or Config.MANDI_SEARCH_RADIUS_KM
+        
+        # Distance to every mandi in range; the rest stay at infinity
+        ids, distances = self.index.within(lat, lon, radius_km)
+        mandi_distance = np.full(len(self.index), np.inf)
+        mandi_distance[ids] = distances
+        
+        rows = store.query(state, district, commodities)
+        row_mandis = self._mandi_ids_for(store)[rows]
+        located = row_mandis >= 0
+        rows, row_mandis = rows[located], row_mandis[located]
+        row_distance = mandi_distance[row_mandis]
+        in_range = np.isfinite(row_distance)
+        rows, row_mandis, row_distance = rows[in_range], row_mandis[in_range], row_distance[in_range]
+        
+        transport = row_distance * self.transport_cost_per_km
+        net_price = store.prices['modal_price'][rows] - transport
+        order = np.argsort(-net_price, kind='stable')[:limit]
+        
+        ranked = []
+        for record, mandi_id, distance, cost, net in zip(store.records(rows[order]), row_mandis[order],
+                                                        row_distance[order], transport[order], net_price[order]):
+            mandi = self.index.mandis[mandi_id]
+            record.update({
+                'latitude': mandi.latitude,
+                'longitude': mandi.longitude,
+                'distance_km': round(float(distance), 1),
+                'transport_cost': int(cost),
+                'net_price': int(net)
+            })
+            ranked.append(record)
+        return ranked
+
+
+# Singleton instance
+mandi_locator = MandiLocator()
@@ -0,0 +1,135 @@
+"""
+Market Store - Columnar, indexed snapshot of AGMARKNET price records.
+
+Records are ingested once per refresh: prices are parsed into float arrays and
+state, district and commodity get hash indexes on their normalized values, so
+location/commodity filters are index lookups instead of full scans. Rows are
+also indexed by canonical commodity id (see commodity_aliases), so a
+commodity filter given as a crop id, Marathi name or AGMARKNET name is a
+single dict lookup.
+"""
+
+from app.knowledge.commodity_aliases import canonical_commodity, query_commodity
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+
+INDEXED_FIELDS = ('state', 'district', 'commodity')
+TEXT_FIELDS = ('state', 'district', 'market', 'commodity', 'variety', 'arrival_date')
+PRICE_FIELDS = ('min_price', 'max_price', 'modal_price')
+
+EMPTY_ROWS = np.empty(0, dtype=np.int64)
+
+
+def normalize_key(value) -> str:
+    return str(value or '').lower().strip()
+
+
+class MarketStore:
+    """Immutable columnar store built from processed market records"""
+    
+    def __init__(self, records: Iterable[dict] = ()):
+        records = list(records)
+        self.size = len(records)
+        
+        self.text = {field: np.array([r.get(field, '') for r in records], dtype=object)
+                     for field in TEXT_FIELDS}
+        self.prices = {field: np.array([r.get(field, 0.0) for r in records], dtype=np.float64)
+                       for field in PRICE_FIELDS}
+        
+        # normalized value -> sorted row ids
+        self.indexes = {field: self._build_index(self.text[field]) for field in INDEXED_FIELDS}
+        self.commodity_ids = self._build_commodity_ids(self.indexes['commodity'])
+        self._lookups = {}
+    
+    def __len__(self):
+        return self.size
+    
+    @staticmethod
+    def _build_index(column: np.ndarray) -> Dict[str, np.ndarray]:
+        buckets = {}
+        for row, value in enumerate(column):
+            buckets.setdefault(normalize_key(value), []).append(row)
+        return {key: np.array(rows, dtype=np.int64) for key, rows in buckets.items()}
+    
+    @staticmethod
+    def _build_commodity_ids(commodity_index: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """canonical commodity id -> sorted row ids (resolved once per distinct commodity)"""
+        groups = {}
+        for key, rows in commodity_index.items():
+            groups.setdefault(canonical_commodity(key), []).append(rows)
+        return {commodity_id: rows[0] if len(rows) == 1 else np.sort(np.concatenate(rows))
+                for commodity_id, rows in groups.items()}
+    
+    def rows_for_commodity(self, commodity: str) -> Optional[np.ndarray]:
+        """
+        Row ids for a commodity given as a crop id, alias or AGMARKNET name
+        ("tur", "तूर" and "Arhar (Tur/Red Gram)(Whole)" match the same rows;
+        "Arhar Dal(Tur Dal)" rows are "tur dal"). Returns None when `commodity` is empty (no filter).
+        """
+        commodity_id = query_commodity(commodity)
+        if not commodity_id:
+            return None
+        return self.commodity_ids.get(commodity_id, EMPTY_ROWS)
+    
+    def rows_matching(self, field: str, needle: str) -> Optional[np.ndarray]:
+        """
+        Row ids whose `field` contains `needle` (case-insensitive).
+
+        Only the distinct keys (hundreds, not the 20k rows) are scanned for the
+        substring, which keeps the original "contains" semantics; results are
+        memoized since the store never changes after ingest.
+        Returns None when `needle` is empty (no filter).
+        """
+        needle = normalize_key(needle)
+        if not needle:
+            return None
+        
+        cache_key = (field, needle)
+        if cache_key not in self._lookups:
+            index = self.indexes[field]
+            matches = [rows for key, rows in index.items() if needle in key]
+            if not matches:
+                self._lookups[cache_key] = EMPTY_ROWS
+            elif len(matches) == 1:
+                self._lookups[cache_key] = matches[0]
+            else:
+                self._lookups[cache_key] = np.sort(np.concatenate(matches))
+        return self._lookups[cache_key]
+    
+    def query(self, state: str = None, district: str = None,
+              commodities: List[str] = None) -> np.ndarray:
+        """
+        Row ids for a location filtered by any of the commodities, in ingestion order.
+
+        Location filters are substring matches; commodities are matched by
+        canonical id. Results are grouped per commodity in the order
+        requested, like the previous list-based filters.
+        """
+        location_rows = None
+        for field, needle in (('state', state), ('district', district)):
+            rows = self.rows_matching(field, needle)
+            if rows is None:
+                continue
+            location_rows = rows if location_rows is None else np.intersect1d(location_rows, rows, assume_unique=True)
+        
+        if location_rows is None:
+            location_rows = np.arange(self.size, dtype=np.int64)
+        
+        if not commodities:
+            return location_rows
+        
+        groups = []
+        for commodity in commodities:
+            rows = self.rows_for_commodity(commodity)
+            groups.append(location_rows if rows is None else np.intersect1d(location_rows, rows, assume_unique=True))
+        return np.concatenate(groups) if groups else EMPTY_ROWS
+    
+    def records(self, row_ids: np.ndarray) -> List[dict]:
+        """Materialize row ids into processed record dicts"""
+        return [
+            {
+                **{field: self.text[field][row] for field in TEXT_FIELDS},
+                **{field: float(self.prices[field][row]) for field in PRICE_FIELDS}
+            }
+            for row in row_ids
+        ]
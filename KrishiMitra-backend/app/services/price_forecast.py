@@ -0,0 +1,423 @@
+"""
+Price Forecast - Seasonal price forecasts from stored market price history.
+
+Every (commodity, state, district) series, plus its state and national
+aggregates, is fitted in one vectorized batch:
+- a monthly seasonal profile: the series' own month effects, shrunk
+  toward the crop calendar's peak/off-season prior;
+- a damped linear trend on the last TREND_DAYS of deseasonalized log prices.
+
+The fitted parameters are cached per MODEL_VERSION and data version.
+After that, forecasting one crop, or every crop in a district at once, is
+a few array operations.
+"""
+
+from app import db
+from app.config import Config
+from app.knowledge import crop_knowledge_base as kb
+from app.knowledge.commodity_aliases import query_commodity, resolve_crop
+from app.models import MarketPriceHistory
+from datetime import date, timedelta
+from flask import has_app_context
+from sqlalchemy import func
+from typing import Dict, List, Optional, Sequence
+import logging
+import math
+import threading
+import time
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Bump when the fitting procedure changes so cached parameters are refitted
+MODEL_VERSION = 1
+
+HORIZONS = {'1_week': 7, '2_weeks': 14, '1_month': 30}
+DAYS_PER_YEAR = 365.2425
+DAYS_PER_MONTH = DAYS_PER_YEAR / 12
+EPOCH = date(1970, 1, 1)
+
+TREND_DAYS = 60          # trend and level are fitted on this recent window
+LEVEL_HALF_LIFE = 7.0    # days; weight of older days in that fit halves this often
+MIN_OBSERVATIONS = 8     # trading days a series needs before it is used
+STALE_DAYS = 30          # series with no quote this recent fall back to a wider region
+PRIOR_STRENGTH = 60.0    # days of data per month that weigh as much as the calendar prior
+TREND_DAMPING = 0.97     # per-day damping: a trend adds at most ~32 days' worth
+MAX_DAILY_TREND = 0.01   # |trend| cap, log price per day
+DRIFT_VOLATILITY = 0.01  # unmodelled level drift, log price per sqrt(day)
+PRIOR_SIGMA = 0.08       # log-price uncertainty of the calendar-only forecast
+Z_80 = 1.2816            # confidence = 100 minus the 80% interval's upper width in %
+LEVELS = ('district', 'state', 'national')
+
+
+def to_day(value: date) -> int:
+    """Days since 1970-01-01"""
+    return (value - EPOCH).days
+
+
+def seasonal_prior(crop_data: Optional[dict]) -> np.ndarray:
+    """Month effects on log price (12, mean zero) from a crop's market calendar"""
+    profile = np.zeros(12)
+    calendar = (crop_data or {}).get('market_calendar') or {}
+    avg = calendar.get('avg_price_per_quintal', calendar.get('avg_price_per_ton'))
+    variation = calendar.get('price_variation') or {}
+    peak_months = [m for m in calendar.get('peak_demand_months', []) if 1 <= m <= 12]
+    if not avg or not peak_months or not variation:
+        return profile
+    
+    profile[:] = math.log(variation.get('off_season', avg) / avg)
+    profile[np.array(peak_months) - 1] = math.log(variation.get('peak', avg) / avg)
+    return profile - profile.mean()
+
+
+def seasonal_at(profiles: np.ndarray, days: np.ndarray) -> np.ndarray:
+    """
+    Month effects of profiles[i] at days[i] (a day or a row of days each).
+    Effects sit at mid-month and are joined linearly, wrapping at year end.
+    """
+    days = np.asarray(days, dtype=np.float64)
+    flat = days.ndim == 1
+    if flat:
+        days = days[:, None]
+    
+    # Day 0 (1970-01-01) is the first day of a year
+    position = np.mod(days, DAYS_PER_YEAR) / DAYS_PER_MONTH - 0.5
+    lower = np.floor(position)
+    weight = position - lower
+    first = lower.astype(np.int64) % 12
+    second = (first + 1) % 12
+    values = (np.take_along_axis(profiles, first, axis=1) * (1 - weight)
+              + np.take_along_axis(profiles, second, axis=1) * weight)
+    return values[:, 0] if flat else values
+
+
+def damped(horizon: np.ndarray) -> np.ndarray:
+    """Effective number of trend days after `horizon` days of damping"""
+    horizon = np.maximum(horizon, 0)
+    return TREND_DAMPING * (1 - TREND_DAMPING ** horizon) / (1 - TREND_DAMPING)
+
+
+def confidence(sd: np.ndarray) -> np.ndarray:
+    return np.clip(np.round(100 * (2 - np.exp(Z_80 * sd))), 20, 95).astype(np.int64)
+
+
+class SeasonalModel:
+    """
+    Fitted parameters for a batch of price series. Arrays are indexed by
+    series id; keys[i] is (canonical commodity id, state, district), state
+    and district in lower case and '' for the state and national aggregates.
+    """
+    
+    def __init__(self, keys: List[tuple], level, trend, profiles, last_day, observations,
+                 sigma, effective_count, window_center, window_sxx):
+        self.keys = keys
+        self.index = {key: series_id for series_id, key in enumerate(keys)}
+        self.level = level
+        self.trend = trend
+        self.profiles = profiles
+        self.last_day = last_day
+        self.observations = observations
+        self.sigma = sigma
+        self.effective_count = effective_count
+        self.window_center = window_center
+        self.window_sxx = window_sxx
+    
+    def __len__(self):
+        return len(self.keys)
+    
+    @classmethod
+    def fit(cls, keys: List[tuple], series_ids: np.ndarray, days: np.ndarray, prices: np.ndarray,
+            priors: np.ndarray) -> 'SeasonalModel':
+        """
+        Fit every series at once
+
+        Args:
+            keys: Series keys, one per series id
+            series_ids, days, prices: One row per series per trading day
+            priors: (series, 12) calendar month effects to shrink toward
+        """
+        n = len(keys)
+        sid = np.asarray(series_ids, dtype=np.int64)
+        days = np.asarray(days, dtype=np.int64)
+        y = np.log(np.asarray(prices, dtype=np.float64))
+        
+        def total(values, ids=sid):
+            return np.bincount(ids, weights=values, minlength=n)
+        
+        count = np.bincount(sid, minlength=n)
+        safe_count = np.maximum(count, 1)
+        first_day = np.full(n, np.iinfo(np.int64).max)
+        last_day = np.full(n, np.iinfo(np.int64).min)
+        np.minimum.at(first_day, sid, days)
+        np.maximum.at(last_day, sid, days)
+        
+        # Month effects: residuals from the series mean, or from its
+        # long-run trend once a full year is available to separate the two
+        centered = days - (total(days) / safe_count)[sid]
+        y_mean = total(y) / safe_count
+        sxx = total(centered * centered)
+        sxy = total(centered * (y - y_mean[sid]))
+        long_trend = np.where((last_day - first_day >= 365) & (sxx > 0), sxy / np.where(sxx > 0, sxx, 1), 0.0)
+        residual = y - y_mean[sid] - long_trend[sid] * centered
+        
+        months = days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64) % 12
+        cell = sid * 12 + months
+        month_count = np.bincount(cell, minlength=n * 12).reshape(n, 12).astype(np.float64)
+        month_effect = np.bincount(cell, weights=residual, minlength=n * 12).reshape(n, 12) / np.maximum(month_count, 1)
+        
+        # Line the observed months up with the prior before blending, since
+        # a partial year's effects are centered on the months it covers
+        offset = ((month_effect - priors) * month_count).sum(axis=1) / np.maximum(month_count.sum(axis=1), 1)
+        profiles = ((month_count * (month_effect - offset[:, None]) + PRIOR_STRENGTH * priors)
+                    / (month_count + PRIOR_STRENGTH))
+        profiles -= profiles.mean(axis=1, keepdims=True)
+        
+        # Level and trend of the deseasonalized series: least squares over
+        # the recent window, weighted toward the latest days
+        deseasonalized = y - seasonal_at(profiles[sid], days)
+        recent = days >= last_day[sid] - TREND_DAYS
+        wid = sid[recent]
+        wt = (days[recent] - last_day[wid]).astype(np.float64)
+        wr = deseasonalized[recent]
+        w = 0.5 ** (-wt / LEVEL_HALF_LIFE)
+        weight = total(w, wid)
+        safe_weight = np.where(weight > 0, weight, 1)
+        window_count = np.bincount(wid, minlength=n)
+        effective_count = np.maximum(weight ** 2 / np.where(weight > 0, total(w * w, wid), 1), 1)
+        window_center = total(w * wt, wid) / safe_weight
+        wr_mean = total(w * wr, wid) / safe_weight
+        dt = wt - window_center[wid]
+        window_sxx = total(w * dt * dt, wid)
+        has_trend = (window_count >= MIN_OBSERVATIONS) & (window_sxx > 0)
+        trend = np.where(has_trend, total(w * dt * (wr - wr_mean[wid]), wid) / np.where(has_trend, window_sxx, 1), 0.0)
+        trend = np.clip(trend, -MAX_DAILY_TREND, MAX_DAILY_TREND)
+        level = wr_mean - trend * window_center
+        
+        errors = wr - level[wid] - trend[wid] * wt
+        parameters = np.where(has_trend, 2, 1)
+        variance = total(w * errors * errors, wid) / safe_weight * effective_count / np.maximum(effective_count - parameters, 1)
+        sigma = np.where(window_count >= 3, np.sqrt(variance), PRIOR_SIGMA)
+        
+        return cls(keys, level, trend, profiles, last_day, count, sigma, effective_count, window_center,
+                   np.where(has_trend, window_sxx / safe_weight * effective_count, np.inf))
+    
+    @classmethod
+    def calendar_only(cls, key: tuple, prior: np.ndarray, average_price: float, day: int) -> 'SeasonalModel':
+        """A single series with no history: the calendar's seasonality around average_price"""
+        return cls([key], np.array([math.log(average_price)]), np.zeros(1), prior.reshape(1, 12),
+                   np.array([day]), np.zeros(1, dtype=np.int64),
+                   np.array([PRIOR_SIGMA]), np.ones(1, dtype=np.int64), np.zeros(1), np.array([np.inf]))
+    
+    def predict(self, ids: np.ndarray, days: np.ndarray):
+        """
+        Log-price means and standard deviations for series ids[i] at days[i, :]
+
+        Returns:
+            (mean, sd) arrays shaped like days
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        days = np.asarray(days, dtype=np.float64)
+        horizon = days - self.last_day[ids][:, None]
+        effective = damped(horizon)
+        
+        mean = (self.level[ids][:, None] + self.trend[ids][:, None] * effective
+                + seasonal_at(self.profiles[ids], days))
+        # OLS prediction interval for the trend line plus random drift
+        sigma = self.sigma[ids][:, None]
+        leverage = (effective - self.window_center[ids][:, None]) ** 2 / self.window_sxx[ids][:, None]
+        variance = (sigma ** 2 * (1 + 1 / self.effective_count[ids][:, None] + leverage)
+                    + DRIFT_VOLATILITY ** 2 * np.maximum(horizon, 0))
+        return mean, np.sqrt(variance)
+
+
+class PriceForecastService:
+    """Batch-fitted seasonal forecasts over market_price_history (fits need an app context)"""
+    
+    def __init__(self, history_days: int = None):
+        self.history_days = Config.PRICE_FORECAST_HISTORY_DAYS if history_days is None else history_days
+        self._fitted = (None, None)  # (cache key, SeasonalModel)
+        self._lock = threading.Lock()
+    
+    def model(self, today: date = None) -> SeasonalModel:
+        """Fitted model for `today`, refitted only when the model version or the stored data changes"""
+        today = today or date.today()
+        # Price history is append-only, so the newest row id versions the data
+        last_id = db.session.query(func.max(MarketPriceHistory.id)).scalar()
+        key = (MODEL_VERSION, today, last_id)
+        
+        cached_key, model = self._fitted
+        if cached_key == key:
+            return model
+        with self._lock:
+            if self._fitted[0] != key:
+                started = time.monotonic()
+                model = self._fit(today)
+                self._fitted = (key, model)
+                logger.info(f"Price forecast model v{MODEL_VERSION}: {len(model)} series fitted "
+                            f"in {(time.monotonic() - started) * 1000:.0f}ms")
+            return self._fitted[1]
+    
+    def _fit(self, today: date) -> SeasonalModel:
+        query = db.session.query(
+            MarketPriceHistory.commodity_id,
+            MarketPriceHistory.state,
+            MarketPriceHistory.district,
+            MarketPriceHistory.arrival_date,
+            func.avg(MarketPriceHistory.modal_price),
+            func.count(MarketPriceHistory.id)
+        ).filter(
+            MarketPriceHistory.arrival_date > today - timedelta(days=self.history_days),
+            MarketPriceHistory.arrival_date <= today
+        ).group_by(
+            MarketPriceHistory.commodity_id, MarketPriceHistory.state,
+            MarketPriceHistory.district, MarketPriceHistory.arrival_date
+        )
+        rows = query.all()
+        if not rows:
+            return SeasonalModel.fit([], [], [], [], np.zeros((0, 12)))
+        commodities, states, districts, arrival_dates, modal_prices, counts = zip(*rows)
+        
+        # One row per (series, day) at each level: district rows as stored,
+        # state and national rows averaged over their districts' quotes
+        triples = {}
+        triple_ids = np.array([triples.setdefault(triple, len(triples))
+                               for triple in zip(commodities, states, districts)], dtype=np.int64)
+        keys, key_ids = [], {}
+        triple_keys = np.empty((len(triples), len(LEVELS)), dtype=np.int64)
+        for triple_id, (commodity, state, district) in enumerate(triples):
+            state, district = state.lower().strip(), district.lower().strip()
+            for level_index, key in enumerate(((commodity, state, district), (commodity, state, ''), (commodity, '', ''))):
+                if key not in key_ids:
+                    key_ids[key] = len(keys)
+                    keys.append(key)
+                triple_keys[triple_id, level_index] = key_ids[key]
+        row_keys = triple_keys[triple_ids]
+        
+        days = np.array([value.toordinal() for value in arrival_dates], dtype=np.int64) - EPOCH.toordinal()
+        weights = np.array(counts, dtype=np.float64)
+        weighted_prices = np.array(modal_prices, dtype=np.float64) * weights
+        
+        series_days = (row_keys * (to_day(today) + 1) + days[:, None]).ravel()
+        cells, inverse = np.unique(series_days, return_inverse=True)
+        quotes = np.bincount(inverse, weights=np.repeat(weights, len(LEVELS)), minlength=len(cells))
+        prices = np.bincount(inverse, weights=np.repeat(weighted_prices, len(LEVELS)), minlength=len(cells)) / quotes
+        series_ids, cell_days = np.divmod(cells, to_day(today) + 1)
+        
+        priors = np.array([seasonal_prior(kb.CROP_DATABASE.get(key[0])) for key in keys]).reshape(-1, 12)
+        return SeasonalModel.fit(keys, series_ids, cell_days, prices, priors)
+    
+    def _usable(self, model: SeasonalModel, today: date) -> np.ndarray:
+        return (model.observations >= MIN_OBSERVATIONS) & (model.last_day >= to_day(today) - STALE_DAYS)
+    
+    def _find_series(self, model: SeasonalModel, crop_name: str, state: str, district: str, today: date):
+        """(series id, level) of the narrowest usable series for a crop, or (None, None)"""
+        commodity_id = query_commodity(crop_name)
+        usable = self._usable(model, today)
+        state, district = (state or '').lower().strip(), (district or '').lower().strip()
+        
+        for level in LEVELS:
+            if level == 'district' and not (state and district):
+                continue
+            if level == 'state' and not state:
+                continue
+            wanted = {'district': (state, district), 'state': (state, ''), 'national': ('', '')}[level]
+            series_id = model.index.get((commodity_id,) + wanted)
+            if series_id is not None and usable[series_id]:
+                return series_id, level
+        return None, None
+    
+    def forecast(self, crop_name: str, targets: Sequence[date], current_price: float = None,
+                 average_price: float = None, state: str = None, district: str = None,
+                 crop_data: dict = None, today: date = None) -> Optional[dict]:
+        """
+        Forecast one crop's price at the target dates
+
+        Uses the narrowest region with enough recent history (district,
+        state, then national). Without stored history, or outside an app
+        context, the crop calendar's seasonality around average_price is
+        used. A given current_price (observed today) re-anchors the curve.
+
+        Returns:
+            {prices, confidence, current_price, basis, observations,
+            model_version}, or None with no history and no price given
+        """
+        today = today or date.today()
+        model, series_id, basis = None, None, 'seasonal_prior'
+        if has_app_context():
+            model = self.model(today)
+            series_id, level = self._find_series(model, crop_name, state, district, today)
+            basis = level or basis
+        
+        if series_id is None:
+            if not (current_price or average_price):
+                return None
+            prior = seasonal_prior(crop_data if crop_data is not None else kb.CROP_DATABASE.get(resolve_crop(crop_name)))
+            model = SeasonalModel.calendar_only((crop_name, '', ''), prior, average_price or current_price, to_day(today))
+            series_id = 0
+        
+        days = np.array([[to_day(today)] + [to_day(target) for target in targets]], dtype=np.float64)
+        mean, sd = model.predict(np.array([series_id]), days)
+        if current_price:
+            mean = mean - mean[0, 0] + math.log(current_price)
+        prices = np.exp(mean[0])
+        
+        return {
+            'prices': [round(float(price), 2) for price in prices[1:]],
+            'confidence': confidence(sd[0, 1:]).tolist(),
+            'current_price': round(float(prices[0]), 2),
+            'basis': basis,
+            'observations': int(model.observations[series_id]),
+            'model_version': MODEL_VERSION
+        }
+    
+    def forecast_district(self, state: str, district: str, horizons: Dict[str, int] = None,
+                          today: date = None) -> List[dict]:
+        """
+        Forecasts for every commodity with usable history in a district,
+        computed in one batch
+
+        Returns:
+            [{commodity, crop, current_price, last_observed, observations,
+            forecasts: {label: {date, price, change_percent, confidence}}}]
+        """
+        horizons = horizons or HORIZONS
+        today = today or date.today()
+        model = self.model(today)
+        wanted = ((state or '').lower().strip(), (district or '').lower().strip())
+        usable = self._usable(model, today)
+        ids = np.array([series_id for series_id, key in enumerate(model.keys)
+                        if key[1:] == wanted and usable[series_id]], dtype=np.int64)
+        if not len(ids):
+            return []
+        
+        offsets = np.array([0] + list(horizons.values()))
+        days = np.broadcast_to(to_day(today) + offsets, (len(ids), len(offsets)))
+        mean, sd = model.predict(ids, days)
+        prices = np.exp(mean)
+        change = (prices[:, 1:] / prices[:, :1] - 1) * 100
+        scores = confidence(sd[:, 1:])
+        
+        results = []
+        for row, series_id in enumerate(ids):
+            commodity = model.keys[series_id][0]
+            results.append({
+                'commodity': commodity,
+                'crop': commodity if commodity in kb.CROP_DATABASE else None,
+                'current_price': round(float(prices[row, 0]), 2),
+                'last_observed': str(EPOCH + timedelta(days=int(model.last_day[series_id]))),
+                'observations': int(model.observations[series_id]),
+                'forecasts': {
+                    label: {
+                        'date': str(today + timedelta(days=int(offset))),
+                        'price': round(float(prices[row, column + 1]), 2),
+                        'change_percent': round(float(change[row, column]), 1),
+                        'confidence': int(scores[row, column])
+                    }
+                    for column, (label, offset) in enumerate(horizons.items())
+                }
+            })
+        return sorted(results, key=lambda item: item['commodity'])
+
+
+# Singleton instance
+price_forecast_service = PriceForecastService()
@@ -0,0 +1,278 @@
+"""
+Price History - Persistent AGMARKNET prices.
+
+Each market snapshot is ingested incrementally into market_price_history:
+only quotes near or after the newest stored arrival date are considered,
+and rows are batch-inserted (executemany) with ON CONFLICT DO NOTHING on
+(market, commodity, variety, arrival_date), so re-ingesting a snapshot is
+a no-op. Each row stores its canonical commodity id, so queries filter on
+one indexed column. They aggregate per day in SQL and build weekly/monthly
+OHLC and rolling statistics with NumPy.
+"""
+
+from app import db
+from app.config import Config
+from app.knowledge.commodity_aliases import canonical_commodity, query_commodity
+from app.models import MarketPriceHistory
+from app.utils.locks import file_lock
+from datetime import date, datetime, timedelta
+from flask import has_app_context
+from sqlalchemy import func
+from typing import Dict, Iterable, List, Optional
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ARRIVAL_DATE_FORMATS = ('%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y')
+CONFLICT_KEY = ['market', 'commodity', 'variety', 'arrival_date']
+
+
+def parse_arrival_date(value) -> Optional[date]:
+    if isinstance(value, date):
+        return value
+    for fmt in ARRIVAL_DATE_FORMATS:
+        try:
+            return datetime.strptime(str(value).strip(), fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _insert_ignoring_duplicates():
+    """INSERT ... ON CONFLICT DO NOTHING for the active database"""
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Price history ingestion does not support {dialect}")
+    return insert(MarketPriceHistory).on_conflict_do_nothing(index_elements=CONFLICT_KEY)
+
+
+class PriceHistoryService:
+    """Incremental ingestion and OHLC / rolling-statistics queries (needs an app context)"""
+    
+    def __init__(self, lookback_days: int = None, chunk_size: int = 1000):
+        self.lookback_days = Config.PRICE_HISTORY_LOOKBACK_DAYS if lookback_days is None else lookback_days
+        self.chunk_size = chunk_size
+        self.commodity_ids_checked = False
+    
+    def ingest(self, records: Iterable[dict]) -> int:
+        """
+        Store processed market records (DataGovService.process_market_data)
+
+        Quotes older than the newest stored arrival date minus lookback_days
+        are skipped, as are quotes without a date or modal price.
+
+        Returns:
+            Number of new rows inserted
+        """
+        latest = db.session.query(func.max(MarketPriceHistory.arrival_date)).scalar()
+        cutoff = latest - timedelta(days=self.lookback_days) if latest else None
+        
+        rows = {}
+        for record in records:
+            arrival_date = parse_arrival_date(record.get('arrival_date'))
+            modal_price = float(record.get('modal_price') or 0)
+            if arrival_date is None or modal_price <= 0 or (cutoff and arrival_date < cutoff):
+                continue
+            row = {
+                'state': str(record.get('state') or ''),
+                'district': str(record.get('district') or ''),
+                'market': str(record.get('market') or ''),
+                'commodity': str(record.get('commodity') or ''),
+                'commodity_id': canonical_commodity(record.get('commodity')),
+                'variety': str(record.get('variety') or ''),
+                'arrival_date': arrival_date,
+                'min_price': float(record.get('min_price') or 0),
+                'max_price': float(record.get('max_price') or 0),
+                'modal_price': modal_price,
+                'created_at': datetime.utcnow()
+            }
+            # A snapshot can repeat a quote; keep the last one
+            rows[tuple(row[key] for key in CONFLICT_KEY)] = row
+        
+        if not rows:
+            return 0
+        
+        statement = _insert_ignoring_duplicates().returning(MarketPriceHistory.id)
+        rows = list(rows.values())
+        inserted = 0
+        try:
+            for start in range(0, len(rows), self.chunk_size):
+                result = db.session.execute(statement, rows[start:start + self.chunk_size])
+                inserted += len(result.all())
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return inserted
+    
+    def refresh_commodity_ids(self) -> int:
+        """
+        Recompute stored commodity ids after the alias tables change (one
+        UPDATE per commodity name whose id moved)
+
+        Returns:
+            Number of commodity names updated
+        """
+        stored = db.session.query(MarketPriceHistory.commodity, MarketPriceHistory.commodity_id).distinct().all()
+        stale = {name: canonical_commodity(name) for name, commodity_id in stored
+                 if canonical_commodity(name) != commodity_id}
+        for name, commodity_id in stale.items():
+            MarketPriceHistory.query.filter_by(commodity=name).update({'commodity_id': commodity_id},
+                                                                     synchronize_session=False)
+        if stale:
+            db.session.commit()
+            logger.info(f"Price history: re-keyed {len(stale)} commodity names")
+        return len(stale)
+    
+    def _daily(self, commodity: str, state: str = None, district: str = None, market: str = None,
+               days: int = None, today: date = None) -> Dict[str, np.ndarray]:
+        """Per-day average modal price (and quote count) for matching quotes, oldest first"""
+        query = db.session.query(
+            MarketPriceHistory.arrival_date,
+            func.avg(MarketPriceHistory.modal_price),
+            func.count(MarketPriceHistory.id)
+        ).filter(MarketPriceHistory.commodity_id == query_commodity(commodity))
+        
+        for column, value in ((MarketPriceHistory.state, state), (MarketPriceHistory.district, district),
+                              (MarketPriceHistory.market, market)):
+            if value:
+                query = query.filter(column.ilike(f'%{value.strip()}%'))
+        if days:
+            query = query.filter(MarketPriceHistory.arrival_date >= (today or date.today()) - timedelta(days=days))
+        
+        rows = query.group_by(MarketPriceHistory.arrival_date).order_by(MarketPriceHistory.arrival_date).all()
+        return {
+            'dates': np.array([row[0] for row in rows], dtype='datetime64[D]'),
+            'prices': np.array([row[1] for row in rows], dtype=np.float64),
+            'quotes': np.array([row[2] for row in rows], dtype=np.int64)
+        }
+    
+    def ohlc(self, commodity: str, state: str = None, district: str = None, market: str = None,
+             period: str = 'week', days: int = 180, today: date = None) -> List[dict]:
+        """
+        Weekly (Monday-start) or monthly open/high/low/close of the daily
+        average modal price
+        """
+        daily = self._daily(commodity, state, district, market, days, today)
+        dates, prices = daily['dates'], daily['prices']
+        if not len(dates):
+            return []
+        
+        if period == 'month':
+            buckets = dates.astype('datetime64[M]').astype('datetime64[D]')
+        elif period == 'week':
+            # 1970-01-01 was a Thursday, so (days + 3) % 7 is days since Monday
+            buckets = dates - (dates.astype(np.int64) + 3) % 7
+        else:
+            raise ValueError("period must be 'week' or 'month'")
+        
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        ends = np.r_[starts[1:], len(dates)] - 1
+        highs = np.maximum.reduceat(prices, starts)
+        lows = np.minimum.reduceat(prices, starts)
+        means = np.add.reduceat(prices, starts) / (ends - starts + 1)
+        quotes = np.add.reduceat(daily['quotes'], starts)
+        
+        return [
+            {
+                'period_start': str(buckets[start]),
+                'open': round(float(prices[start]), 2),
+                'high': round(float(high), 2),
+                'low': round(float(low), 2),
+                'close': round(float(prices[end]), 2),
+                'mean': round(float(mean), 2),
+                'quotes': int(count)
+            }
+            for start, end, high, low, mean, count in zip(starts, ends, highs, lows, means, quotes)
+        ]
+    
+    def rolling(self, commodity: str, state: str = None, district: str = None, market: str = None,
+                window: int = 7, days: int = 90, today: date = None) -> List[dict]:
+        """Rolling mean/std/min/max over the last `window` trading days, per day"""
+        daily = self._daily(commodity, state, district, market, days, today)
+        dates, prices = daily['dates'], daily['prices']
+        if len(prices) < window:
+            return []
+        
+        windows = np.lib.stride_tricks.sliding_window_view(prices, window)
+        means = windows.mean(axis=1)
+        stds = windows.std(axis=1)
+        change = (windows[:, -1] - windows[:, 0]) / windows[:, 0] * 100
+        
+        return [
+            {
+                'date': str(day),
+                'price': round(float(price), 2),
+                'rolling_mean': round(float(mean), 2),
+                'rolling_std': round(float(std), 2),
+                'rolling_min': round(float(low), 2),
+                'rolling_max': round(float(high), 2),
+                'change_percent': round(float(pct), 1)
+            }
+            for day, price, mean, std, low, high, pct in zip(
+                dates[window - 1:], prices[window - 1:], means, stds,
+                windows.min(axis=1), windows.max(axis=1), change
+            )
+        ]
+    
+    def recent_price(self, commodity: str, state: str = None, district: str = None,
+                     days: int = 14, today: date = None) -> Optional[dict]:
+        """
+        Average modal price over the last `days` days, or None without data
+        (or outside an app context, so agents can fall back to static averages)
+        """
+        if not has_app_context():
+            return None
+        daily = self._daily(commodity, state, district, None, days, today)
+        if not len(daily['prices']):
+            return None
+        return {
+            'price': round(float(np.average(daily['prices'], weights=daily['quotes'])), 2),
+            'as_of': str(daily['dates'][-1]),
+            'quotes': int(daily['quotes'].sum()),
+            'days': days
+        }
+
+
+def ingest_latest_snapshot(app):
+    """
+    Scheduler entry point: ingest the current market snapshot once across
+    workers. The marker file records the fetch time of the last ingested
+    snapshot, so other workers (and later runs) skip it.
+    """
+    from app.services.data_gov_service import data_gov_service
+    
+    fetched_at, store = data_gov_service.current_snapshot()
+    if not len(store):
+        return
+    
+    marker_path = f"{data_gov_service.snapshot_path}.ingested"
+    with file_lock(marker_path, blocking=False) as acquired:
+        if not acquired:
+            return
+        try:
+            with open(marker_path, 'r') as f:
+                if f.read().strip() == str(fetched_at):
+                    return
+        except OSError:
+            pass
+        
+        with app.app_context():
+            if not price_history_service.commodity_ids_checked:
+                # Alias changes ship with deploys; re-key old rows once per process
+                price_history_service.refresh_commodity_ids()
+                price_history_service.commodity_ids_checked = True
+            inserted = price_history_service.ingest(store.records(np.arange(len(store))))
+        logger.info(f"Price history: {inserted} new quotes from snapshot {fetched_at}")
+        
+        with open(marker_path, 'w') as f:
+            f.write(str(fetched_at))
+
+
+# Singleton instance
+price_history_service = PriceHistoryService()
@@ -0,0 +1,182 @@
+"""
+Prompt Budget - Shrinks agent outputs before they are embedded in
+summarization prompts: per-agent field projection, static boilerplate
+dropped, lists and long strings truncated, compact JSON, and a token
+budget that trims further until the payload fits.
+"""
+
+from app.config import Config
+from app.services.llm_gateway import estimate_tokens
+import json
+
+# Static advice lists that are the same for every run; the model needs none
+# of them to write a summary (individual prompts that ask for tips keep theirs)
+BOILERPLATE_KEYS = frozenset(['best_practices', 'alternative_selling_options', 'water_saving_tips',
+                              'cheaper_alternatives', 'application_tips', 'direct_selling_platforms',
+                              'monitoring_plan', 'safety_precautions', 'analysis_method'])
+
+# Per-agent fields the summaries use, in priority order (a budget overrun
+# drops fields from the end first). A tuple keeps only those sub-fields of
+# each item; None keeps the value as is.
+AGENT_FIELDS = {
+    'crop_planning': {
+        'recommended_crops': ('crop_name', 'variety', 'suitability_score', 'expected_profit_per_acre',
+                              'risk_level', 'reasoning', 'growing_season'),
+        'weather_context': None,
+    },
+    'fertilization': {
+        'fertilizer_plan': ('stage', 'timing', 'fertilizers', 'stage_cost'),
+        'total_cost_for_area': None,
+        'total_cost_per_acre': None,
+        'potential_savings': None,
+        'land_area_acres': None,
+        'npk_requirement': None,
+        'application_tips': None,
+    },
+    'irrigation': {
+        'next_irrigation': None,
+        'should_irrigate_now': None,
+        'adjustments_made': None,
+        'weather_data': None,
+        'critical_stages_upcoming': None,
+        'next_7_days_schedule': ('date', 'irrigate', 'water_mm'),
+        'water_saving_tips': None,
+    },
+    'disease_detection': {
+        'disease_name': None,
+        'severity': None,
+        'confidence_score': None,
+        'immediate_actions': None,
+        'chemical_treatment': ('recommended_product', 'dosage', 'application_frequency'),
+        'organic_alternatives': None,
+        'diagnosis': None,
+        'preventive_measures': None,
+        'expected_recovery_time': None,
+    },
+    'harvest_prediction': {
+        'predicted_harvest_date': None,
+        'days_remaining': None,
+        'yield_prediction': None,
+        'optimal_harvest_window': None,
+        'pre_harvest_actions': ('action', 'timing'),
+        'harvest_indicators': None,
+        'risk_factors': None,
+        'confidence_level': None,
+    },
+    'price_analysis': {
+        'recommendation': None,
+        'top_markets': None,
+        'price_trend': None,
+        'average_market_price': None,
+        'market_insights': None,
+    },
+}
+
+# Section names in comprehensive analysis results -> agent kind
+SECTION_KINDS = {
+    'crop_planning': 'crop_planning',
+    'fertilization': 'fertilization',
+    'irrigation': 'irrigation',
+    'harvest': 'harvest_prediction',
+    'market_analysis': 'price_analysis',
+    'disease_detection': 'disease_detection',
+}
+
+MAX_STRING_CHARS = 240
+
+
+def compact_json(value) -> str:
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+def _select(value, fields):
+    if isinstance(value, list):
+        return [_select(item, fields) for item in value]
+    if isinstance(value, dict):
+        return {k: v for k, v in value.items() if k in fields}
+    return value
+
+
+def project(kind: str, output, keep_boilerplate: bool = False):
+    """Keep only the fields the summary for this agent uses"""
+    if not isinstance(output, dict):
+        return output
+    if output.get('error'):
+        return {'error': output['error']}
+    
+    fields = AGENT_FIELDS.get(kind)
+    if fields is None:
+        return {k: v for k, v in output.items() if keep_boilerplate or k not in BOILERPLATE_KEYS}
+    
+    projected = {}
+    for key, subfields in fields.items():
+        if key not in output or (key in BOILERPLATE_KEYS and not keep_boilerplate):
+            continue
+        projected[key] = _select(output[key], subfields) if subfields else output[key]
+    return projected
+
+
+def truncate(value, max_items: int, max_chars: int = MAX_STRING_CHARS):
+    """Cut every list to max_items and every string to max_chars, recursively"""
+    if isinstance(value, dict):
+        return {k: truncate(v, max_items, max_chars) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [truncate(v, max_items, max_chars) for v in value[:max_items]]
+    if isinstance(value, str) and len(value) > max_chars:
+        return value[:max_chars - 1] + '…'
+    return value
+
+
+def _drop_last_field(value: dict, sectioned: bool) -> bool:
+    """Drop the lowest-priority field (of the largest section, when sectioned)"""
+    if sectioned:
+        sections = [v for v in value.values() if isinstance(v, dict) and len(v) > 1]
+        if not sections:
+            return False
+        value = max(sections, key=lambda d: len(compact_json(d)))
+    elif len(value) <= 1:
+        return False
+    value.pop(next(reversed(value)))
+    return True
+
+
+def fit_to_budget(value, max_tokens: int, max_items: int = None, sectioned: bool = False) -> str:
+    """
+    Compact JSON for `value` within max_tokens: lists are cut shorter first,
+    then the lowest-priority fields are dropped until it fits. With
+    sectioned=True the top level is a dict of sections (one per agent) and
+    fields are dropped from the largest section, never whole sections.
+    """
+    max_items = max_items or Config.SUMMARY_PROMPT_MAX_LIST_ITEMS
+    for limit in range(max_items, 0, -1):
+        trimmed = truncate(value, limit)
+        text = compact_json(trimmed)
+        if estimate_tokens(text) <= max_tokens:
+            return text
+    
+    while isinstance(trimmed, dict) and estimate_tokens(text) > max_tokens:
+        if not _drop_last_field(trimmed, sectioned):
+            break
+        text = compact_json(trimmed)
+    return text
+
+
+def agent_payload(kind: str, output: dict, max_tokens: int = None) -> str:
+    """Prompt payload for a single agent's output (keeps tips its prompt asks for)"""
+    return fit_to_budget(project(kind, output, keep_boilerplate=True),
+                         max_tokens or Config.SUMMARY_PROMPT_TOKEN_BUDGET)
+
+
+def comprehensive_payload(results: dict, max_tokens: int = None) -> str:
+    """Prompt payload for comprehensive analysis: executed agents only, boilerplate dropped"""
+    sections = {}
+    for name in results.get('agents_executed', []):
+        sections[name] = project(SECTION_KINDS.get(name, name), results.get(name))
+    if results.get('agents_timed_out'):
+        sections['agents_timed_out'] = results['agents_timed_out']
+    return fit_to_budget(sections, max_tokens or Config.SUMMARY_PROMPT_COMPREHENSIVE_TOKEN_BUDGET, sectioned=True)
+
+
+def context_payload(context) -> str:
+    """Compact JSON for the farmer/user context block"""
+    return compact_json(truncate(context or {}, Config.SUMMARY_PROMPT_MAX_LIST_ITEMS))
@@ -0,0 +1,63 @@
+"""
+Background Scheduler - Periodic jobs (data refreshes) run inside each worker
+process; jobs that must run once cluster-wide coordinate through file locks
+"""
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from datetime import datetime
+import atexit
+import logging
+
+logger = logging.getLogger(__name__)
+
+scheduler = BackgroundScheduler(daemon=True)
+
+
+def init_scheduler(app):
+    """Register periodic jobs and start the scheduler (skipped when disabled or testing)"""
+    if not app.config.get('SCHEDULER_ENABLED', True) or app.config.get('TESTING'):
+        return
+    if scheduler.running:
+        return
+    
+    from app.services.data_gov_service import data_gov_service
+    from app.services.daily_sweep import run_scheduled_sweep
+    from app.services.price_history import ingest_latest_snapshot
+    
+    scheduler.add_job(
+        data_gov_service.refresh,
+        'interval',
+        seconds=app.config.get('MARKET_REFRESH_INTERVAL', 3600),
+        next_run_time=datetime.now(),  # Warm the snapshot at startup
+        id='market_snapshot_refresh',
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True
+    )
+    
+    # Store each new snapshot in the price history (once across workers)
+    scheduler.add_job(
+        ingest_latest_snapshot,
+        'interval',
+        args=[app],
+        minutes=10,
+        id='price_history_ingest',
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True
+    )
+    
+    scheduler.add_job(
+        run_scheduled_sweep,
+        'cron',
+        args=[app],
+        hour=app.config.get('DAILY_SWEEP_HOUR', 6),
+        id='daily_sweep',
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True
+    )
+    
+    scheduler.start()
+    atexit.register(lambda: scheduler.shutdown(wait=False) if scheduler.running else None)
+    logger.info("Background scheduler started")
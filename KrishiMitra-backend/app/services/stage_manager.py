@@ -1,11 +1,24 @@
 from datetime import datetime, date
+from typing import Dict, Sequence
 from app.knowledge.crop_knowledge_base import get_crop_data
+from app.services.dynamic_knowledge_service import KnowledgeFetchPending
+import numpy as np
 
 class StageManager:
     """
     Manages crop growth stage calculations based on sowing date and knowledge base.
     """
     
+    # Stage boundaries as fractions of the crop's duration (see calculate_current_stage)
+    PROGRESS_THRESHOLDS = np.array([0.15, 0.45, 0.75, 1.0])
+    STAGE_NAMES = np.array([
+        "Germination/Seedling",
+        "Vegetative Growth",
+        "Flowering/Reproductive",
+        "Maturity/Fruiting",
+        "Harvest Ready"
+    ], dtype=object)
+    
     @staticmethod
     def calculate_current_stage(crop_name: str, sowing_date: date) -> dict:
         """
@@ -60,5 +73,54 @@ class StageManager:
             "progress_percent": int(progress * 100),
             "days_remaining": max(0, duration_days - das)
         }
+    
+    def calculate_stages(self, crop_names: Sequence[str], sowing_dates: Sequence[date],
+                         today: date = None) -> Dict[str, np.ndarray]:
+        """
+        Bulk version of calculate_current_stage for a sweep over many crops.
+        
+        Crop durations are looked up once per distinct crop name. Progress is
+        located in the shared thresholds with one searchsorted call, which is
+        the same as placing DAS between each crop's own stage boundaries
+        (threshold * duration) and gives exactly the scalar result.
+        
+        Returns:
+            Arrays aligned with the inputs: 'stage', 'das', 'progress_percent',
+            'days_remaining'
+        """
+        count = len(crop_names)
+        today = np.datetime64(today or date.today(), 'D')
+        sown = np.array([d if d else 'NaT' for d in sowing_dates], dtype='datetime64[D]')
+        has_date = ~np.isnat(sown)
+        das = np.where(has_date, (today - sown).astype('timedelta64[D]').astype(np.int64), 0)
+        
+        # One knowledge lookup per distinct crop (NaN duration = unknown crop)
+        names, inverse = np.unique(np.array([name or '' for name in crop_names], dtype=object), return_inverse=True)
+        durations = np.empty(len(names))
+        for index, name in enumerate(names):
+            try:
+                crop_data = get_crop_data(name) if name else None
+            except KnowledgeFetchPending:
+                crop_data = None  # Being fetched; the next sweep picks it up
+            durations[index] = crop_data.get("duration_months", 4) * 30 if crop_data else np.nan
+        duration_days = durations[inverse] if count else np.empty(0)
+        
+        known = has_date & (das >= 0) & ~np.isnan(duration_days)
+        progress = np.zeros(count)
+        np.divide(das, duration_days, out=progress, where=known)
+        
+        stage = self.STAGE_NAMES[np.searchsorted(self.PROGRESS_THRESHOLDS, progress, side='right')]
+        stage[~known] = "Unknown"
+        stage[has_date & (das < 0)] = "Planned"
+        
+        days_remaining = np.zeros(count, dtype=np.int64)
+        days_remaining[known] = np.maximum(0, duration_days[known] - das[known]).astype(np.int64)
+        
+        return {
+            "stage": stage,
+            "das": das,
+            "progress_percent": (progress * 100).astype(np.int64),
+            "days_remaining": days_remaining
+        }
 
 stage_manager = StageManager()
@@ -4,9 +4,69 @@ This is the ONLY place where Gemini is used in the refactored system
 """
 
 from app.services.gemini_service import gemini_service
+from app.services.prompt_budget import agent_payload, comprehensive_payload, context_payload
+from app.config import Config
+from app.utils.cache import build_cache
 from typing import Dict, List
+import hashlib
 import json
 
+# Bump when any prompt below changes so cached summaries are not reused
+PROMPT_TEMPLATE_VERSION = 2
+
+# Fields that differ between otherwise identical runs and must not affect the cache key
+VOLATILE_KEYS = frozenset(['analysis_timestamp', 'timestamp', 'generated_at', 'agent_timings',
+                           'execution_time', 'duration_ms', 'ai_summary', 'comprehensive_ai_summary'])
+
+_summary_cache = None
+
+
+def get_summary_cache():
+    """Summary cache, created on first use so importing the service touches no files"""
+    global _summary_cache
+    if _summary_cache is None:
+        _summary_cache = build_cache(
+            'summaries',
+            backend=Config.SUMMARY_CACHE_BACKEND,
+            max_entries=Config.SUMMARY_CACHE_MAX_ENTRIES,
+            default_ttl=Config.SUMMARY_CACHE_TTL,
+            path=Config.SUMMARY_CACHE_PATH
+        )
+    return _summary_cache
+
+
+def _canonical(value):
+    """Drop volatile fields recursively so equal analyses serialize identically"""
+    if isinstance(value, dict):
+        return {k: _canonical(v) for k, v in value.items() if k not in VOLATILE_KEYS}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    return value
+
+
+def summary_cache_key(kind: str, agent_output: dict, context=None) -> str:
+    """Content address for a summary: template version + canonical agent output + context"""
+    payload = json.dumps(
+        [kind, PROMPT_TEMPLATE_VERSION, _canonical(agent_output), _canonical(context)],
+        sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _cached_summary(kind: str, prompt: str, agent_output: dict, context=None) -> str:
+    """Return the cached summary for this content or call Gemini and cache a successful reply"""
+    cache = get_summary_cache()
+    key = summary_cache_key(kind, agent_output, context)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    
+    summary = gemini_service.generate_text_response(prompt, temperature=0.7)
+    if isinstance(summary, str) and summary.strip():
+        cache.set(key, summary)
+    return summary
+
+
 class SummarizationService:
     """Service to summarize rule-based agent outputs using Gemini"""
     
@@ -19,10 +79,10 @@ The rule-based crop planning system has analyzed the farmer's soil and location
 Summarize the following recommendations in a natural, conversational tone suitable for farmers.
 
 **Agent Analysis Results:**
-{json.dumps(agent_output, indent=2)}
+{agent_payload('crop_planning', agent_output)}
 
 **User Context:**
-{json.dumps(user_context or {}, indent=2)}
+{context_payload(user_context)}
 
 **Instructions:**
 1. Keep it simple and friendly - write like you're talking to a farmer in person
@@ -34,7 +94,7 @@ Summarize the following recommendations in a natural, conversational tone suitab
 
 Return ONLY the conversational summary text, no JSON.'''
         
-        return gemini_service.generate_text_response(prompt, temperature=0.7)
+        return _cached_summary('crop_planning', prompt, agent_output, user_context)
     
     @staticmethod
     def summarize_fertilization(agent_output: dict, crop_name: str) -> str:
@@ -45,7 +105,7 @@ The rule-based fertilization system has created a detailed NPK plan for {crop_na
 Summarize this plan in a friendly, easy-to-understand way.
 
 **Fertilization Plan:**
-{json.dumps(agent_output, indent=2)}
+{agent_payload('fertilization', agent_output)}
 
 **Instructions:**
 1. Explain the fertilization schedule simply
@@ -56,7 +116,7 @@ Summarize this plan in a friendly, easy-to-understand way.
 
 Return ONLY the summary text, no JSON.'''
         
-        return gemini_service.generate_text_response(prompt, temperature=0.7)
+        return _cached_summary('fertilization', prompt, agent_output, crop_name)
     
     @staticmethod
     def summarize_irrigation(agent_output: dict, crop_name: str) -> str:
@@ -66,7 +126,7 @@ Return ONLY the summary text, no JSON.'''
 The rule-based irrigation system has analyzed weather data and created a schedule.
 
 **Irrigation Analysis:**
-{json.dumps(agent_output, indent=2)}
+{agent_payload('irrigation', agent_output)}
 
 **Instructions:**
 1. Tell them when to irrigate next and why
@@ -76,7 +136,7 @@ The rule-based irrigation system has analyzed weather data and created a schedul
 
 Return ONLY the summary text, no JSON.'''
         
-        return gemini_service.generate_text_response(prompt, temperature=0.7)
+        return _cached_summary('irrigation', prompt, agent_output, crop_name)
     
     @staticmethod
     def summarize_disease_detection(agent_output: dict, crop_name: str) -> str:
@@ -86,7 +146,7 @@ Return ONLY the summary text, no JSON.'''
 The rule-based disease detection system has analyzed the symptoms for {crop_name}.
 
 **Disease Analysis:**
-{json.dumps(agent_output, indent=2)}
+{agent_payload('disease_detection', agent_output)}
 
 **Instructions:**
 1. Explain the disease and severity clearly
@@ -97,7 +157,7 @@ The rule-based disease detection system has analyzed the symptoms for {crop_name
 
 Return ONLY the summary text, no JSON.'''
         
-        return gemini_service.generate_text_response(prompt, temperature=0.7)
+        return _cached_summary('disease_detection', prompt, agent_output, crop_name)
     
     @staticmethod
     def summarize_harvest_prediction(agent_output: dict, crop_name: str) -> str:
@@ -107,7 +167,7 @@ Return ONLY the summary text, no JSON.'''
 The rule-based harvest prediction system has calculated harvest timing and yield.
 
 **Harvest Predictions:**
-{json.dumps(agent_output, indent=2)}
+{agent_payload('harvest_prediction', agent_output)}
 
 **Instructions:**
 1. Tell them when to harvest and expected yield
@@ -117,7 +177,7 @@ The rule-based harvest prediction system has calculated harvest timing and yield
 
 Return ONLY the summary text, no JSON.'''
         
-        return gemini_service.generate_text_response(prompt, temperature=0.7)
+        return _cached_summary('harvest_prediction', prompt, agent_output, crop_name)
     
     @staticmethod
     def summarize_price_analysis(agent_output: dict, crop_name: str) -> str:
@@ -127,7 +187,7 @@ Return ONLY the summary text, no JSON.'''
 The rule-based price analysis system has analyzed multiple markets and transport costs.
 
 **Market Analysis:**
-{json.dumps(agent_output, indent=2)}
+{agent_payload('price_analysis', agent_output)}
 
 **Instructions:**
 1. Recommend the best market to sell at
@@ -137,7 +197,7 @@ The rule-based price analysis system has analyzed multiple markets and transport
 
 Return ONLY the summary text, no JSON.'''
         
-        return gemini_service.generate_text_response(prompt, temperature=0.7)
+        return _cached_summary('price_analysis', prompt, agent_output, crop_name)
     
     @staticmethod
     def summarize_comprehensive_analysis(all_agent_outputs: dict, crop_name: str, user_context: dict = None) -> str:
@@ -148,10 +208,10 @@ Multiple rule-based agricultural agents have analyzed everything about growing {
 Create a comprehensive yet easy-to-understand summary for the farmer.
 
 **All Agent Outputs:**
-{json.dumps(all_agent_outputs, indent=2)}
+{comprehensive_payload(all_agent_outputs)}
 
 **Farmer Context:**
-{json.dumps(user_context or {}, indent=2)}
+{context_payload(user_context)}
 
 **Instructions:**
 1. Create a clear, structured summary covering all aspects:
@@ -167,7 +227,7 @@ Create a comprehensive yet easy-to-understand summary for the farmer.
 
 Return ONLY the comprehensive summary, no JSON.'''
         
-        return gemini_service.generate_text_response(prompt, temperature=0.7)
+        return _cached_summary('comprehensive_analysis', prompt, all_agent_outputs, [crop_name, user_context])
 
 
 # Singleton instance
@@ -1,6 +1,14 @@
-import requests
 from app.config import Config
+from app.utils.http_client import http_client
+from app.utils.cache import build_cache
 from datetime import datetime, timedelta
+import math
+
+# Earth's meridian length per degree of latitude (km)
+KM_PER_DEGREE = 111.32
+
+# OpenWeatherMap's free 5-day / 3-hour forecast returns at most 40 slots
+MAX_FORECAST_SLOTS = 40
 
 class WeatherService:
     """Service for fetching weather data from OpenWeatherMap"""
@@ -8,39 +16,89 @@ class WeatherService:
     def __init__(self):
         self.api_key = Config.OPENWEATHER_API_KEY
         self.base_url = "https://api.openweathermap.org/data/2.5"
+        self.grid_resolution_km = Config.WEATHER_GRID_RESOLUTION_KM
+        self.current_ttl = Config.WEATHER_CURRENT_TTL
+        self.forecast_ttl = Config.WEATHER_FORECAST_TTL
+        self.cache = build_cache(
+            'weather',
+            backend=Config.WEATHER_CACHE_BACKEND,
+            max_entries=Config.WEATHER_CACHE_MAX_ENTRIES,
+            default_ttl=self.forecast_ttl
+        )
+    
+    def grid_cell(self, lat: float, lon: float) -> tuple:
+        """
+        Snap coordinates to a grid cell of ~grid_resolution_km per side.
+
+        Returns:
+            (cell_key, center_lat, center_lon) - every farm in the same cell
+            shares one cache entry, fetched for the cell's center
+        """
+        lat_step = self.grid_resolution_km / KM_PER_DEGREE
+        lat_index = math.floor(float(lat) / lat_step)
+        center_lat = (lat_index + 0.5) * lat_step
+        
+        # Longitude degrees shrink towards the poles; widen the step to keep cells square
+        lon_step = lat_step / max(math.cos(math.radians(center_lat)), 0.01)
+        lon_index = math.floor(float(lon) / lon_step)
+        center_lon = (lon_index + 0.5) * lon_step
+        
+        return f"{lat_index}:{lon_index}", round(center_lat, 4), round(center_lon, 4)
     
     def get_current_weather(self, lat: float, lon: float) -> dict:
-        """Get current weather for coordinates"""
+        """Get current weather for coordinates (cached per grid cell)"""
+        cell_key, center_lat, center_lon = self.grid_cell(lat, lon)
+        cache_key = f"current:{cell_key}"
+        
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             url = f"{self.base_url}/weather"
             params = {
-                'lat': lat,
-                'lon': lon,
+                'lat': center_lat,
+                'lon': center_lon,
                 'appid': self.api_key,
                 'units': 'metric'
             }
-            response = requests.get(url, params=params)
+            response = http_client.get(url, params=params)
             response.raise_for_status()
-            return response.json()
+            weather = response.json()
         except Exception as e:
             raise Exception(f"Weather API error: {str(e)}")
+        
+        self.cache.set(cache_key, weather, ttl=self.current_ttl)
+        return weather
     
     def get_forecast(self, lat: float, lon: float, days: int = 7) -> dict:
-        """Get weather forecast for coordinates"""
-        try:
-            url = f"{self.base_url}/forecast"
-            params = {
-                'lat': lat,
-                'lon': lon,
-                'appid': self.api_key,
-                'units': 'metric',
-                'cnt': days * 8  # 3-hour intervals
-            }
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            raise Exception(f"Weather forecast error: {str(e)}")
+        """Get weather forecast for coordinates (cached per grid cell)"""
+        cell_key, center_lat, center_lon = self.grid_cell(lat, lon)
+        cache_key = f"forecast:{cell_key}"
+        
+        # The full forecast is cached once per cell and sliced per request,
+        # so callers asking for different horizons share one upstream fetch
+        forecast = self.cache.get(cache_key)
+        if forecast is None:
+            try:
+                url = f"{self.base_url}/forecast"
+                params = {
+                    'lat': center_lat,
+                    'lon': center_lon,
+                    'appid': self.api_key,
+                    'units': 'metric',
+                    'cnt': MAX_FORECAST_SLOTS  # 3-hour intervals
+                }
+                response = http_client.get(url, params=params)
+                response.raise_for_status()
+                forecast = response.json()
+            except Exception as e:
+                raise Exception(f"Weather forecast error: {str(e)}")
+            
+            self.cache.set(cache_key, forecast, ttl=self.forecast_ttl)
+        
+        slots = forecast.get('list', [])[:days * 8]
+        return {**forecast, 'list': slots, 'cnt': len(slots)}
     
     def analyze_for_irrigation(self, lat: float, lon: float) -> dict:
         """Analyze weather for irrigation decision"""
@@ -48,18 +106,34 @@ class WeatherService:
         
         rain_expected = False
         total_rainfall = 0
+        temperature_max = None
         
         for item in forecast.get('list', [])[:8]:  # Next 24 hours
             if 'rain' in item:
                 rain_expected = True
                 total_rainfall += item['rain'].get('3h', 0)
+            temp = item.get('main', {}).get('temp_max')
+            if temp is not None:
+                temperature_max = temp if temperature_max is None else max(temperature_max, temp)
         
-        return {
+        analysis = {
             'rain_expected_24h': rain_expected,
             'total_rainfall_mm': total_rainfall,
             'recommendation': 'skip' if total_rainfall > 10 else 'proceed',
             'forecast_data': forecast
         }
+        if temperature_max is not None:
+            analysis['temperature_max'] = temperature_max
+        return analysis
+    
+    def cache_stats(self) -> dict:
+        """Hit/miss counters for the weather cache"""
+        return {
+            **self.cache.stats(),
+            'grid_resolution_km': self.grid_resolution_km,
+            'current_ttl_seconds': self.current_ttl,
+            'forecast_ttl_seconds': self.forecast_ttl
+        }
 
 
 # Singleton instance
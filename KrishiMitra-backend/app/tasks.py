@@ -0,0 +1,25 @@
+"""
+Celery tasks - the crop setup workflow runs as a chain of one task per stage
+"""
+
+from celery import chain, shared_task
+from app.services import crop_pipeline
+
+
+@shared_task(ignore_result=True)
+def run_crop_stage(job_id: str, stage: str):
+    crop_pipeline.run_stage(job_id, stage)
+
+
+@shared_task(ignore_result=True)
+def finish_crop_job(job_id: str):
+    crop_pipeline.finish_job(job_id)
+
+
+def enqueue_crop_pipeline(job_id: str):
+    """Dispatch the stages in order, then mark the job finished"""
+    workflow = chain(
+        *[run_crop_stage.si(job_id, stage) for stage in crop_pipeline.STAGES],
+        finish_crop_job.si(job_id)
+    )
+    workflow.apply_async()
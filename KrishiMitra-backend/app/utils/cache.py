@@ -0,0 +1,261 @@
+"""
+Shared caching primitives: an in-process TTL/LRU cache, an SQLite-backed disk
+cache and a Redis-backed cache with the same interface, selected through
+build_cache()
+"""
+
+from collections import OrderedDict
+from app.config import Config
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """Thread-safe in-memory cache with per-entry TTL and LRU eviction"""
+    
+    def __init__(self, max_entries: int = 1024, default_ttl: float = 300):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: str, default=None):
+        """Return cached value or default if missing/expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key: str, value, ttl: float = None):
+        """Store value, evicting least recently used entries when full"""
+        expires_at = time.monotonic() + (ttl if ttl is not None else self.default_ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+    
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+    
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            'backend': 'memory',
+            'size': len(self._data),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0
+        }
+
+
+class DiskCache:
+    """
+    SQLite-backed cache shared by the worker processes on one host.
+
+    Values are stored as JSON with an absolute expiry; when the table grows
+    past max_entries the least recently read entries are evicted.
+    """
+    
+    def __init__(self, path: str, max_entries: int = 1024, default_ttl: float = 300):
+        self.path = path
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache_entries ('
+            'key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS ix_cache_entries_accessed ON cache_entries (accessed_at)')
+    
+    def get(self, key: str, default=None):
+        now = time.time()
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    'SELECT value, expires_at FROM cache_entries WHERE key = ?', (key,)
+                ).fetchone()
+                if row is not None and row[1] < now:
+                    self._conn.execute('DELETE FROM cache_entries WHERE key = ?', (key,))
+                    row = None
+                if row is not None:
+                    self._conn.execute('UPDATE cache_entries SET accessed_at = ? WHERE key = ?', (now, key))
+        except sqlite3.Error as e:
+            logger.warning(f"Disk cache get failed ({self.path}): {e}")
+            row = None
+        
+        if row is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return json.loads(row[0])
+    
+    def set(self, key: str, value, ttl: float = None):
+        now = time.time()
+        expires_at = now + (ttl if ttl is not None else self.default_ttl)
+        try:
+            with self._lock:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO cache_entries (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)',
+                    (key, json.dumps(value, ensure_ascii=False), expires_at, now)
+                )
+                self._evict(now)
+        except sqlite3.Error as e:
+            logger.warning(f"Disk cache set failed ({self.path}): {e}")
+    
+    def _evict(self, now: float):
+        self._conn.execute('DELETE FROM cache_entries WHERE expires_at < ?', (now,))
+        (size,) = self._conn.execute('SELECT COUNT(*) FROM cache_entries').fetchone()
+        overflow = size - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                'DELETE FROM cache_entries WHERE key IN '
+                '(SELECT key FROM cache_entries ORDER BY accessed_at LIMIT ?)', (overflow,)
+            )
+            self.evictions += overflow
+    
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute('DELETE FROM cache_entries WHERE key = ?', (key,))
+    
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM cache_entries')
+    
+    def stats(self) -> dict:
+        with self._lock:
+            (size,) = self._conn.execute('SELECT COUNT(*) FROM cache_entries').fetchone()
+        total = self.hits + self.misses
+        return {
+            'backend': 'disk',
+            'size': size,
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0
+        }
+
+
+class RedisCache:
+    """Redis-backed cache shared by all worker processes (values stored as JSON)"""
+    
+    def __init__(self, client, namespace: str, default_ttl: float = 300):
+        self.client = client
+        self.namespace = namespace
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+    
+    def _key(self, key: str) -> str:
+        return f"krishimitra:{self.namespace}:{key}"
+    
+    def get(self, key: str, default=None):
+        try:
+            raw = self.client.get(self._key(key))
+        except Exception as e:
+            logger.warning(f"Redis cache get failed ({self.namespace}): {e}")
+            self.misses += 1
+            return default
+        if raw is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return json.loads(raw)
+    
+    def set(self, key: str, value, ttl: float = None):
+        # Redis evicts by its own maxmemory policy; entries always carry a TTL
+        try:
+            self.client.set(self._key(key), json.dumps(value, ensure_ascii=False),
+                            ex=max(1, int(ttl if ttl is not None else self.default_ttl)))
+        except Exception as e:
+            logger.warning(f"Redis cache set failed ({self.namespace}): {e}")
+    
+    def delete(self, key: str):
+        try:
+            self.client.delete(self._key(key))
+        except Exception as e:
+            logger.warning(f"Redis cache delete failed ({self.namespace}): {e}")
+    
+    def clear(self):
+        try:
+            for key in self.client.scan_iter(match=self._key('*')):
+                self.client.delete(key)
+        except Exception as e:
+            logger.warning(f"Redis cache clear failed ({self.namespace}): {e}")
+    
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            'backend': 'redis',
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0
+        }
+
+
+_redis_client = None
+
+
+def get_redis_client():
+    """Return a shared Redis client for Config.REDIS_URL (raises if unreachable)"""
+    global _redis_client
+    if _redis_client is None:
+        import redis
+        client = redis.Redis.from_url(Config.REDIS_URL, socket_timeout=1, socket_connect_timeout=1)
+        client.ping()
+        _redis_client = client
+    return _redis_client
+
+
+def build_cache(namespace: str, backend: str = 'memory', max_entries: int = 1024,
+                default_ttl: float = 300, path: str = None):
+    """
+    Create a cache for the given backend ('memory', 'disk' or 'redis').
+    Falls back to the in-memory cache if Redis or the disk file is unavailable.
+    """
+    if backend == 'disk':
+        try:
+            return DiskCache(path or os.path.join('instance', 'cache', f'{namespace}.sqlite3'),
+                             max_entries=max_entries, default_ttl=default_ttl)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Disk cache unavailable for '{namespace}', using memory: {e}")
+    elif backend == 'redis':
+        try:
+            return RedisCache(get_redis_client(), namespace, default_ttl)
+        except Exception as e:
+            logger.warning(f"Redis unavailable for '{namespace}' cache, using memory: {e}")
+    return TTLCache(max_entries=max_entries, default_ttl=default_ttl)
@@ -0,0 +1,83 @@
+"""
+Geohash helpers for grouping farms into fixed-size cells, and vectorized
+great-circle distances.
+
+Precision 5 cells are ~4.9km x 4.9km, matching the weather grid, so every
+farm in a village shares one cell and one forecast.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+DECODE_MAP = {char: index for index, char in enumerate(BASE32)}
+
+
+def encode_geohash(lat: float, lon: float, precision: int = 5) -> str:
+    """Encode coordinates as a geohash of `precision` characters"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    geohash = []
+    bits = 0
+    bit_count = 0
+    even_bit = True  # Geohash interleaves bits starting with longitude
+    
+    while len(geohash) < precision:
+        value, bounds = (float(lon), lon_range) if even_bit else (float(lat), lat_range)
+        mid = (bounds[0] + bounds[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            bounds[0] = mid
+        else:
+            bits = bits << 1
+            bounds[1] = mid
+        even_bit = not even_bit
+        
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+    
+    return ''.join(geohash)
+
+
+def decode_geohash(geohash: str) -> Tuple[float, float]:
+    """Return the (lat, lon) center of a geohash cell"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even_bit = True
+    
+    for char in geohash:
+        value = DECODE_MAP[char]
+        for shift in range(4, -1, -1):
+            bounds = lon_range if even_bit else lat_range
+            mid = (bounds[0] + bounds[1]) / 2
+            if (value >> shift) & 1:
+                bounds[0] = mid
+            else:
+                bounds[1] = mid
+            even_bit = not even_bit
+    
+    return (lat_range[0] + lat_range[1]) / 2, (lon_range[0] + lon_range[1]) / 2
+
+
+def group_by_geohash(points: Iterable[Tuple[object, float, float]], precision: int = 5) -> Dict[str, List]:
+    """Group (item, lat, lon) tuples into {geohash: [items]}"""
+    groups = {}
+    for item, lat, lon in points:
+        groups.setdefault(encode_geohash(lat, lon, precision), []).append(item)
+    return groups
+
+
+def haversine_km(lat: float, lon: float, lats, lons) -> np.ndarray:
+    """Great-circle distance in km from one point to arrays of points"""
+    lat1 = np.radians(lat)
+    lat2 = np.radians(np.asarray(lats, dtype=np.float64))
+    delta_lat = lat2 - lat1
+    delta_lon = np.radians(np.asarray(lons, dtype=np.float64) - lon)
+    
+    a = np.sin(delta_lat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(delta_lon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
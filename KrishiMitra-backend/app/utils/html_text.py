@@ -0,0 +1,57 @@
+"""
+Incremental HTML-to-text extraction for scraped pages: fed chunk by chunk
+while the page streams in, and done as soon as enough text is collected
+"""
+
+from html.parser import HTMLParser
+from typing import Iterable
+
+# Page chrome and non-content elements whose text is dropped
+SKIP_TAGS = frozenset(['script', 'style', 'nav', 'footer', 'header', 'noscript', 'svg', 'template', 'iframe'])
+
+
+class TextExtractor(HTMLParser):
+    """Collects visible text with whitespace collapsed, up to max_chars"""
+    
+    def __init__(self, max_chars: int = 3000):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.parts = []
+        self.length = 0
+        self.done = False
+        self._skip_depth = 0
+    
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+    
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+    
+    def handle_data(self, data):
+        if self.done or self._skip_depth:
+            return
+        text = ' '.join(data.split())
+        if not text:
+            return
+        self.parts.append(text)
+        self.length += len(text) + 1
+        if self.length >= self.max_chars:
+            self.done = True
+    
+    def text(self) -> str:
+        return ' '.join(self.parts)[:self.max_chars]
+
+
+def extract_text(chunks: Iterable[str], max_chars: int = 3000) -> str:
+    """
+    Feed decoded HTML chunks until max_chars of text are collected. The
+    parser is never closed, so a page cut off mid-tag adds no markup to the text.
+    """
+    extractor = TextExtractor(max_chars)
+    for chunk in chunks:
+        extractor.feed(chunk)
+        if extractor.done:
+            break
+    return extractor.text()
@@ -0,0 +1,156 @@
+"""
+Shared HTTP client for outbound API calls: one pooled keep-alive session with
+default timeouts, retries with exponential backoff and a circuit breaker per host
+"""
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import urlparse
+from app.config import Config
+import logging
+import requests
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised when calls to an upstream host are short-circuited"""
+    pass
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker.
+
+    closed    -> requests flow; consecutive failures are counted
+    open      -> requests fail fast until reset_timeout elapses
+    half_open -> one trial request decides whether to close or re-open
+    """
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+    
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+                return True
+            return False
+    
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+    
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+
+class HostThrottle:
+    """
+    Per-host politeness: successive requests to one host are spaced at least
+    min_interval apart, while requests to different hosts run freely
+    """
+    
+    def __init__(self, min_interval: float = 1.0):
+        self.min_interval = min_interval
+        self._next_slot = {}
+        self._lock = threading.Lock()
+    
+    def wait(self, host: str):
+        """Reserve the host's next free slot and sleep until it arrives"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class HttpClient:
+    """Pooled, retrying HTTP client shared by all outbound services"""
+    
+    def __init__(self, pool_maxsize: int = None, max_retries: int = None,
+                 backoff_factor: float = None, connect_timeout: float = None,
+                 read_timeout: float = None, failure_threshold: int = None,
+                 reset_timeout: float = None):
+        self.timeout = (connect_timeout or Config.HTTP_CONNECT_TIMEOUT,
+                        read_timeout or Config.HTTP_READ_TIMEOUT)
+        self.failure_threshold = failure_threshold or Config.CIRCUIT_BREAKER_THRESHOLD
+        self.reset_timeout = reset_timeout or Config.CIRCUIT_BREAKER_RESET_SECONDS
+        self._breakers = {}
+        self._breakers_lock = threading.Lock()
+        
+        retries = Retry(
+            total=max_retries if max_retries is not None else Config.HTTP_MAX_RETRIES,
+            backoff_factor=backoff_factor if backoff_factor is not None else Config.HTTP_BACKOFF_FACTOR,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=True,
+            raise_on_status=False  # Hand the final response back to the caller
+        )
+        # pool_maxsize bounds the keep-alive connections kept per host
+        adapter = HTTPAdapter(pool_connections=Config.HTTP_POOL_CONNECTIONS,
+                              pool_maxsize=pool_maxsize or Config.HTTP_POOL_MAXSIZE,
+                              max_retries=retries)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+    
+    def breaker_for(self, host: str) -> CircuitBreaker:
+        with self._breakers_lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self._breakers[host]
+    
+    def get(self, url: str, params: dict = None, timeout=None, **kwargs) -> requests.Response:
+        """
+        GET through the shared session.
+
+        Raises:
+            CircuitOpenError: if the host's circuit is open
+            requests.RequestException: on connection errors after retries
+        """
+        host = urlparse(url).netloc
+        breaker = self.breaker_for(host)
+        if not breaker.allow_request():
+            raise CircuitOpenError(f"Circuit open for {host}; skipping request")
+        
+        try:
+            response = self.session.get(url, params=params, timeout=timeout or self.timeout, **kwargs)
+        except requests.RequestException:
+            breaker.record_failure()
+            raise
+        
+        if response.status_code in RETRY_STATUS_CODES:
+            breaker.record_failure()
+            if breaker.state == 'open':
+                logger.warning(f"Circuit opened for {host} after HTTP {response.status_code}")
+        else:
+            breaker.record_success()
+        return response
+    
+    def circuit_states(self) -> dict:
+        """Current breaker state per upstream host"""
+        with self._breakers_lock:
+            return {host: breaker.state for host, breaker in self._breakers.items()}
+
+
+# Singleton instance
+http_client = HttpClient()
@@ -0,0 +1,37 @@
+"""
+Cross-process file locks so that work shared by all gunicorn workers on a
+host (snapshot refreshes, scheduled sweeps) runs in only one of them
+"""
+
+from contextlib import contextmanager
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: in-process locking only
+    fcntl = None
+
+
+@contextmanager
+def file_lock(path: str, blocking: bool = True):
+    """
+    Hold an exclusive flock on `path` for the duration of the block.
+
+    Yields True when the lock is held, or False if `blocking` is False and
+    another process holds it.
+    """
+    if fcntl is None:
+        yield True
+        return
+    
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a+') as handle:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
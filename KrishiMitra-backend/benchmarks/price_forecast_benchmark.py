@@ -0,0 +1,173 @@
+"""
+Price forecast benchmark - backtests the seasonal forecast model on
+synthetic AGMARKNET-style history (seasonal crop calendars, drifting
+levels, noisy market quotes) stored in an in-memory database.
+
+Accuracy is reported as MAPE per horizon against the observed district
+average. The model is compared with the old hard-coded calendar factors
+(1.03/1.08/1.12 in peak months, 0.98/0.95/0.92 otherwise) and with a
+no-change forecast. Latency is reported for the batch fit and per
+forecast, both for single crops and for whole districts.
+
+Usage (from KrishiMitra-backend):
+    python -m benchmarks.price_forecast_benchmark
+    python -m benchmarks.price_forecast_benchmark --districts 12 --years 3 --origins 12
+"""
+
+import os
+
+os.environ.setdefault('TEST_DATABASE_URL', 'sqlite://')
+
+from app import create_app, db
+from app.knowledge import crop_knowledge_base as kb
+from app.services.price_forecast import HORIZONS, PriceForecastService, seasonal_at, seasonal_prior, to_day
+from app.services.price_history import PriceHistoryService
+from datetime import date, timedelta
+import argparse
+import time
+import numpy as np
+
+CROPS = ['cotton', 'rice', 'jowar', 'wheat', 'tur', 'soybean', 'groundnut', 'sunflower', 'gram']
+AGMARKNET_NAMES = {'rice': 'Paddy(Dhan)(Common)'}  # AGMARKNET's "Rice" is milled rice
+LEGACY_FACTORS = {7: (1.03, 0.98), 14: (1.08, 0.95), 30: (1.12, 0.92)}  # (peak month, otherwise)
+
+
+def legacy_forecast(crop_name: str, price: float, target: date, horizon: int) -> float:
+    """The agent's previous rule: the current price times a fixed factor by target month"""
+    peak_months = kb.CROP_DATABASE[crop_name]['market_calendar']['peak_demand_months']
+    peak, off = LEGACY_FACTORS[horizon]
+    return price * (peak if target.month in peak_months else off)
+
+
+def synthesize(districts: int, years: float, markets: int, end: date, seed: int = 7):
+    """
+    Quote records plus the observed district average per (crop, district, day).
+    Each series follows its calendar's seasonality (scaled and shifted a
+    little per district) around a random-walk level.
+    """
+    rng = np.random.default_rng(seed)
+    days = np.arange(to_day(end) - int(years * 365), to_day(end) + 1)
+    dates = [date(1970, 1, 1) + timedelta(days=int(day)) for day in days]
+    records, observed = [], {}
+    
+    for crop_name in CROPS:
+        calendar = kb.CROP_DATABASE[crop_name]['market_calendar']
+        base = calendar.get('avg_price_per_quintal', 3000)
+        prior = seasonal_prior(kb.CROP_DATABASE[crop_name])
+        for district_index in range(districts):
+            district = f'District {district_index + 1}'
+            profile = np.roll(prior * rng.uniform(0.6, 1.6), rng.integers(-1, 2)).reshape(1, 12)
+            season = seasonal_at(np.repeat(profile, len(days), axis=0), days)
+            level = np.cumsum(rng.normal(0, 0.006, len(days))) + rng.normal(0, 0.1)
+            latent = base * np.exp(season + level)
+            traded = rng.random(len(days)) < 0.85
+            
+            for row in np.flatnonzero(traded):
+                quotes = latent[row] * np.exp(rng.normal(0, 0.03, markets))
+                observed[(crop_name, district, int(days[row]))] = float(quotes.mean())
+                for market_index, price in enumerate(quotes):
+                    records.append({
+                        'state': 'Maharashtra', 'district': district, 'market': f'{district} APMC {market_index + 1}',
+                        'commodity': AGMARKNET_NAMES.get(crop_name, crop_name.title()), 'variety': 'Other',
+                        'arrival_date': dates[row].strftime('%d/%m/%Y'),
+                        'min_price': round(price * 0.9), 'max_price': round(price * 1.1), 'modal_price': round(price)
+                    })
+    return records, observed
+
+
+def last_observed(observed: dict, crop_name: str, district: str, day: int, max_gap: int = 7):
+    for back in range(max_gap + 1):
+        price = observed.get((crop_name, district, day - back))
+        if price is not None:
+            return price
+    return None
+
+
+def backtest(service: PriceForecastService, observed: dict, districts: int, origins: list) -> dict:
+    errors = {label: {'model': [], 'legacy': [], 'no_change': []} for label in HORIZONS}
+    fit_ms, district_ms, single_ms = [], [], []
+    district_forecasts = 0
+    
+    for origin in origins:
+        started = time.perf_counter()
+        service.model(today=origin)
+        fit_ms.append((time.perf_counter() - started) * 1000)
+        
+        for district_index in range(districts):
+            district = f'District {district_index + 1}'
+            started = time.perf_counter()
+            results = service.forecast_district('Maharashtra', district, today=origin)
+            district_ms.append((time.perf_counter() - started) * 1000)
+            district_forecasts += len(results)
+            
+            for result in results:
+                crop_name = result['crop']
+                current = last_observed(observed, crop_name, district, to_day(origin))
+                for label, horizon in HORIZONS.items():
+                    target = origin + timedelta(days=horizon)
+                    actual = observed.get((crop_name, district, to_day(target)))
+                    if actual is None or current is None:
+                        continue
+                    predictions = {
+                        'model': result['forecasts'][label]['price'],
+                        'legacy': legacy_forecast(crop_name, current, target, horizon),
+                        'no_change': current
+                    }
+                    for method, predicted in predictions.items():
+                        errors[label][method].append(abs(predicted - actual) / actual)
+            
+            targets = [origin + timedelta(days=horizon) for horizon in HORIZONS.values()]
+            for crop_name in CROPS:
+                started = time.perf_counter()
+                service.forecast(crop_name, targets, state='Maharashtra', district=district, today=origin)
+                single_ms.append((time.perf_counter() - started) * 1000)
+    
+    return {
+        'mape_percent': {
+            label: {method: round(float(np.mean(values)) * 100, 2) for method, values in methods.items()}
+            for label, methods in errors.items()
+        },
+        'forecast_points': sum(len(methods['model']) for methods in errors.values()),
+        'fit_ms_mean': round(float(np.mean(fit_ms)), 1),
+        'district_call_ms_mean': round(float(np.mean(district_ms)), 2),
+        'per_forecast_us_in_district_call': round(sum(district_ms) * 1000 / max(district_forecasts, 1), 1),
+        'single_forecast_ms_p50': round(float(np.percentile(single_ms, 50)), 3),
+        'single_forecast_ms_p95': round(float(np.percentile(single_ms, 95)), 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--districts', type=int, default=6)
+    parser.add_argument('--years', type=float, default=2.5, help='history length')
+    parser.add_argument('--markets', type=int, default=2, help='markets (quotes per day) per district')
+    parser.add_argument('--origins', type=int, default=10, help='forecast origins, 30 days apart')
+    args = parser.parse_args()
+    
+    end = date(2026, 9, 30)
+    records, observed = synthesize(args.districts, args.years, args.markets, end)
+    origins = [end - timedelta(days=30 * (k + 1)) for k in range(args.origins)][::-1]
+    
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        started = time.perf_counter()
+        inserted = PriceHistoryService().ingest(records)
+        ingest_s = time.perf_counter() - started
+        
+        service = PriceForecastService(history_days=730)
+        result = backtest(service, observed, args.districts, origins)
+        series = len(service.model(today=origins[-1]))
+    
+    print(f"{'quotes stored':>34}: {inserted} in {ingest_s:.1f}s")
+    print(f"{'series fitted per origin':>34}: {series}")
+    for key, value in result.items():
+        if key != 'mape_percent':
+            print(f"{key:>34}: {value}")
+    print(f"\n{'MAPE %':>10} {'model':>8} {'legacy':>8} {'no_change':>10}")
+    for label, methods in result['mape_percent'].items():
+        print(f"{label:>10} {methods['model']:>8} {methods['legacy']:>8} {methods['no_change']:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+Summarization benchmark - throughput and tail latency of SummarizationService
+through the LLM gateway, run offline against the deterministic stub backend.
+--compare also runs the old prompts (full agent output, indented JSON) to
+show prompt bytes and latency before and after the prompt budget.
+
+Usage (from KrishiMitra-backend):
+    python -m benchmarks.summarization_benchmark --requests 200 --threads 16 --max-concurrency 4
+    python -m benchmarks.summarization_benchmark --compare
+"""
+
+from app.services.agent_orchestrator import orchestrator
+from app.services.gemini_service import gemini_service
+from app.services.llm_gateway import LLMGateway, StubBackend
+from app.services import summarization_service as summarization_module
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+import argparse
+import json
+import threading
+import time
+
+CROPS = ['cotton', 'sugarcane', 'soybean', 'wheat', 'tur']
+
+
+class NullCache:
+    """Every lookup misses so each request reaches the backend"""
+    
+    def get(self, key):
+        return None
+    
+    def set(self, key, value, ttl=None):
+        pass
+
+
+class RecordingStub(StubBackend):
+    """Stub backend that also records the size of every prompt it receives"""
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.prompt_bytes = []
+        self._lock = threading.Lock()
+    
+    def generate(self, prompt, temperature):
+        with self._lock:
+            self.prompt_bytes.append(len(prompt.encode('utf-8')))
+        return super().generate(prompt, temperature)
+
+
+def legacy_payload(*args):
+    """Prompt payload as before the budget: the whole value (last argument) as indented JSON"""
+    return json.dumps(args[-1] or {}, indent=2)
+
+
+def sample_analysis(index: int) -> dict:
+    """Offline comprehensive analysis (no weather/soil API calls: location is 0,0)"""
+    crop_name = CROPS[index % len(CROPS)]
+    location = {'latitude': 0, 'longitude': 0, 'location_name': 'Pune'}
+    analysis_data = {
+        'soil_data': {'nitrogen': 280, 'phosphorus': 22, 'potassium': 210, 'ph': 7.2, 'soil_type': 'black'},
+        'location': location,
+        'soil_npk': {'nitrogen': 180, 'phosphorus': 15, 'potassium': 150},
+        'growth_stage': 'vegetative',
+        'land_area': 1.0 + index % 5,
+        'soil_moisture': 30 + index % 20,
+        'irrigation_type': 'drip',
+        'sowing_date': '2026-06-20',
+        'growth_data': {'plant_height_cm': 60, 'health': 'good'},
+        'markets': [
+            {'name': 'Pune APMC', 'price': 2400, 'location': {'latitude': 0.1, 'longitude': 0.1}},
+            {'name': 'Baramati', 'price': 2300, 'location': {'latitude': 0.3, 'longitude': 0.2}},
+            {'name': 'Solapur', 'price': 2250, 'location': {'latitude': 0.5, 'longitude': 0.4}}
+        ],
+        'user_context': {'location': 'Pune', 'farm_id': index}
+    }
+    return {
+        'crop_name': crop_name,
+        'outputs': orchestrator.comprehensive_analysis(crop_name, analysis_data, summarize=False),
+        'user_context': analysis_data['user_context']
+    }
+
+
+def run(samples: list, threads: int, max_concurrency: int, latency_ms: float) -> dict:
+    backend = RecordingStub(base_latency_ms=latency_ms)
+    gateway = LLMGateway(backend=backend, max_concurrency=max_concurrency, timeout=60)
+    gemini_service._gateway = gateway
+    summarization_module._summary_cache = NullCache()
+    
+    def summarize(sample):
+        return summarization_module.summarization_service.summarize_comprehensive_analysis(
+            sample['outputs'], sample['crop_name'], sample['user_context']
+        )
+    
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(summarize, samples))
+    elapsed = time.monotonic() - started
+    
+    stats = gateway.stats()
+    return {
+        'requests': len(samples),
+        'elapsed_s': round(elapsed, 2),
+        'throughput_rps': round(len(samples) / elapsed, 1),
+        'latency_ms': stats['latency_ms'],
+        'prompt_bytes_mean': sum(backend.prompt_bytes) // max(1, len(backend.prompt_bytes)),
+        'prompt_bytes_max': max(backend.prompt_bytes, default=0),
+        'prompt_tokens_per_call': stats['prompt_tokens'] // max(1, stats['calls']),
+        'failures': stats['failures']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--threads', type=int, default=16, help='concurrent callers (request threads)')
+    parser.add_argument('--max-concurrency', type=int, default=4, help='gateway slots (LLM_MAX_CONCURRENCY)')
+    parser.add_argument('--latency-ms', type=float, default=200, help='stub base latency')
+    parser.add_argument('--compare', action='store_true', help='also run the unbudgeted (legacy) prompts')
+    args = parser.parse_args()
+    
+    samples = [sample_analysis(i) for i in range(args.requests)]
+    runs = {}
+    if args.compare:
+        with mock.patch.multiple(summarization_module, agent_payload=legacy_payload,
+                                 comprehensive_payload=legacy_payload, context_payload=legacy_payload):
+            runs['before'] = run(samples, args.threads, args.max_concurrency, args.latency_ms)
+    runs['after' if args.compare else 'budgeted'] = run(samples, args.threads, args.max_concurrency, args.latency_ms)
+    
+    for label, result in runs.items():
+        print(f"[{label}]")
+        for key, value in result.items():
+            print(f"{key:>24}: {value}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,11 @@
+"""
+Celery worker entry point:
+
+    celery -A celery_worker worker --loglevel=info
+"""
+
+from app import create_app
+from app import tasks  # noqa: F401 - register tasks with the worker
+
+flask_app = create_app()
+celery = flask_app.extensions['celery']
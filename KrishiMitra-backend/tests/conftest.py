@@ -0,0 +1,5 @@
+import os
+
+# Run database-backed tests against in-memory SQLite unless a real test
+# database is provided. Must be set before app.config is imported.
+os.environ.setdefault('TEST_DATABASE_URL', 'sqlite://')
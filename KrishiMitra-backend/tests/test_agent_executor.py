@@ -0,0 +1,77 @@
+import threading
+import unittest
+import time
+from app.services.agent_executor import AgentExecutor, AgentTask
+
+
+def slow_agent(delay, value):
+    time.sleep(delay)
+    return {"value": value}
+
+
+def meeting_agent(barrier, value):
+    # Only returns once every agent sharing the barrier is running at the same time
+    barrier.wait()
+    return {"value": value}
+
+
+def failing_agent():
+    raise RuntimeError("boom")
+
+
+class TestAgentExecutor(unittest.TestCase):
+    
+    def setUp(self):
+        self.executor = AgentExecutor(max_workers=4, default_timeout=5)
+    
+    def test_independent_tasks_run_concurrently(self):
+        # Run one at a time, the first agent would wait on the barrier until it breaks
+        barrier = threading.Barrier(4, timeout=3)
+        tasks = [AgentTask(f"agent_{i}", meeting_agent, {"barrier": barrier, "value": i}) for i in range(4)]
+        
+        execution = self.executor.run(tasks)
+        
+        for i in range(4):
+            self.assertEqual(execution["results"][f"agent_{i}"], {"value": i})
+            self.assertEqual(execution["timings"][f"agent_{i}"]["status"], "success")
+    
+    def test_timeout_returns_partial_results(self):
+        tasks = [
+            AgentTask("fast", slow_agent, {"delay": 0.01, "value": "ok"}),
+            AgentTask("slow", slow_agent, {"delay": 1.0, "value": "late"}, timeout=0.1),
+        ]
+        
+        execution = self.executor.run(tasks)
+        
+        self.assertEqual(execution["results"]["fast"], {"value": "ok"})
+        self.assertIn("error", execution["results"]["slow"])
+        self.assertEqual(execution["timings"]["slow"]["status"], "timeout")
+    
+    def test_dependencies_receive_upstream_results(self):
+        def combine(upstream):
+            return {"total": upstream["a"]["value"] + upstream["b"]["value"]}
+        
+        tasks = [
+            AgentTask("combined", combine, depends_on=["a", "b"]),
+            AgentTask("a", slow_agent, {"delay": 0.05, "value": 1}),
+            AgentTask("b", slow_agent, {"delay": 0.01, "value": 2}),
+        ]
+        
+        execution = self.executor.run(tasks)
+        
+        self.assertEqual(execution["results"]["combined"], {"total": 3})
+    
+    def test_failed_dependency_skips_dependents(self):
+        tasks = [
+            AgentTask("broken", failing_agent),
+            AgentTask("dependent", slow_agent, {"delay": 0, "value": 1}, depends_on=["broken"]),
+        ]
+        
+        execution = self.executor.run(tasks)
+        
+        self.assertEqual(execution["timings"]["broken"]["status"], "error")
+        self.assertEqual(execution["timings"]["dependent"]["status"], "skipped")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import queue
+import unittest
+from app import create_app, db
+from app.models import AgentLog
+from app.agents.fertilization_agent import FertilizationAgent
+from app.services.agent_log_sink import AgentLogSink
+
+
+class TestAgentLogSink(unittest.TestCase):
+    
+    def setUp(self):
+        self.app = create_app('testing')
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+    
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+    
+    def make_sink(self, **overrides):
+        self.app.config.update({'AGENT_LOG_ASYNC': True, 'AGENT_LOG_FLUSH_INTERVAL': 0.05, **overrides})
+        sink = AgentLogSink()
+        sink.init_app(self.app)
+        return sink
+    
+    def test_agent_run_is_logged_without_touching_request_session(self):
+        FertilizationAgent().run(crop_name='cotton', current_soil_npk={'N': 200, 'P': 15, 'K': 150},
+                                 growth_stage='sowing', land_area=2)
+        
+        self.assertFalse(db.session.new)
+        log = AgentLog.query.one()
+        self.assertEqual(log.agent_type, 'fertilization_agent')
+        self.assertEqual(log.status, 'success')
+    
+    def test_background_worker_writes_batches(self):
+        sink = self.make_sink(AGENT_LOG_BATCH_SIZE=3)
+        for i in range(7):
+            sink.submit(agent_type='irrigation', action=f'run_{i}', input_data={'i': i})
+        sink.shutdown()
+        
+        self.assertEqual(AgentLog.query.count(), 7)
+        self.assertEqual(sink.stats['written'], 7)
+    
+    def test_drop_newest_when_queue_is_full(self):
+        sink = self.make_sink(AGENT_LOG_DROP_POLICY='drop_newest')
+        sink._ensure_worker = lambda: None  # Keep the queue from draining
+        sink._queue = queue.Queue(maxsize=2)
+        for i in range(5):
+            sink.submit(agent_type='harvest', action=f'run_{i}')
+        sink.flush()
+        
+        actions = [log.action for log in AgentLog.query.order_by(AgentLog.id)]
+        self.assertEqual(actions, ['run_0', 'run_1'])
+        self.assertEqual(sink.stats['dropped'], 3)
+    
+    def test_drop_oldest_keeps_most_recent(self):
+        sink = self.make_sink(AGENT_LOG_DROP_POLICY='drop_oldest')
+        sink._ensure_worker = lambda: None
+        sink._queue = queue.Queue(maxsize=2)
+        for i in range(5):
+            sink.submit(agent_type='harvest', action=f'run_{i}')
+        sink.flush()
+        
+        actions = [log.action for log in AgentLog.query.order_by(AgentLog.id)]
+        self.assertEqual(actions, ['run_3', 'run_4'])
+    
+    def test_large_payloads_are_sampled(self):
+        sink = self.make_sink(AGENT_LOG_ASYNC=False, AGENT_LOG_LARGE_PAYLOAD_BYTES=100,
+                              AGENT_LOG_PAYLOAD_SAMPLE_RATE=0)
+        sink.submit(agent_type='disease', input_data={'small': 1}, output_data={'blob': 'x' * 500})
+        
+        log = AgentLog.query.one()
+        self.assertEqual(log.input_data, {'small': 1})
+        self.assertTrue(log.output_data['_omitted'])
+        self.assertEqual(sink.stats['payloads_sampled_out'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+from datetime import date, datetime
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from app import create_app, db
+from app.services.crop_loader import serialize_crops
+from app.models import (User, Crop, FertilizationPlan, IrrigationSchedule, DiseaseDetection,
+                        HarvestPrediction, PricePrediction)
+
+
+class TestBatchedQueries(unittest.TestCase):
+    
+    def setUp(self):
+        self.app = create_app('testing')
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        
+        user = User(mobile_number='9999999999', name='Test Farmer')
+        user.set_password('secret')
+        db.session.add(user)
+        db.session.commit()
+        self.user_id = user.id
+        
+        self.client = self.app.test_client()
+        self.headers = {'Authorization': f"Bearer {create_access_token(identity=str(self.user_id))}"}
+    
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+    
+    def add_crops(self, count):
+        for i in range(count):
+            crop = Crop(user_id=self.user_id, crop_name='cotton', sowing_date=date(2026, 6, 15),
+                        land_area=2, current_stage='sowing')
+            db.session.add(crop)
+            db.session.flush()
+            db.session.add_all([
+                FertilizationPlan(crop_id=crop.id, agent_plan={}, estimated_cost=1000, savings_potential=100),
+                IrrigationSchedule(crop_id=crop.id, agent_schedule={
+                    'should_irrigate_now': True,
+                    'next_irrigation': {'date': '2026-07-01', 'water_amount_mm': 40}
+                }),
+                DiseaseDetection(crop_id=crop.id, detected_disease='Leaf Curl', severity='Low',
+                                 detected_at=datetime(2026, 7, 1)),
+                DiseaseDetection(crop_id=crop.id, detected_disease='Bollworm', severity='High',
+                                 detected_at=datetime(2026, 7, 5)),
+                HarvestPrediction(crop_id=crop.id, predicted_yield=10, predicted_date=date(2026, 11, 1)),
+                PricePrediction(crop_id=crop.id, crop_name='cotton', current_price=6000),
+            ])
+        db.session.commit()
+    
+    def count_queries(self, url):
+        statements = []
+        
+        def before_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        db.session.expunge_all()
+        event.listen(db.engine, 'before_cursor_execute', before_execute)
+        try:
+            response = self.client.get(url, headers=self.headers)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_execute)
+        self.assertEqual(response.status_code, 200)
+        return len(statements), response.get_json()
+    
+    def test_dashboard_query_count_is_constant(self):
+        self.add_crops(2)
+        few_queries, _ = self.count_queries('/api/dashboard/')
+        
+        self.add_crops(10)
+        many_queries, data = self.count_queries('/api/dashboard/')
+        
+        self.assertEqual(few_queries, many_queries)
+        self.assertEqual(data['total_crops'], 12)
+        # Only the latest disease detection per crop is reported
+        self.assertEqual(len(data['alerts']), 12)
+        self.assertTrue(all(alert['disease'] == 'Bollworm' for alert in data['alerts']))
+        self.assertEqual(len(data['upcoming_actions']), 12)
+    
+    def test_alerts_query_count_is_constant(self):
+        self.add_crops(2)
+        few_queries, _ = self.count_queries('/api/dashboard/alerts')
+        
+        self.add_crops(10)
+        many_queries, data = self.count_queries('/api/dashboard/alerts')
+        
+        self.assertEqual(few_queries, many_queries)
+        categories = [alert['category'] for alert in data['alerts']]
+        self.assertEqual(categories.count('irrigation'), 12)
+        self.assertEqual(categories.count('disease'), 12)
+    
+    def test_crop_list_query_count_is_constant(self):
+        self.add_crops(2)
+        few_queries, _ = self.count_queries('/api/crops/')
+        
+        self.add_crops(10)
+        many_queries, data = self.count_queries('/api/crops/')
+        
+        self.assertEqual(few_queries, many_queries)
+        self.assertEqual(len(data['crops']), 12)
+        for crop in data['crops']:
+            self.assertEqual(crop['fertilization']['estimated_cost'], 1000)
+            self.assertEqual(crop['irrigation']['crop_id'], crop['id'])
+            self.assertEqual(crop['harvest_prediction']['predicted_yield'], 10)
+    
+    def test_single_crop_serialization_matches_bulk(self):
+        self.add_crops(1)
+        crop = Crop.query.first()
+        
+        single = crop.to_dict(include_agents=True)
+        bulk = serialize_crops([crop])[0]
+        
+        self.assertEqual(single, bulk)
+
+
+if __name__ == '__main__':
+    unittest.main()
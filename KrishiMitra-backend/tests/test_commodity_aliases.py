@@ -0,0 +1,92 @@
+import unittest
+from datetime import date
+from app import create_app, db
+from app.knowledge.commodity_aliases import canonical_commodity, normalize_commodity, query_commodity, resolve_crop
+from app.services.market_store import MarketStore
+from app.services.price_history import PriceHistoryService
+
+RECORDS = [
+    {'state': 'Maharashtra', 'district': 'Latur', 'market': 'Latur', 'commodity': 'Arhar (Tur/Red Gram)(Whole)'},
+    {'state': 'Maharashtra', 'district': 'Latur', 'market': 'Udgir', 'commodity': 'Arhar Dal(Tur Dal)'},
+    {'state': 'Maharashtra', 'district': 'Latur', 'market': 'Latur', 'commodity': 'Green Gram (Moong)(Whole)'},
+    {'state': 'Maharashtra', 'district': 'Latur', 'market': 'Latur', 'commodity': 'Bengal Gram(Gram)(Whole)'},
+    {'state': 'Maharashtra', 'district': 'Akola', 'market': 'Akola', 'commodity': 'Kapas'},
+    {'state': 'Maharashtra', 'district': 'Akola', 'market': 'Akola', 'commodity': 'Cotton'},
+    {'state': 'Maharashtra', 'district': 'Latur', 'market': 'Latur', 'commodity': 'Soyabean'},
+    {'state': 'Maharashtra', 'district': 'Latur', 'market': 'Latur', 'commodity': 'Paddy(Dhan)(Common)'},
+    {'state': 'Maharashtra', 'district': 'Latur', 'market': 'Latur', 'commodity': 'Rice'},
+]
+
+
+class TestCommodityAliases(unittest.TestCase):
+    
+    def test_resolves_agmarknet_names_marathi_and_spellings(self):
+        cases = {
+            'Arhar (Tur/Red Gram)(Whole)': 'tur', 'Arhar (Tur/Red Gram)(Split)': 'tur', 'Toor Dal': 'tur',
+            'तूर': 'tur', 'Bengal Gram(Gram)(Whole)': 'gram', 'हरभरा': 'gram', 'Kapas': 'cotton',
+            'Paddy(Dhan)(Common)': 'rice', 'Soyabean': 'soybean', ' JOWAR(Sorghum) ': 'jowar'
+        }
+        for name, crop_id in cases.items():
+            self.assertEqual(resolve_crop(name), crop_id, name)
+    
+    def test_other_commodities_are_not_crops(self):
+        for name in ('Green Gram (Moong)(Whole)', 'Black Gram (Urd Beans)(Whole)', 'Cotton Seed', 'Onion'):
+            self.assertIsNone(resolve_crop(name), name)
+        self.assertEqual(canonical_commodity('Onion(Red)'), 'onion')
+        self.assertEqual(canonical_commodity('Green Gram (Moong)(Whole)'), 'green gram')
+        self.assertEqual(normalize_commodity('Arhar (Tur/Red Gram)(Whole)'), 'arhar tur red gram whole')
+    
+    def test_processed_products_have_their_own_ids(self):
+        cases = {'Arhar Dal(Tur Dal)': 'tur dal', 'Bengal Gram Dal (Chana Dal)': 'chana dal', 'Rice': 'milled rice',
+                 'Basmati Rice': 'milled rice', 'Paddy(Dhan)(Common)': 'rice', 'Arhar (Tur/Red Gram)(Whole)': 'tur'}
+        for name, commodity_id in cases.items():
+            self.assertEqual(canonical_commodity(name), commodity_id, name)
+        
+        # Still the same crop for knowledge lookups; a crop name queries the farm-gate series
+        self.assertEqual(resolve_crop('Arhar Dal(Tur Dal)'), 'tur')
+        self.assertEqual(query_commodity('rice'), 'rice')
+        self.assertEqual(query_commodity('तूर'), 'tur')
+        self.assertEqual(query_commodity('Tur Dal'), 'tur dal')
+    
+    def test_store_filters_by_canonical_id(self):
+        store = MarketStore(RECORDS)
+        
+        self.assertEqual(store.query(commodities=['tur']).tolist(), [0])
+        self.assertEqual(store.query(commodities=['तूर']).tolist(), [0])
+        self.assertEqual(store.query(commodities=['Tur Dal']).tolist(), [1])
+        self.assertEqual(store.query(commodities=['rice']).tolist(), [7])
+        self.assertEqual(store.query(commodities=['gram']).tolist(), [3])
+        self.assertEqual(store.query('maharashtra', 'akola', ['cotton', 'soybean']).tolist(), [4, 5])
+        self.assertEqual(store.query(commodities=['Soybean', 'Kapas']).tolist(), [6, 4, 5])
+
+
+class TestPriceHistoryAliases(unittest.TestCase):
+    
+    def setUp(self):
+        self.app = create_app('testing')
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+    
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+    
+    def test_recent_price_matches_aliases(self):
+        today = date(2026, 10, 1)
+        PriceHistoryService().ingest([
+            dict(record, arrival_date='01/10/2026', modal_price=price)
+            for record, price in zip(RECORDS, [7000, 9000, 8000, 5500, 7200, 7400, 4500, 2200, 3800])
+        ])
+        
+        # Dal and milled rice quotes stay out of the farm-gate series
+        self.assertEqual(PriceHistoryService().recent_price('tur', today=today)['price'], 7000.0)
+        self.assertEqual(PriceHistoryService().recent_price('Tur Dal', today=today)['price'], 9000.0)
+        self.assertEqual(PriceHistoryService().recent_price('rice', today=today)['price'], 2200.0)
+        self.assertEqual(PriceHistoryService().recent_price('gram', today=today)['price'], 5500.0)
+        self.assertEqual(PriceHistoryService().recent_price('cotton', today=today)['price'], 7300.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
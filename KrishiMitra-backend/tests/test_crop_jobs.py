@@ -0,0 +1,83 @@
+import unittest
+from unittest.mock import patch
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models import User, AgentJob, FertilizationPlan, HarvestPrediction
+
+
+class TestCropJobs(unittest.TestCase):
+    
+    def setUp(self):
+        self.app = create_app('testing')  # Celery runs tasks eagerly
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        
+        user = User(mobile_number='9999999999', name='Test Farmer')
+        user.set_password('secret')
+        db.session.add(user)
+        db.session.commit()
+        self.user_id = user.id
+        
+        self.client = self.app.test_client()
+        self.headers = {'Authorization': f"Bearer {create_access_token(identity=str(self.user_id))}"}
+    
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+    
+    def add_crop(self):
+        return self.client.post('/api/crops/add', headers=self.headers, json={
+            'crop_name': 'cotton',
+            'sowing_date': '2026-06-15',
+            'land_area': 2,
+            'irrigation_type': 'drip',
+            'soil_npk': {'N': 200, 'P': 15, 'K': 150}
+        })
+    
+    def test_add_crop_returns_job_and_runs_pipeline(self):
+        response = self.add_crop()
+        
+        self.assertEqual(response.status_code, 202)
+        body = response.get_json()
+        self.assertEqual(body['crop']['crop_name'], 'cotton')
+        
+        status = self.client.get(body['status_url'], headers=self.headers).get_json()
+        self.assertEqual(status['job']['status'], 'completed')
+        self.assertEqual(set(status['job']['stage_results']),
+                         {'fertilization', 'irrigation', 'harvest_prediction', 'price_prediction'})
+        self.assertEqual(FertilizationPlan.query.count(), 1)
+        self.assertIn('harvest_prediction', status['crop'])
+    
+    def test_failed_stage_is_recorded_and_others_continue(self):
+        with patch('app.services.crop_pipeline.harvest_prediction_agent.run', side_effect=RuntimeError('boom')):
+            body = self.add_crop().get_json()
+        
+        job = db.session.get(AgentJob, body['job_id'])
+        self.assertEqual(job.status, 'completed_with_errors')
+        self.assertEqual(job.stage_results['harvest_prediction'], {'status': 'error', 'error': 'boom'})
+        self.assertEqual(job.stage_results['price_prediction'], {'status': 'skipped'})
+        self.assertEqual(job.stage_results['fertilization'], {'status': 'success'})
+        self.assertEqual(HarvestPrediction.query.count(), 0)
+    
+    def test_falls_back_to_inline_run_without_broker(self):
+        with patch('app.routes.crops.enqueue_crop_pipeline', side_effect=ConnectionError('no broker')):
+            body = self.add_crop().get_json()
+        
+        self.assertEqual(body['job_status'], 'completed')
+    
+    def test_job_status_is_scoped_to_owner(self):
+        body = self.add_crop().get_json()
+        other = User(mobile_number='8888888888', name='Other Farmer')
+        other.set_password('secret')
+        db.session.add(other)
+        db.session.commit()
+        headers = {'Authorization': f"Bearer {create_access_token(identity=str(other.id))}"}
+        
+        response = self.client.get(f"/api/crops/jobs/{body['job_id']}", headers=headers)
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from unittest.mock import patch
+from app.knowledge import CROP_DATABASE, get_crop_data
+from app.knowledge.crop_resolver import CropResolver, crop_resolver, edit_distance
+
+
+class TestCropResolver(unittest.TestCase):
+    
+    def test_aliases_marathi_names_and_varieties(self):
+        cases = {'Soyabean': 'soybean', 'Tur dal': 'tur', 'Bt cotton': 'cotton', 'तूर': 'tur', 'Paddy': 'rice'}
+        for name, crop_id in cases.items():
+            match = crop_resolver.resolve(name)
+            self.assertEqual((match.crop_id, match.confidence, match.method), (crop_id, 1.0, 'alias'), name)
+        
+        variety = CROP_DATABASE['soybean']['varieties'][0]
+        self.assertEqual(crop_resolver.resolve(variety.upper())[:1], ('soybean',))
+        self.assertEqual(crop_resolver.resolve(variety).method, 'variety')
+    
+    def test_near_misses_resolve_fuzzily(self):
+        cases = {'soyabeen': 'soybean', 'तुर': 'tur', 'harbara': 'gram', 'grondnut': 'groundnut',
+                 'sugercane': 'sugarcane', 'whaet': 'wheat', 'toor daal': 'tur', 'sunflwer': 'sunflower'}
+        for name, crop_id in cases.items():
+            match = crop_resolver.resolve(name)
+            self.assertIsNotNone(match, name)
+            self.assertEqual(match.crop_id, crop_id, name)
+            self.assertGreaterEqual(match.confidence, 0.8, name)
+        self.assertEqual(edit_distance('whaet', 'wheat'), 1)
+    
+    def test_unknown_crops_do_not_resolve(self):
+        for name in ('Green Gram', 'grean gram', 'Black Gram', 'Dragon Fruit', 'bajra', 'बाजरी', 'onion', 'tea',
+                     'Safflower', 'Kardai', 'Gawar', 'Guar', 'Cluster Bean', 'गवार', 'maize', '', None):
+            self.assertIsNone(crop_resolver.resolve(name), name)
+    
+    def test_short_names_allow_at_most_one_edit(self):
+        self.assertEqual(crop_resolver.resolve('whet').crop_id, 'wheat')
+        self.assertEqual(crop_resolver.resolve('weat').crop_id, 'wheat')
+        for name in ('wht', 'gaho', 'tru'):  # two edits, or one edit on 4 letters or fewer
+            self.assertIsNone(crop_resolver.resolve(name), name)
+    
+    def test_build_indexes_given_crops(self):
+        resolver = CropResolver()
+        resolver.build({'tur': CROP_DATABASE['tur']})
+        
+        self.assertEqual(resolver.resolve('toor').crop_id, 'tur')
+        self.assertIsNone(resolver.resolve('soyabeen'))
+
+
+class TestGetCropData(unittest.TestCase):
+    
+    @patch('app.services.dynamic_knowledge_service.dynamic_knowledge_service.fetch_and_store')
+    @patch('app.services.dynamic_knowledge_service.dynamic_knowledge_service.get_stored', return_value=None)
+    def test_known_crops_skip_dynamic_fetch(self, get_stored, fetch_and_store):
+        self.assertIs(get_crop_data('Soyabean'), CROP_DATABASE['soybean'])
+        self.assertIs(get_crop_data('तूर'), CROP_DATABASE['tur'])
+        get_stored.assert_not_called()  # Exact aliases never touch the store
+        
+        self.assertIs(get_crop_data('soyabeen'), CROP_DATABASE['soybean'])
+        get_stored.assert_called_once_with('soyabeen')
+        fetch_and_store.assert_not_called()
+    
+    @patch('app.services.dynamic_knowledge_service.dynamic_knowledge_service.fetch_and_store')
+    @patch('app.services.dynamic_knowledge_service.dynamic_knowledge_service.get_stored')
+    def test_stored_dynamic_crop_wins_over_fuzzy_match(self, get_stored, fetch_and_store):
+        # A crop learned earlier whose name is a near-miss of jowar
+        stored = {'marathi_name': 'जवारी', 'duration_months': 3}
+        get_stored.side_effect = lambda name: stored if name.lower().strip() == 'jawari' else None
+        self.assertEqual(crop_resolver.resolve('Jawari').crop_id, 'jowar')
+        
+        self.assertIs(get_crop_data('Jawari'), stored)
+        self.assertIs(get_crop_data('jowari'), CROP_DATABASE['jowar'])
+        self.assertIs(get_crop_data('Jawar'), CROP_DATABASE['jowar'])
+        fetch_and_store.assert_not_called()
+    
+    @patch('app.services.dynamic_knowledge_service.dynamic_knowledge_service.fetch_and_store')
+    @patch('app.services.dynamic_knowledge_service.dynamic_knowledge_service.get_stored', return_value=None)
+    def test_unknown_crops_reach_dynamic_fetch(self, get_stored, fetch_and_store):
+        fetch_and_store.return_value = {'name': 'dragon fruit'}
+        
+        self.assertEqual(get_crop_data('Dragon Fruit'), {'name': 'dragon fruit'})
+        fetch_and_store.assert_called_once_with('Dragon Fruit')
+
+
+if __name__ == '__main__':
+    unittest.main()
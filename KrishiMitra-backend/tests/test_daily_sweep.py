@@ -0,0 +1,97 @@
+import unittest
+from datetime import date, timedelta
+from unittest.mock import patch
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models import User, Crop, Alert
+from app.services.daily_sweep import run_daily_sweep
+from app.utils.geo import encode_geohash, decode_geohash, group_by_geohash
+
+RAINY = {'rain_expected_24h': True, 'total_rainfall_mm': 12.0, 'temperature_max': 29}
+
+
+class TestGeohash(unittest.TestCase):
+    
+    def test_known_hash(self):
+        self.assertEqual(encode_geohash(57.64911, 10.40744, precision=11), 'u4pruydqqvj')
+    
+    def test_decode_returns_cell_center(self):
+        lat, lon = decode_geohash(encode_geohash(19.8762, 75.3433))
+        self.assertEqual(encode_geohash(lat, lon), encode_geohash(19.8762, 75.3433))
+        self.assertAlmostEqual(lat, 19.8762, delta=0.03)
+        self.assertAlmostEqual(lon, 75.3433, delta=0.03)
+    
+    def test_group_by_geohash(self):
+        groups = group_by_geohash([('a', 19.8762, 75.3433), ('b', 19.8765, 75.3436), ('c', 18.52, 73.85)])
+        self.assertEqual(sorted(groups.values()), [['a', 'b'], ['c']])
+
+
+class TestDailySweep(unittest.TestCase):
+    
+    def setUp(self):
+        self.app = create_app('testing')
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        
+        # Two neighbouring farms share a cell; the third is in another district
+        self.users = []
+        for mobile, lat, lon in [('9000000001', 19.8762, 75.3433),
+                                 ('9000000002', 19.8765, 75.3436),
+                                 ('9000000003', 18.5204, 73.8567)]:
+            user = User(mobile_number=mobile, name='Farmer', latitude=lat, longitude=lon)
+            user.set_password('secret')
+            db.session.add(user)
+            db.session.flush()
+            db.session.add(Crop(user_id=user.id, crop_name='cotton', land_area=2,
+                                sowing_date=date.today() - timedelta(days=60),
+                                current_stage='Germination/Seedling'))
+            self.users.append(user.id)
+        db.session.commit()
+    
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+    
+    def test_one_weather_call_per_cell(self):
+        with patch('app.services.daily_sweep.weather_service.analyze_for_irrigation', return_value=RAINY) as weather:
+            result = run_daily_sweep()
+        
+        self.assertEqual(result['crops_checked'], 3)
+        self.assertEqual(result['cells'], 2)
+        self.assertEqual(weather.call_count, 2)
+        self.assertEqual(len([a for a in result['alerts'] if a['type'] == 'irrigation_skip']), 3)
+    
+    def test_alerts_and_stages_persisted(self):
+        with patch('app.services.daily_sweep.weather_service.analyze_for_irrigation', return_value=RAINY):
+            result = run_daily_sweep()
+        
+        self.assertEqual(Alert.query.count(), len(result['alerts']))
+        self.assertEqual(Alert.query.filter_by(alert_type='stage_update').count(), 3)
+        self.assertEqual({crop.current_stage for crop in Crop.query.all()}, {'Vegetative Growth'})
+        self.assertEqual(result['stage_updates'][0]['old_stage'], 'Germination/Seedling')
+        self.assertEqual(result['stage_updates'][0]['new_stage'], 'Vegetative Growth')
+    
+    def test_weather_failure_skips_cell(self):
+        with patch('app.services.daily_sweep.weather_service.analyze_for_irrigation', side_effect=RuntimeError('down')):
+            result = run_daily_sweep()
+        
+        self.assertEqual(result['weather_calls'], 0)
+        self.assertEqual(len(result['stage_updates']), 3)
+    
+    def test_daily_check_route_is_scoped_and_not_persisted(self):
+        headers = {'Authorization': f"Bearer {create_access_token(identity=str(self.users[0]))}"}
+        with patch('app.services.daily_sweep.weather_service.analyze_for_irrigation', return_value=RAINY) as weather:
+            response = self.app.test_client().post('/api/v1/agent/daily_check', headers=headers)
+        
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual(weather.call_count, 1)
+        self.assertEqual(len(body['stage_updates']), 1)
+        self.assertEqual({a['type'] for a in body['alerts']}, {'stage_update', 'irrigation_skip'})
+        self.assertEqual(Alert.query.count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
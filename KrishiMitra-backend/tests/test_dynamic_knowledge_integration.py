@@ -4,6 +4,7 @@ import os
 import json
 import logging
 from app.services.dynamic_knowledge_service import dynamic_knowledge_service
+from app.services.knowledge_store import KnowledgeStore
 from app.config import Config
 
 # Configure logging
@@ -51,13 +52,12 @@ class TestDynamicKnowledgeIntegration(unittest.TestCase):
         # (loose check, just ensuring we got something relevant)
         
         # 3. Check Persistence
-        storage_file = dynamic_knowledge_service.storage_file
+        storage_file = dynamic_knowledge_service.store_path
         self.assertTrue(os.path.exists(storage_file), "Storage file was not created")
         
-        with open(storage_file, 'r') as f:
-            stored_data = json.load(f)
+        stored_data = KnowledgeStore(storage_file).get(self.test_crop.lower())
             
-        self.assertIn(self.test_crop.lower(), stored_data, "Crop was not persisted to storage file")
+        self.assertIsNotNone(stored_data, "Crop was not persisted to storage file")
         logger.info(f"Verified persistence in {storage_file}")
         
         # Print sample for user verification
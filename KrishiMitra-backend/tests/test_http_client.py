@@ -0,0 +1,57 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import requests
+from app.utils.http_client import HttpClient, CircuitBreaker, CircuitOpenError
+
+
+def fake_response(status_code):
+    response = MagicMock()
+    response.status_code = status_code
+    return response
+
+
+class TestHttpClient(unittest.TestCase):
+    
+    def setUp(self):
+        self.client = HttpClient(max_retries=0, failure_threshold=2, reset_timeout=60)
+    
+    def test_default_timeout_applied(self):
+        with patch.object(self.client.session, 'get', return_value=fake_response(200)) as mock_get:
+            self.client.get('https://api.example.com/data')
+        
+        self.assertEqual(mock_get.call_args.kwargs['timeout'], self.client.timeout)
+    
+    def test_circuit_opens_after_repeated_failures(self):
+        with patch.object(self.client.session, 'get', return_value=fake_response(503)) as mock_get:
+            self.client.get('https://slow.example.com/a')
+            self.client.get('https://slow.example.com/b')
+            
+            with self.assertRaises(CircuitOpenError):
+                self.client.get('https://slow.example.com/c')
+        
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(self.client.circuit_states()['slow.example.com'], 'open')
+    
+    def test_circuit_is_per_host(self):
+        with patch.object(self.client.session, 'get', side_effect=requests.ConnectionError('down')):
+            for _ in range(2):
+                with self.assertRaises(requests.ConnectionError):
+                    self.client.get('https://down.example.com/')
+        
+        with patch.object(self.client.session, 'get', return_value=fake_response(200)):
+            response = self.client.get('https://up.example.com/')
+        
+        self.assertEqual(response.status_code, 200)
+    
+    def test_half_open_trial_closes_circuit(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        
+        self.assertTrue(breaker.allow_request())
+        self.assertEqual(breaker.state, 'half_open')
+        breaker.record_success()
+        self.assertEqual(breaker.state, 'closed')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from app.services.dynamic_knowledge_service import DynamicKnowledgeService, MAX_SOURCES
+from app.utils.cache import TTLCache
+from app.utils.html_text import extract_text
+from app.utils.http_client import HostThrottle
+
+PAGE = ('<html><head><title>Dragon fruit</title><style>body {color: red}</style>'
+        '<script>var tracking = 1;</script></head><body><header>Site menu</header>'
+        '<h1>Dragon fruit farming</h1><p>Needs well&nbsp;drained   soil &amp; full sun.</p>'
+        '<footer>Copyright</footer></body></html>')
+
+
+class FakeResponse:
+    def __init__(self, body: bytes, status_code=200, content_type='text/html; charset=utf-8', delay=0.0,
+                 tracker=None):
+        self.body = body
+        self.status_code = status_code
+        self.headers = {'Content-Type': content_type}
+        self.encoding = 'utf-8'
+        self.delay = delay
+        self.bytes_read = 0
+        self.closed = False
+        self.tracker = tracker
+    
+    def iter_content(self, chunk_size=1):
+        if self.tracker:
+            self.tracker.enter()
+        time.sleep(self.delay)
+        if self.tracker:
+            self.tracker.leave()
+        for start in range(0, len(self.body), chunk_size):
+            self.bytes_read += len(self.body[start:start + chunk_size])
+            yield self.body[start:start + chunk_size]
+    
+    def close(self):
+        self.closed = True
+
+
+class ConcurrencyTracker:
+    """Peak number of responses being read at once"""
+    
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+    
+    def enter(self):
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+    
+    def leave(self):
+        with self.lock:
+            self.in_flight -= 1
+
+
+class FakeDDGS:
+    def text(self, query, max_results=3):
+        topic = query.split()[-2]
+        return [{'href': f'https://site{rank}.example/{topic}'} for rank in range(max_results)] + \
+               [{'href': 'https://shared.example/guide'}]
+
+
+class TestTextExtractor(unittest.TestCase):
+    
+    def test_drops_chrome_and_collapses_whitespace(self):
+        self.assertEqual(extract_text([PAGE]),
+                         'Dragon fruit Dragon fruit farming Needs well drained soil & full sun.')
+    
+    def test_incremental_chunks_and_char_cap(self):
+        html = '<p>' + 'word ' * 5000 + '</p>'
+        chunks = [html[i:i + 7] for i in range(0, len(html), 7)]
+        fed = []
+        
+        def tracked():
+            for chunk in chunks:
+                fed.append(chunk)
+                yield chunk
+        
+        text = extract_text(tracked(), max_chars=100)
+        self.assertEqual(len(text), 100)
+        self.assertLess(len(fed), len(chunks) / 10)  # Stopped early
+
+
+class TestHostThrottle(unittest.TestCase):
+    
+    def test_spaces_same_host_only(self):
+        clock, sleeps = [100.0], []
+        
+        def sleep(seconds):
+            sleeps.append(round(seconds, 6))
+            clock[0] += seconds
+        
+        throttle = HostThrottle(min_interval=0.1)
+        with patch('app.utils.http_client.time.monotonic', lambda: clock[0]), \
+             patch('app.utils.http_client.time.sleep', sleep):
+            for host in ['a', 'b', 'a', 'a']:
+                throttle.wait(host)
+        self.assertEqual(sleeps, [0.1, 0.1])
+
+
+class TestSearchAndScrape(unittest.TestCase):
+    
+    def setUp(self):
+        self.service = DynamicKnowledgeService(negative_cache=TTLCache())
+        self.service.search_throttle = HostThrottle(0)
+        self.service.page_throttle = HostThrottle(0)
+        self.responses = []
+        self.lock = threading.Lock()
+        self.tracker = ConcurrencyTracker()
+    
+    def fake_get(self, body=PAGE.encode(), delay=0.2):
+        def get(url, headers=None, stream=False):
+            response = FakeResponse(body, delay=delay, tracker=self.tracker)
+            with self.lock:
+                self.responses.append((url, response))
+            return response
+        return get
+    
+    def test_pages_fetched_concurrently_in_rank_order(self):
+        queries = ['dragon fruit guide soil India', 'dragon fruit fertilizer acre India',
+                   'dragon fruit diseases treatment India']
+        with patch('app.services.dynamic_knowledge_service.DDGS', FakeDDGS), \
+             patch('app.services.dynamic_knowledge_service.http_client.get', side_effect=self.fake_get()):
+            sources = self.service._search_and_scrape(queries)
+        
+        # 3 queries x 3 results + 1 shared url = 10 unique pages, read several at a time
+        self.assertEqual(len(self.responses), 10)
+        self.assertGreater(self.tracker.peak, 1)
+        self.assertEqual(len(sources), MAX_SOURCES)
+        self.assertEqual([url for url, _ in sources][:4], [
+            'https://site0.example/soil', 'https://site1.example/soil',
+            'https://site2.example/soil', 'https://shared.example/guide'
+        ])
+        self.assertIn('Needs well', sources[0][1])
+    
+    def test_stops_reading_at_byte_cap(self):
+        self.service.max_page_bytes = 50000
+        body = ('<html><body>' + '<div></div>' * 100000 + '</body></html>').encode()
+        with patch('app.services.dynamic_knowledge_service.http_client.get', side_effect=self.fake_get(body, 0)):
+            self.assertIsNone(self.service._scrape('https://big.example/page'))
+        
+        response = self.responses[0][1]
+        self.assertLessEqual(response.bytes_read, 50000 + 16384)
+        self.assertTrue(response.closed)
+    
+    def test_skips_non_html(self):
+        def get(url, headers=None, stream=False):
+            return FakeResponse(b'%PDF-1.4', content_type='application/pdf')
+        with patch('app.services.dynamic_knowledge_service.http_client.get', side_effect=get):
+            self.assertIsNone(self.service._scrape('https://docs.example/guide.pdf'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from app import create_app
+from app.knowledge import get_crop_data
+from app.services.dynamic_knowledge_service import DynamicKnowledgeService, KnowledgeFetchPending
+from app.utils.cache import DiskCache, TTLCache
+
+DRAGON_FRUIT = {'marathi_name': 'ड्रॅगन फ्रूट', 'duration_months': 12}
+
+
+class KnowledgeServiceTestCase(unittest.TestCase):
+    """Temporary storage and a counting stand-in for the web fetch"""
+    
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.store_path = os.path.join(self.tmp, 'dynamic_knowledge.sqlite3')
+        self.lock_dir = os.path.join(self.tmp, 'locks')
+        self.calls = 0
+        self.calls_lock = threading.Lock()
+    
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+    
+    def make_service(self, wait_seconds=10, negative_cache=None):
+        return DynamicKnowledgeService(store_path=self.store_path, legacy_file=None, lock_dir=self.lock_dir,
+                                       wait_seconds=wait_seconds, negative_cache=negative_cache or TTLCache())
+    
+    def slow_fetch(self, service, result=DRAGON_FRUIT, delay=0.3):
+        def fetch(crop_name, crop_key):
+            with self.calls_lock:
+                self.calls += 1
+            time.sleep(delay)
+            if result:
+                service.store_crop(crop_key, result)
+            return result
+        return fetch
+    
+    def run_concurrently(self, calls):
+        results = [None] * len(calls)
+        
+        def worker(index, call):
+            results[index] = call()
+        
+        threads = [threading.Thread(target=worker, args=(i, call)) for i, call in enumerate(calls)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+
+class TestKnowledgeSingleFlight(KnowledgeServiceTestCase):
+    
+    def test_concurrent_requests_fetch_once(self):
+        service = self.make_service()
+        with patch.object(service, '_fetch', side_effect=self.slow_fetch(service)):
+            results = self.run_concurrently([lambda: service.fetch_and_store('Dragon Fruit ')] * 10)
+        
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, [DRAGON_FRUIT] * 10)
+    
+    def test_workers_share_the_fetch(self):
+        # Separate instances stand in for separate worker processes
+        first, second = self.make_service(), self.make_service()
+        with patch.object(first, '_fetch', side_effect=self.slow_fetch(first)), \
+             patch.object(second, '_fetch', side_effect=self.slow_fetch(second)):
+            results = self.run_concurrently([lambda: first.fetch_and_store('dragon fruit'),
+                                             lambda: second.fetch_and_store('dragon fruit')])
+        
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, [DRAGON_FRUIT, DRAGON_FRUIT])
+        self.assertEqual(self.make_service().get_stored('Dragon Fruit'), DRAGON_FRUIT)
+    
+    def test_follower_gives_up_after_wait(self):
+        service = self.make_service(wait_seconds=0.05)
+        
+        def follow():
+            time.sleep(0.1)
+            try:
+                return service.fetch_and_store('dragon fruit')
+            except KnowledgeFetchPending as e:
+                return e
+        
+        with patch.object(service, '_fetch', side_effect=self.slow_fetch(service, delay=0.5)):
+            results = self.run_concurrently([lambda: service.fetch_and_store('dragon fruit'), follow])
+        
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results[0], DRAGON_FRUIT)
+        self.assertIsInstance(results[1], KnowledgeFetchPending)
+    
+    def test_pending_fetch_is_not_reported_as_unknown(self):
+        app = create_app('testing')
+        app.add_url_rule('/crop/<name>', 'crop', lambda name: get_crop_data(name) or ({'error': 'not found'}, 404))
+        
+        with patch('app.services.dynamic_knowledge_service.dynamic_knowledge_service.get_stored', return_value=None), \
+             patch('app.services.dynamic_knowledge_service.dynamic_knowledge_service.fetch_and_store',
+                   side_effect=KnowledgeFetchPending('Dragon Fruit')):
+            with self.assertRaises(KnowledgeFetchPending):
+                get_crop_data('Dragon Fruit')
+            response = app.test_client().get('/crop/dragon fruit')
+        
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.headers['Retry-After'], '10')
+        self.assertEqual(response.get_json()['status'], 'pending')
+    
+    def test_failed_fetch_releases_followers(self):
+        service = self.make_service()
+        with patch.object(service, '_fetch', side_effect=self.slow_fetch(service, result=None)):
+            results = self.run_concurrently([lambda: service.fetch_and_store('unknown crop')] * 5)
+        
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, [None] * 5)
+
+
+class TestUnknownCropCache(KnowledgeServiceTestCase):
+    
+    def test_failed_name_is_not_refetched_during_backoff(self):
+        service = self.make_service()
+        with patch.object(service, '_fetch', side_effect=self.slow_fetch(service, result=None, delay=0)):
+            self.assertIsNone(service.fetch_and_store('Cottn'))
+            self.assertIsNone(service.fetch_and_store('cottn '))
+        
+        self.assertEqual(self.calls, 1)
+        stats = service.negative_cache_stats()
+        self.assertEqual(stats['blocked_lookups'], 1)
+        self.assertEqual(stats['recorded_failures'], 1)
+    
+    def test_backoff_doubles_and_caps(self):
+        service = self.make_service()
+        service.negative_base_ttl, service.negative_max_ttl = 100, 300
+        
+        windows = []
+        for _ in range(4):
+            before = time.time()
+            service._record_miss('cottn')
+            windows.append(round(service.negative_cache.get('cottn')['retry_at'] - before))
+        self.assertEqual(windows, [100, 200, 300, 300])
+    
+    def test_retry_after_backoff_and_success_clears(self):
+        service = self.make_service()
+        service.negative_cache.set('dragon fruit', {'failures': 3, 'retry_at': time.time() - 1})
+        with patch.object(service, '_fetch', side_effect=self.slow_fetch(service, delay=0)):
+            self.assertEqual(service.fetch_and_store('Dragon Fruit'), DRAGON_FRUIT)
+        
+        self.assertIsNone(service.negative_cache.get('dragon fruit'))
+    
+    def test_shared_across_workers(self):
+        path = os.path.join(self.tmp, 'unknown_crops.sqlite3')
+        first = self.make_service(negative_cache=DiskCache(path))
+        second = self.make_service(negative_cache=DiskCache(path))
+        with patch.object(first, '_fetch', side_effect=self.slow_fetch(first, result=None, delay=0)), \
+             patch.object(second, '_fetch', side_effect=self.slow_fetch(second, result=None, delay=0)):
+            first.fetch_and_store('xyz')
+            second.fetch_and_store('xyz')
+        
+        self.assertEqual(self.calls, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
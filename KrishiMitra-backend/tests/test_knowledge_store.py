@@ -0,0 +1,142 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from app.services.dynamic_knowledge_service import DynamicKnowledgeService
+from app.services.knowledge_store import KnowledgeStore
+from app.utils.cache import TTLCache
+
+
+class TestKnowledgeStore(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, 'knowledge.sqlite3')
+    
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+    
+    def test_upsert_bumps_version(self):
+        store = KnowledgeStore(self.path)
+        self.assertEqual(store.upsert('dragon fruit', {'duration_months': 12}), 1)
+        self.assertEqual(store.upsert('quinoa', {'duration_months': 4}), 2)
+        self.assertEqual(store.upsert('dragon fruit', {'duration_months': 18}), 3)
+        
+        self.assertEqual(store.get('dragon fruit'), {'duration_months': 18})
+        self.assertEqual(store.changes_since(1), (3, {'quinoa': {'duration_months': 4},
+                                                      'dragon fruit': {'duration_months': 18}}))
+        self.assertEqual(store.changes_since(3), (3, {}))
+    
+    def test_concurrent_writers(self):
+        def write(worker):
+            store = KnowledgeStore(self.path)  # Own connection, like a separate process
+            for index in range(25):
+                store.upsert(f'crop-{worker}-{index}', {'worker': worker})
+        
+        threads = [threading.Thread(target=write, args=(worker,)) for worker in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        version, rows = KnowledgeStore(self.path).changes_since(0)
+        self.assertEqual(version, 100)
+        self.assertEqual(len(rows), 100)
+    
+    def test_imports_legacy_json_once(self):
+        legacy = os.path.join(self.tmp, 'dynamic_knowledge.json')
+        with open(legacy, 'w') as f:
+            json.dump({'quinoa': {'duration_months': 4}}, f)
+        
+        store = KnowledgeStore(self.path)
+        self.assertEqual(store.import_json(legacy), 1)
+        self.assertEqual(store.import_json(legacy), 0)
+        self.assertEqual(store.get('quinoa'), {'duration_months': 4})
+
+
+class TestWorkerRefresh(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, 'knowledge.sqlite3')
+    
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+    
+    def make_service(self):
+        return DynamicKnowledgeService(store_path=self.path, legacy_file=None, negative_cache=TTLCache())
+    
+    def test_workers_see_each_others_crops(self):
+        first, second = self.make_service(), self.make_service()
+        self.assertEqual(second.dynamic_knowledge, {})
+        
+        first.store_crop('dragon fruit', {'duration_months': 12})
+        self.assertEqual(second.get_stored('Dragon Fruit'), {'duration_months': 12})
+        self.assertEqual(second.fetch_and_store('dragon fruit'), {'duration_months': 12})
+    
+    def test_refresh_reads_only_changed_rows(self):
+        first, second = self.make_service(), self.make_service()
+        for index in range(10):
+            first.store_crop(f'crop-{index}', {'index': index})
+        self.assertEqual(len(second.dynamic_knowledge), 10)
+        
+        first.store_crop('crop-new', {'index': 10})
+        with patch.object(second.store, 'changes_since', wraps=second.store.changes_since) as changes:
+            self.assertEqual(len(second.dynamic_knowledge), 11)
+            self.assertEqual(len(second.dynamic_knowledge), 11)  # Unchanged: no query
+        
+        self.assertEqual(changes.call_count, 1)
+        self.assertEqual(changes.call_args.args, (10,))
+    
+    def test_store_during_refresh_is_not_lost(self):
+        service, other = self.make_service(), self.make_service()
+        service.refresh()
+        other.store_crop('quinoa', {'duration_months': 4})
+        stored = threading.Event()
+        
+        def store():
+            service.store_crop('dragon fruit', {'duration_months': 12})
+            stored.set()
+        
+        class Changes(dict):
+            # Runs store_crop while refresh is merging (after it has read the old dict);
+            # overriding __iter__ makes the merge call keys() instead of the dict fast path
+            def __iter__(self):
+                return super().__iter__()
+            
+            def keys(self):
+                threading.Thread(target=store).start()
+                stored.wait(0.5)
+                return super().keys()
+        
+        real_changes_since = service.store.changes_since
+        
+        def changes_since(version):
+            latest, rows = real_changes_since(version)
+            return latest, Changes(rows)
+        
+        with patch.object(service.store, 'changes_since', side_effect=changes_since):
+            service.refresh()
+        self.assertTrue(stored.wait(5))
+        
+        self.assertEqual(set(service._knowledge), {'quinoa', 'dragon fruit'})
+        self.assertEqual(service.get_stored('Dragon Fruit'), {'duration_months': 12})
+    
+    def test_own_store_is_not_pulled_again(self):
+        service, other = self.make_service(), self.make_service()
+        service.refresh()
+        service.store_crop('dragon fruit', {'duration_months': 12})
+        other.store_crop('quinoa', {'duration_months': 4})
+        
+        with patch.object(service.store, 'changes_since', wraps=service.store.changes_since) as changes:
+            service.refresh()
+        self.assertEqual(changes.call_args.args, (1,))
+        self.assertEqual(service._version, 2)
+        self.assertEqual(set(service.dynamic_knowledge), {'dragon fruit', 'quinoa'})
+
+
+if __name__ == '__main__':
+    unittest.main()
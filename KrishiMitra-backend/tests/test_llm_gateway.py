@@ -0,0 +1,117 @@
+import threading
+import time
+import unittest
+from app.services.gemini_service import GeminiService
+from app.services.llm_gateway import (LLMGateway, LLMResult, LLMRetryableError, LLMTimeoutError,
+                                      StubBackend)
+
+
+class CountingBackend:
+    """Records peak concurrency; fails with a retryable error the first `failures` times"""
+    
+    name = 'counting'
+    
+    def __init__(self, latency=0.05, failures=0):
+        self.latency = latency
+        self.failures = failures
+        self.calls = 0
+        self.in_flight = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+    
+    def generate(self, prompt, temperature):
+        with self.lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            fail = self.calls <= self.failures
+        try:
+            time.sleep(self.latency)
+            if fail:
+                raise LLMRetryableError('503 overloaded')
+            return LLMResult(text=f' reply to {prompt} ', prompt_tokens=10, output_tokens=5)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+class BlockedBackend:
+    """Replies only once `released` is set"""
+    
+    name = 'blocked'
+    
+    def __init__(self):
+        self.released = threading.Event()
+    
+    def generate(self, prompt, temperature):
+        self.released.wait(10)
+        return LLMResult(text='late', prompt_tokens=1, output_tokens=1)
+
+
+class TestLLMGateway(unittest.TestCase):
+    
+    def test_concurrency_is_capped(self):
+        backend = CountingBackend(latency=0.05)
+        gateway = LLMGateway(backend=backend, max_concurrency=2, timeout=5)
+        
+        threads = [threading.Thread(target=gateway.generate, args=(f'prompt {i}',)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(backend.calls, 8)
+        self.assertEqual(backend.peak, 2)
+    
+    def test_deadline(self):
+        backend = BlockedBackend()
+        gateway = LLMGateway(backend=backend, max_concurrency=1)
+        try:
+            # The backend cannot reply until released, so only the deadline can end the call
+            with self.assertRaises(LLMTimeoutError):
+                gateway.generate('slow', timeout=0.1)
+            self.assertFalse(backend.released.is_set())
+        finally:
+            backend.released.set()
+        self.assertEqual(gateway.stats()['timeouts'], 1)
+    
+    def test_retries_transient_failures(self):
+        backend = CountingBackend(latency=0, failures=2)
+        gateway = LLMGateway(backend=backend, max_retries=2, backoff=0.01, timeout=5)
+        
+        self.assertEqual(gateway.generate('hello'), ' reply to hello ')
+        self.assertEqual(backend.calls, 3)
+        self.assertEqual(gateway.stats()['retries'], 2)
+    
+    def test_gives_up_after_max_retries(self):
+        gateway = LLMGateway(backend=CountingBackend(latency=0, failures=5), max_retries=1, backoff=0.01)
+        with self.assertRaises(LLMRetryableError):
+            gateway.generate('hello')
+        self.assertEqual(gateway.stats()['failures'], 1)
+    
+    def test_token_and_latency_accounting(self):
+        gateway = LLMGateway(backend=CountingBackend(latency=0.01))
+        for i in range(3):
+            gateway.generate(f'p{i}')
+        
+        stats = gateway.stats()
+        self.assertEqual((stats['calls'], stats['prompt_tokens'], stats['output_tokens']), (3, 30, 15))
+        self.assertGreaterEqual(stats['latency_ms']['p50'], 10)
+
+
+class TestStubBackend(unittest.TestCase):
+    
+    def test_deterministic(self):
+        stub = StubBackend(base_latency_ms=1)
+        self.assertEqual(stub.generate('same prompt', 0.7), stub.generate('same prompt', 0.2))
+        self.assertEqual(stub.latency_seconds('same prompt'), stub.latency_seconds('same prompt'))
+        self.assertNotEqual(stub.generate('a', 0.7).text, stub.generate('b', 0.7).text)
+    
+    def test_gemini_service_text_and_json(self):
+        service = GeminiService(gateway=LLMGateway(backend=StubBackend(base_latency_ms=1)))
+        self.assertTrue(service.generate_text_response('Summarize this plan').startswith('[stub summary'))
+        self.assertEqual(service.generate_json_response('Extract data. Return ONLY valid JSON.')['stub'], True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import unittest
+from unittest.mock import patch
+import numpy as np
+from app import create_app, db
+from app.knowledge.mandi_gazetteer import Mandi, normalize_market_name
+from app.models import User
+from app.services.mandi_locator import MandiIndex, MandiLocator
+from app.services.market_store import MarketStore
+from app.utils.geo import haversine_km
+from flask_jwt_extended import create_access_token
+
+PUNE = (18.5204, 73.8567)
+
+RECORDS = [
+    {'state': 'Maharashtra', 'district': 'Pune', 'market': 'Pune', 'commodity': 'Onion', 'modal_price': 1800.0},
+    {'state': 'Maharashtra', 'district': 'Pune', 'market': 'Baramati', 'commodity': 'Onion', 'modal_price': 2400.0},
+    {'state': 'Maharashtra', 'district': 'Pune', 'market': 'Pune(Pimpri) APMC', 'commodity': 'Onion',
+     'modal_price': 1900.0},
+    {'state': 'Maharashtra', 'district': 'Nashik', 'market': 'Lasalgaon', 'commodity': 'Onion', 'modal_price': 2600.0},
+    {'state': 'Maharashtra', 'district': 'Pune', 'market': 'Pune', 'commodity': 'Cotton', 'modal_price': 7000.0},
+    {'state': 'Maharashtra', 'district': 'Nowhere', 'market': 'Unmapped', 'commodity': 'Onion', 'modal_price': 9000.0},
+]
+
+
+class TestMandiIndex(unittest.TestCase):
+    
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        lats, lons = rng.uniform(8, 30, 3000), rng.uniform(68, 90, 3000)
+        self.index = MandiIndex([Mandi('S', 'D', f'm{i}', lat, lon) for i, (lat, lon) in enumerate(zip(lats, lons))])
+    
+    def test_haversine(self):
+        self.assertAlmostEqual(float(haversine_km(*PUNE, [19.9975], [73.7898])[0]), 164.4, places=1)
+        self.assertEqual(float(haversine_km(*PUNE, [PUNE[0]], [PUNE[1]])[0]), 0.0)
+    
+    def test_nearest_matches_brute_force(self):
+        ids, distances = self.index.nearest(19.0, 75.0, k=15)
+        brute = np.argsort(haversine_km(19.0, 75.0, self.index.lats, self.index.lons), kind='stable')[:15]
+        
+        self.assertEqual(ids.tolist(), brute.tolist())
+        self.assertTrue(np.all(np.diff(distances) >= 0))
+    
+    def test_within_radius_matches_brute_force(self):
+        ids, distances = self.index.within(21.0, 78.0, 120)
+        expected = np.flatnonzero(haversine_km(21.0, 78.0, self.index.lats, self.index.lons) <= 120)
+        
+        self.assertEqual(sorted(ids.tolist()), expected.tolist())
+        self.assertTrue(np.all(distances <= 120))
+    
+    def test_nearest_respects_max_radius(self):
+        ids, distances = self.index.nearest(19.0, 75.0, k=500, max_radius_km=60)
+        self.assertTrue(0 < len(ids) < 500)
+        self.assertTrue(np.all(distances <= 60))
+
+
+class TestMandiLocator(unittest.TestCase):
+    
+    def setUp(self):
+        self.locator = MandiLocator(gazetteer_path='', transport_cost_per_km=5)
+        self.store = MarketStore(RECORDS)
+    
+    def test_market_names_are_normalized(self):
+        self.assertEqual(normalize_market_name('Pune(Pimpri) APMC'), 'pune pimpri')
+        pimpri = self.locator.locate('Maharashtra', 'Pune', 'Pune(Pimpri) APMC')
+        self.assertEqual(self.locator.index.mandis[pimpri].market, 'Pune(Pimpri)')
+    
+    def test_unknown_market_falls_back_to_district_then_unknown(self):
+        devala = self.locator.locate('Maharashtra', 'Nashik', 'Devala')
+        self.assertEqual(self.locator.index.mandis[devala].market, 'Nashik')
+        self.assertEqual(self.locator.locate('Maharashtra', 'Nowhere', 'Unmapped'), -1)
+    
+    def test_nearest_mandis(self):
+        nearest = self.locator.nearest_mandis(*PUNE, k=3)
+        self.assertEqual(nearest[0]['market'], 'Pune')
+        self.assertEqual(len(nearest), 3)
+    
+    def test_rank_by_net_price_within_radius(self):
+        ranked = self.locator.rank_markets(self.store, *PUNE, commodities=['onion'], radius_km=100)
+        
+        # Lasalgaon (~180 km) is out of range and "Unmapped" has no coordinates
+        self.assertEqual([r['market'] for r in ranked], ['Baramati', 'Pune(Pimpri) APMC', 'Pune'])
+        baramati = ranked[0]
+        self.assertAlmostEqual(baramati['net_price'], 2400 - baramati['distance_km'] * 5, delta=1)
+        self.assertAlmostEqual(baramati['transport_cost'], baramati['distance_km'] * 5, delta=1)
+    
+    def test_wider_radius_includes_distant_markets(self):
+        ranked = self.locator.rank_markets(self.store, *PUNE, commodities=['onion'], radius_km=300)
+        self.assertIn('Lasalgaon', [r['market'] for r in ranked])
+    
+    def test_price_agent_uses_nearby_mandis_without_client_markets(self):
+        from app.agents.price_analysis_agent import price_analysis_agent
+        with patch('app.agents.price_analysis_agent.data_gov_service.get_store', return_value=self.store):
+            result = price_analysis_agent.execute('cotton', [], {'latitude': PUNE[0], 'longitude': PUNE[1]})
+        
+        self.assertEqual(result['top_markets'][0]['market_name'], 'Pune')
+        self.assertEqual(result['top_markets'][0]['current_price'], 7000.0)
+
+
+class TestNearbyMarketsRoute(unittest.TestCase):
+    
+    def setUp(self):
+        self.app = create_app('testing')
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        
+        user = User(mobile_number='9000000021', name='Farmer', location='Pune',
+                    latitude=PUNE[0], longitude=PUNE[1])
+        user.set_password('secret')
+        db.session.add(user)
+        db.session.commit()
+        self.headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+        self.client = self.app.test_client()
+    
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+    
+    def test_markets_ranked_around_saved_location(self):
+        with patch('app.routes.marketplace.data_gov_service.get_store', return_value=MarketStore(RECORDS)):
+            response = self.client.get('/api/marketplace/nearby-markets?commodity=onion&radius_km=100',
+                                       headers=self.headers)
+        
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual(body['user_location']['address'], 'Pune')
+        self.assertEqual(body['markets'][0]['market'], 'Baramati')
+        self.assertEqual(body['nearest_mandis'][0]['market'], 'Pune')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from app.services.data_gov_service import DataGovService
+from app.services.market_store import MarketStore
+
+RAW_RECORDS = [
+    {'state': 'Maharashtra', 'district': 'Pune', 'market': 'Pune', 'commodity': 'Onion',
+     'modal_price': '1,800', 'min_price': '1500', 'max_price': '2000'},
+    {'state': 'Maharashtra', 'district': 'Aurangabad', 'market': 'Lasur', 'commodity': 'Cotton',
+     'modal_price': '7100', 'min_price': '6900', 'max_price': '7300'},
+    {'state': 'Maharashtra', 'district': 'Pune', 'market': 'Junnar', 'commodity': 'Tomato',
+     'modal_price': '900', 'min_price': '600', 'max_price': '1200'},
+    {'state': 'Karnataka', 'district': 'Pune', 'market': 'Elsewhere', 'commodity': 'Onion',
+     'modal_price': 'NA', 'min_price': '0', 'max_price': '0'},
+    {'state': 'Maharashtra', 'district': 'Pune', 'market': 'Pimpri', 'commodity': 'Onion(Red)',
+     'modal_price': '2100', 'min_price': '1900', 'max_price': '2300'},
+]
+
+
+class TestMarketStore(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.service = DataGovService()
+        self.service.snapshot_path = os.path.join(self.tmpdir.name, 'market_snapshot.json')
+        self.store = MarketStore(self.service.process_market_data(RAW_RECORDS))
+    
+    def test_prices_parsed_once_at_ingest(self):
+        self.assertEqual(self.store.prices['modal_price'].tolist(), [1800.0, 7100.0, 900.0, 0.0, 2100.0])
+    
+    def test_location_and_commodity_lookup(self):
+        rows = self.store.query('maharashtra', 'pune', ['onion'])
+        
+        # Substring semantics: "onion" also matches "Onion(Red)"
+        self.assertEqual([r['market'] for r in self.store.records(rows)], ['Pune', 'Pimpri'])
+    
+    def test_results_grouped_per_commodity(self):
+        rows = self.store.query('Maharashtra', 'Pune', ['Tomato', 'Onion'])
+        
+        self.assertEqual(self.store.records(rows)[0]['commodity'], 'Tomato')
+        self.assertEqual(len(rows), 3)
+    
+    def test_no_match_returns_empty(self):
+        self.assertEqual(len(self.store.query('Gujarat', None, None)), 0)
+    
+    def test_service_search_uses_snapshot(self):
+        response = patch('app.services.data_gov_service.http_client.get').start()
+        self.addCleanup(patch.stopall)
+        response.return_value.json.return_value = {'records': RAW_RECORDS}
+        
+        total, markets = self.service.search_markets('Maharashtra', '', ['Onion'], limit=1)
+        self.service.search_markets('Maharashtra', 'Pune', None)
+        
+        self.assertEqual(response.call_count, 1)
+        self.assertEqual(total, 2)
+        self.assertEqual(markets, [{
+            'state': 'Maharashtra', 'district': 'Pune', 'market': 'Pune', 'commodity': 'Onion',
+            'variety': '', 'arrival_date': '', 'min_price': 1500.0, 'max_price': 2000.0, 'modal_price': 1800.0
+        }])
+
+
+def page_response(records, total):
+    response = MagicMock()
+    response.json.return_value = {'records': records, 'total': total}
+    return response
+
+
+class TestMarketSnapshotRefresh(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.addCleanup(patch.stopall)
+        self.service = DataGovService()
+        self.service.snapshot_path = os.path.join(self.tmpdir.name, 'market_snapshot.json')
+    
+    def write_snapshot(self, records, age):
+        with open(self.service.snapshot_path, 'w') as f:
+            json.dump({'fetched_at': time.time() - age, 'records': records}, f)
+    
+    def test_pages_fetched_concurrently_and_in_order(self):
+        pages = {offset: [{'market': f'M{offset + i}'} for i in range(1000)] for offset in (0, 1000)}
+        pages[2000] = [{'market': 'M2000'}]
+        
+        def fake_get(url, params=None, timeout=None):
+            return page_response(pages[params['offset']], 2001)
+        
+        with patch('app.services.data_gov_service.http_client.get', side_effect=fake_get) as mock_get:
+            records = self.service.fetch_all_records()
+        
+        self.assertEqual(mock_get.call_count, 3)
+        self.assertEqual([r['market'] for r in records], [f'M{i}' for i in range(2001)])
+        self.assertTrue(os.path.exists(self.service.snapshot_path))
+        self.assertFalse([f for f in os.listdir(self.tmpdir.name) if f.endswith('.tmp')])
+    
+    def test_fresh_snapshot_from_another_worker_is_reused(self):
+        self.write_snapshot(RAW_RECORDS, age=10)
+        
+        with patch('app.services.data_gov_service.http_client.get') as mock_get:
+            total, _ = self.service.search_markets('Maharashtra', 'Pune', ['Onion'])
+        
+        mock_get.assert_not_called()
+        self.assertEqual(total, 2)
+    
+    def test_stale_snapshot_served_while_refreshing(self):
+        self.write_snapshot(RAW_RECORDS[:1], age=self.service.cache_duration + 1)
+        
+        with patch.object(self.service, '_refresh_in_background') as background:
+            records = self.service.fetch_all_records()
+        
+        background.assert_called_once()
+        self.assertEqual(len(records), 1)
+    
+    def test_failed_refresh_keeps_previous_snapshot(self):
+        self.write_snapshot(RAW_RECORDS, age=self.service.cache_duration + 1)
+        self.service._load_snapshot()
+        
+        with patch('app.services.data_gov_service.http_client.get', side_effect=ConnectionError('down')):
+            self.assertFalse(self.service.refresh())
+        
+        self.assertEqual(len(self.service.records), len(RAW_RECORDS))
+
+
+if __name__ == '__main__':
+    unittest.main()
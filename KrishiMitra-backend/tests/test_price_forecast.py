@@ -0,0 +1,160 @@
+import math
+import unittest
+from datetime import date, timedelta
+from unittest.mock import patch
+import numpy as np
+from app import create_app, db
+from app.agents.disease_agent import PricePredictionAgent
+from app.knowledge import crop_knowledge_base as kb
+from app.models import User
+from app.services.price_forecast import PriceForecastService, SeasonalModel, seasonal_prior, to_day
+from app.services.price_history import PriceHistoryService
+from flask_jwt_extended import create_access_token
+
+TODAY = date(2026, 9, 30)
+
+
+def history(commodity: str, district: str, days: int, start_price: float, daily_change: float,
+            state: str = 'Maharashtra', end: date = TODAY):
+    """Daily quotes rising (or falling) by daily_change per day up to `end`"""
+    return [
+        {'state': state, 'district': district, 'market': f'{district} APMC', 'commodity': commodity,
+         'variety': 'Other', 'arrival_date': (end - timedelta(days=days - 1 - i)).strftime('%d/%m/%Y'),
+         'min_price': 0, 'max_price': 0, 'modal_price': round(start_price * math.exp(daily_change * i), 2)}
+        for i in range(days)
+    ]
+
+
+class TestSeasonalModel(unittest.TestCase):
+    
+    def test_fit_recovers_seasonality_and_trend(self):
+        rng = np.random.default_rng(1)
+        days = np.arange(to_day(date(2024, 10, 1)), to_day(TODAY) + 1)
+        peak = to_day(date(2025, 11, 15))
+        prices = 2000 * np.exp(0.12 * np.cos(2 * np.pi * (days - peak) / 365.25) + 0.0004 * (days - days[0])
+                               + rng.normal(0, 0.01, len(days)))
+        
+        model = SeasonalModel.fit([('cotton', '', '')], np.zeros(len(days)), days, prices, np.zeros((1, 12)))
+        
+        self.assertIn(int(np.argmax(model.profiles[0])), (9, 10, 11))  # Oct-Dec
+        self.assertIn(int(np.argmin(model.profiles[0])), (3, 4, 5))    # Apr-Jun
+        self.assertGreater(model.trend[0], 0)
+        mean, sd = model.predict(np.array([0]), np.array([[to_day(TODAY) + 7, to_day(TODAY) + 30]]))
+        self.assertLess(sd[0, 0], sd[0, 1])
+    
+    def test_calendar_prior_without_history(self):
+        prior = seasonal_prior(kb.CROP_DATABASE['cotton'])
+        self.assertAlmostEqual(prior.mean(), 0.0)
+        self.assertTrue((prior[[9, 10, 11]] > 0).all())
+        
+        # No app context: the calendar alone, around the average price
+        forecast = PriceForecastService().forecast('cotton', [date(2026, 6, 15), date(2026, 11, 15)],
+                                                   average_price=6000, today=TODAY)
+        self.assertEqual(forecast['basis'], 'seasonal_prior')
+        self.assertLess(forecast['prices'][0], 6000)
+        self.assertGreater(forecast['prices'][1], 6000)
+        self.assertIsNone(PriceForecastService().forecast('cotton', [TODAY], today=TODAY))
+
+
+class TestPriceForecastService(unittest.TestCase):
+    
+    def setUp(self):
+        self.app = create_app('testing')
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.history = PriceHistoryService(lookback_days=400)
+        self.service = PriceForecastService(history_days=365)
+    
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+    
+    def test_fitted_model_is_cached_until_data_changes(self):
+        self.history.ingest(history('Onion', 'Pune', 60, 1500, 0.0))
+        
+        with patch.object(SeasonalModel, 'fit', wraps=SeasonalModel.fit) as fit:
+            first = self.service.model(TODAY)
+            self.assertIs(self.service.model(TODAY), first)
+            self.assertEqual(fit.call_count, 1)
+            
+            self.history.ingest(history('Wheat', 'Pune', 60, 2500, 0.0))
+            self.assertIsNot(self.service.model(TODAY), first)
+            self.assertEqual(fit.call_count, 2)
+        
+        # District, state and national series per commodity
+        self.assertEqual(len(self.service.model(TODAY)), 6)
+    
+    def test_forecast_district_batches_every_commodity(self):
+        self.history.ingest(history('Onion', 'Pune', 90, 1500, 0.004) + history('Wheat', 'Pune', 90, 2500, -0.002)
+                            + history('Cotton', 'Nagpur', 90, 6000, 0.0))
+        
+        forecasts = self.service.forecast_district('maharashtra', 'PUNE', today=TODAY)
+        
+        self.assertEqual([item['commodity'] for item in forecasts], ['onion', 'wheat'])
+        onion, wheat = forecasts
+        self.assertAlmostEqual(onion['current_price'], 1500 * math.exp(0.004 * 89), delta=40)
+        self.assertGreater(onion['forecasts']['1_month']['price'], onion['forecasts']['1_week']['price'])
+        self.assertLess(wheat['forecasts']['1_month']['change_percent'], 0)
+        self.assertEqual(wheat['crop'], 'wheat')
+        self.assertGreaterEqual(onion['forecasts']['1_week']['confidence'], onion['forecasts']['1_month']['confidence'])
+        self.assertEqual(self.service.forecast_district('Maharashtra', 'Satara', today=TODAY), [])
+    
+    def test_dal_quotes_stay_out_of_the_crop_series(self):
+        self.history.ingest(history('Arhar (Tur/Red Gram)(Whole)', 'Latur', 60, 7000, 0.0)
+                            + history('Arhar Dal(Tur Dal)', 'Latur', 60, 11000, 0.0))
+        
+        forecast = self.service.forecast('tur', [TODAY + timedelta(days=7)], state='Maharashtra',
+                                         district='Latur', today=TODAY)
+        self.assertAlmostEqual(forecast['prices'][0], 7000, delta=150)
+        
+        by_commodity = {item['commodity']: item for item in self.service.forecast_district('Maharashtra', 'Latur',
+                                                                                           today=TODAY)}
+        self.assertEqual(set(by_commodity), {'tur', 'tur dal'})
+        self.assertIsNone(by_commodity['tur dal']['crop'])
+    
+    def test_forecast_falls_back_to_wider_region(self):
+        self.history.ingest(history('Cotton', 'Nagpur', 90, 6000, 0.002))
+        targets = [TODAY + timedelta(days=7)]
+        
+        self.assertEqual(self.service.forecast('cotton', targets, state='Maharashtra', district='Nagpur',
+                                               today=TODAY)['basis'], 'district')
+        self.assertEqual(self.service.forecast('cotton', targets, state='Maharashtra', district='Akola',
+                                               today=TODAY)['basis'], 'state')
+        self.assertEqual(self.service.forecast('cotton', targets, today=TODAY)['basis'], 'national')
+        
+        # Stale history is not used
+        self.assertEqual(self.service.forecast('cotton', targets, average_price=6000,
+                                               today=TODAY + timedelta(days=60))['basis'], 'seasonal_prior')
+    
+    def test_agent_uses_stored_history(self):
+        self.history.ingest(history('Cotton', 'Nagpur', 90, 6000, 0.003, end=date.today()))
+        
+        result = PricePredictionAgent().execute('cotton', date.today().isoformat(),
+                                                state='Maharashtra', district='Nagpur')
+        
+        self.assertEqual(result['analysis_method'], 'seasonal_price_forecast')
+        self.assertIn('Forecast from district price history', result['market_insights'])
+        self.assertGreater(result['current_price_analysis']['current_price_per_quintal'], 7000)
+        predictions = result['price_predictions']
+        self.assertLessEqual(predictions['1_month']['confidence'], predictions['1_week']['confidence'])
+    
+    def test_price_forecast_route(self):
+        user = User(mobile_number='9000000023', name='Farmer')
+        user.set_password('secret')
+        db.session.add(user)
+        db.session.commit()
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+        self.history.ingest(history('Onion', 'Pune', 60, 1500, 0.0, end=date.today()))
+        
+        client = self.app.test_client()
+        response = client.get('/api/marketplace/price-forecast?state=Maharashtra&district=Pune', headers=headers)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['commodity'] for item in response.get_json()['forecasts']], ['onion'])
+        self.assertEqual(client.get('/api/marketplace/price-forecast', headers=headers).status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
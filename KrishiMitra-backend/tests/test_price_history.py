@@ -0,0 +1,131 @@
+import os
+import tempfile
+import unittest
+from datetime import date, timedelta
+from unittest.mock import patch
+from app import create_app, db
+from app.models import MarketPriceHistory, User
+from app.services.market_store import MarketStore
+from app.services.price_history import PriceHistoryService, ingest_latest_snapshot, price_history_service
+from flask_jwt_extended import create_access_token
+
+TODAY = date(2026, 10, 17)  # a Saturday
+
+
+def quote(day: date, price: float, market='Pune', commodity='Onion', variety='Red'):
+    return {'state': 'Maharashtra', 'district': 'Pune', 'market': market, 'commodity': commodity,
+            'variety': variety, 'arrival_date': day.strftime('%d/%m/%Y'),
+            'min_price': price - 100, 'max_price': price + 100, 'modal_price': price}
+
+
+class TestPriceHistory(unittest.TestCase):
+    
+    def setUp(self):
+        self.app = create_app('testing')
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.service = PriceHistoryService(lookback_days=7)
+    
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+    
+    def test_ingest_is_idempotent_and_deduplicated(self):
+        records = [quote(TODAY, 1800), quote(TODAY, 1850), quote(TODAY, 2000, market='Baramati'),
+                   quote(TODAY, 0, market='Junnar'), dict(quote(TODAY, 900), arrival_date='not a date')]
+        
+        self.assertEqual(self.service.ingest(records), 2)
+        self.assertEqual(self.service.ingest(records), 0)
+        
+        pune = MarketPriceHistory.query.filter_by(market='Pune').one()
+        self.assertEqual((pune.arrival_date, pune.modal_price), (TODAY, 1850))
+    
+    def test_ingest_stores_canonical_commodity_id(self):
+        self.service.ingest([quote(TODAY, 7000, commodity='Arhar (Tur/Red Gram)(Whole)'),
+                             quote(TODAY, 9000, commodity='Arhar Dal(Tur Dal)')])
+        
+        ids = dict(db.session.query(MarketPriceHistory.commodity, MarketPriceHistory.commodity_id))
+        self.assertEqual(ids, {'Arhar (Tur/Red Gram)(Whole)': 'tur', 'Arhar Dal(Tur Dal)': 'tur dal'})
+        self.assertEqual(self.service.recent_price('तूर', today=TODAY)['price'], 7000.0)
+        
+        # Rows keyed before an alias change are re-keyed once
+        MarketPriceHistory.query.filter_by(commodity='Arhar Dal(Tur Dal)').update({'commodity_id': 'tur'})
+        self.assertEqual(self.service.refresh_commodity_ids(), 1)
+        self.assertEqual(self.service.refresh_commodity_ids(), 0)
+        self.assertEqual(self.service.recent_price('tur', today=TODAY)['price'], 7000.0)
+    
+    def test_ingest_skips_quotes_before_lookback(self):
+        self.service.ingest([quote(TODAY, 1800)])
+        inserted = self.service.ingest([quote(TODAY - timedelta(days=3), 1700),
+                                        quote(TODAY - timedelta(days=30), 1500)])
+        
+        self.assertEqual(inserted, 1)
+        self.assertEqual(MarketPriceHistory.query.count(), 2)
+    
+    def test_weekly_and_monthly_ohlc(self):
+        # Mon 5 Oct .. Sat 17 Oct (two weeks and a bit); two markets average per day
+        days = [date(2026, 10, 5) + timedelta(days=i) for i in range(13)]
+        records = [quote(day, 1000 + 10 * i) for i, day in enumerate(days)]
+        records += [quote(day, 1200 + 10 * i, market='Baramati') for i, day in enumerate(days)]
+        self.service.ingest(records)
+        
+        weeks = self.service.ohlc('onion', period='week', days=30, today=TODAY)
+        self.assertEqual([w['period_start'] for w in weeks], ['2026-10-05', '2026-10-12'])
+        self.assertEqual((weeks[0]['open'], weeks[0]['close'], weeks[0]['high'], weeks[0]['low']),
+                         (1100.0, 1160.0, 1160.0, 1100.0))
+        self.assertEqual(weeks[1]['quotes'], 12)
+        
+        months = self.service.ohlc('onion', period='month', days=30, today=TODAY)
+        self.assertEqual(len(months), 1)
+        self.assertEqual((months[0]['open'], months[0]['close']), (1100.0, 1220.0))
+    
+    def test_rolling_statistics(self):
+        days = [TODAY - timedelta(days=4 - i) for i in range(5)]
+        self.service.ingest([quote(day, price) for day, price in zip(days, [100, 200, 300, 400, 500])])
+        
+        rolling = self.service.rolling('Onion', window=3, days=30, today=TODAY)
+        self.assertEqual([r['rolling_mean'] for r in rolling], [200.0, 300.0, 400.0])
+        self.assertEqual(rolling[-1]['change_percent'], 66.7)
+        self.assertEqual((rolling[-1]['rolling_min'], rolling[-1]['rolling_max']), (300.0, 500.0))
+    
+    def test_recent_price_filters_by_region(self):
+        self.service.ingest([quote(TODAY, 1800), dict(quote(TODAY, 2400, market='Indore'), state='Madhya Pradesh')])
+        
+        self.assertEqual(self.service.recent_price('onion', state='maharashtra', today=TODAY)['price'], 1800.0)
+        self.assertIsNone(self.service.recent_price('cotton', today=TODAY))
+    
+    def test_scheduled_ingest_runs_once_per_snapshot(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        store = MarketStore([dict(quote(TODAY, 1800))])
+        
+        with patch('app.services.data_gov_service.data_gov_service.current_snapshot', return_value=(1234.5, store)), \
+                patch('app.services.data_gov_service.data_gov_service.snapshot_path',
+                      os.path.join(tmpdir.name, 'snapshot.json')), \
+                patch.object(price_history_service, 'ingest', return_value=1) as ingest:
+            ingest_latest_snapshot(self.app)
+            ingest_latest_snapshot(self.app)
+        
+        self.assertEqual(ingest.call_count, 1)
+    
+    def test_price_history_route(self):
+        user = User(mobile_number='9000000022', name='Farmer')
+        user.set_password('secret')
+        db.session.add(user)
+        db.session.commit()
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+        price_history_service.ingest([quote(date.today() - timedelta(days=i), 1000 + i) for i in range(10)])
+        
+        client = self.app.test_client()
+        response = client.get('/api/marketplace/price-history?commodity=onion&period=week&window=3', headers=headers)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.get_json()['ohlc'])
+        self.assertEqual(len(response.get_json()['rolling']), 8)
+        self.assertEqual(client.get('/api/marketplace/price-history', headers=headers).status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import json
+import unittest
+from unittest.mock import patch
+from app.services import summarization_service as module
+from app.services.llm_gateway import estimate_tokens
+from app.services.prompt_budget import agent_payload, comprehensive_payload, fit_to_budget
+from app.services.summarization_service import summarization_service
+from app.utils.cache import TTLCache
+
+IRRIGATION = {
+    'next_irrigation': {'date': '2026-10-27', 'water_amount_mm': 50, 'reason': 'Soil moisture at 35%'},
+    'should_irrigate_now': True,
+    'next_7_days_schedule': [{'date': f'2026-10-{d}', 'irrigate': d == 17, 'water_mm': 50 if d == 17 else 0,
+                              'notes': 'No irrigation needed'} for d in range(17, 24)],
+    'water_saving_tips': ['Use drip irrigation - 90% efficient', 'Mulch around plants to retain moisture'],
+    'analysis_method': 'rule_based_knowledge_base'
+}
+
+MARKETS = {
+    'recommendation': {'recommended_market': 'Pune APMC', 'expected_price': 2321},
+    'top_markets': [{'market_name': 'Pune APMC', 'net_price': 2321}],
+    'best_practices': ['Clean and grade produce'] * 5,
+    'alternative_selling_options': [{'option': 'eNAM', 'benefits': 'Online trading'}] * 3,
+    'analysis_method': 'rule_based_knowledge_base'
+}
+
+RESULTS = {
+    'crop_name': 'cotton',
+    'analysis_timestamp': '2026-10-17T06:00:00',
+    'agents_executed': ['irrigation', 'market_analysis'],
+    'agent_timings': {'irrigation': {'status': 'success', 'duration_ms': 3.1}},
+    'irrigation': IRRIGATION,
+    'market_analysis': MARKETS
+}
+
+
+class TestPromptBudget(unittest.TestCase):
+    
+    def test_comprehensive_drops_boilerplate_and_bookkeeping(self):
+        payload = json.loads(comprehensive_payload(RESULTS))
+        
+        self.assertEqual(set(payload), {'irrigation', 'market_analysis'})
+        self.assertNotIn('water_saving_tips', payload['irrigation'])
+        self.assertNotIn('best_practices', payload['market_analysis'])
+        self.assertNotIn('alternative_selling_options', payload['market_analysis'])
+        self.assertNotIn('notes', payload['irrigation']['next_7_days_schedule'][0])
+        self.assertEqual(len(payload['irrigation']['next_7_days_schedule']), 5)
+    
+    def test_single_agent_keeps_tips_its_prompt_asks_for(self):
+        payload = json.loads(agent_payload('irrigation', IRRIGATION))
+        self.assertIn('water_saving_tips', payload)
+        self.assertNotIn('analysis_method', payload)
+    
+    def test_budget_shortens_lists_then_drops_low_priority_fields(self):
+        text = fit_to_budget(IRRIGATION, max_tokens=60)
+        payload = json.loads(text)
+        
+        self.assertLessEqual(estimate_tokens(text), 60)
+        self.assertIn('next_irrigation', payload)
+        self.assertNotIn('analysis_method', payload)
+    
+    def test_sectioned_budget_keeps_every_section(self):
+        payload = json.loads(comprehensive_payload(RESULTS, max_tokens=40))
+        self.assertEqual(set(payload), {'irrigation', 'market_analysis'})
+    
+    def test_comprehensive_prompt_is_compact(self):
+        cache = TTLCache(max_entries=10, default_ttl=60)
+        with patch.object(module, '_summary_cache', cache), \
+                patch.object(module.gemini_service, 'generate_text_response', return_value='ok') as generate:
+            summarization_service.summarize_comprehensive_analysis(RESULTS, 'cotton', {'location': 'Pune'})
+        
+        prompt = generate.call_args[0][0]
+        self.assertNotIn('best_practices', prompt)
+        self.assertNotIn('\n  "', prompt)
+        self.assertIn(comprehensive_payload(RESULTS), prompt)
+        self.assertLess(len(comprehensive_payload(RESULTS)), len(json.dumps(RESULTS, indent=2)) / 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from datetime import date, timedelta
+from app import create_app, db
+from app.models import User, Crop
+from app.services.daily_sweep import write_stages
+from app.services.stage_manager import stage_manager
+
+
+class TestBulkStages(unittest.TestCase):
+    
+    def test_matches_scalar_calculation(self):
+        today = date.today()
+        crops = ['cotton', 'rice', 'sugarcane', 'soybean', 'sunflower']
+        offsets = [-5, 0, 1, 17, 18, 54, 90, 104, 105, 119, 120, 121, 359, 360, 400]
+        names = [crop for crop in crops for _ in offsets]
+        sown = [today - timedelta(days=offset) for _ in crops for offset in offsets]
+        
+        bulk = stage_manager.calculate_stages(names, sown, today=today)
+        
+        for index, (name, sowing_date) in enumerate(zip(names, sown)):
+            scalar = stage_manager.calculate_current_stage(name, sowing_date)
+            self.assertEqual(bulk['stage'][index], scalar['stage'], (name, sowing_date))
+            self.assertEqual(bulk['das'][index], scalar['das'])
+            if 'progress_percent' in scalar:
+                self.assertEqual(bulk['progress_percent'][index], scalar['progress_percent'])
+                self.assertEqual(bulk['days_remaining'][index], scalar['days_remaining'])
+    
+    def test_missing_sowing_date_is_unknown(self):
+        result = stage_manager.calculate_stages(['cotton', 'cotton'], [None, date.today()])
+        self.assertEqual(list(result['stage']), ['Unknown', 'Germination/Seedling'])
+    
+    def test_empty_input(self):
+        self.assertEqual(len(stage_manager.calculate_stages([], [])['stage']), 0)
+
+
+class TestWriteStages(unittest.TestCase):
+    
+    def setUp(self):
+        self.app = create_app('testing')
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        
+        user = User(mobile_number='9999999999', name='Test Farmer')
+        user.set_password('secret')
+        db.session.add(user)
+        db.session.flush()
+        self.crop_ids = []
+        for name in ['cotton', 'rice', 'wheat']:
+            crop = Crop(user_id=user.id, crop_name=name, land_area=1, sowing_date=date.today(),
+                        current_stage='Planned')
+            db.session.add(crop)
+            db.session.flush()
+            self.crop_ids.append(crop.id)
+        db.session.commit()
+    
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+    
+    def test_single_case_update(self):
+        write_stages({self.crop_ids[0]: 'Vegetative Growth', self.crop_ids[2]: 'Harvest Ready'}, chunk_size=2)
+        db.session.commit()
+        db.session.expire_all()
+        
+        stages = {crop.id: crop.current_stage for crop in Crop.query.all()}
+        self.assertEqual(stages, {
+            self.crop_ids[0]: 'Vegetative Growth',
+            self.crop_ids[1]: 'Planned',
+            self.crop_ids[2]: 'Harvest Ready'
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import random
+import unittest
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models import User
+from app.knowledge.crop_knowledge_base import (CROP_DATABASE, is_npk_in_range, is_season_suitable,
+                                               match_crop_to_soil)
+from app.knowledge.suitability_matrix import suitability_matrix
+
+
+def reference_match(soil_npk, month):
+    """The per-crop scoring loop match_crop_to_soil used before compilation"""
+    results = []
+    for crop_name, crop_data in CROP_DATABASE.items():
+        npk_req = crop_data["soil_requirements"]["npk_requirements"]
+        npk_score = sum(is_npk_in_range(soil_npk.get(n, 0), npk_req[n])
+                        for n in ('nitrogen', 'phosphorus', 'potassium')) / 3 * 40
+        season_match = is_season_suitable(crop_data["seasons"], month)
+        calendar = crop_data["market_calendar"]
+        avg_price = calendar.get("avg_price_per_quintal", calendar.get("avg_price_per_ton", 0))
+        market_score = min(30, (avg_price / 10000) * 30)
+        
+        reasons = []
+        if npk_score > 30:
+            reasons.append(f"Good NPK match (Score: {npk_score:.0f}/40)")
+        if season_match:
+            reasons.append("Suitable season for planting")
+        if market_score > 20:
+            reasons.append(f"Good market price (₹{avg_price})")
+        
+        results.append({
+            "crop_name": crop_name,
+            "marathi_name": crop_data["marathi_name"],
+            "suitability_score": round(npk_score + (30 if season_match else 10) + market_score, 1),
+            "reasons": reasons,
+            "expected_yield": crop_data["expected_yield"],
+            "duration_months": crop_data["duration_months"],
+            "avg_price": avg_price
+        })
+    results.sort(key=lambda x: x["suitability_score"], reverse=True)
+    return results
+
+
+class TestSuitabilityMatrix(unittest.TestCase):
+    
+    def test_matches_per_crop_scoring(self):
+        rng = random.Random(7)
+        for _ in range(500):
+            soil = {'nitrogen': rng.uniform(0, 400), 'phosphorus': rng.randint(0, 80),
+                    'potassium': rng.uniform(0, 400)}
+            month = rng.randint(1, 12)
+            self.assertEqual(match_crop_to_soil(soil, month), reference_match(soil, month))
+    
+    def test_batch_equals_individual(self):
+        samples = [{'nitrogen': 250, 'phosphorus': 20, 'potassium': 150}, {'nitrogen': 80}, {}]
+        months = [6, 11, 3]
+        batch = suitability_matrix.rank(samples, months, top_k=3)
+        
+        for sample, month, ranking in zip(samples, months, batch):
+            self.assertEqual(ranking, match_crop_to_soil(sample, month)[:3])
+    
+    def test_season_bitmask(self):
+        suitability_matrix.score([{}], [1])  # Compiles on first use
+        index = suitability_matrix.crop_names.index('sugarcane')
+        for month in range(1, 13):
+            self.assertEqual(bool(suitability_matrix.season_mask[index] >> (month - 1) & 1),
+                             is_season_suitable(CROP_DATABASE['sugarcane']['seasons'], month))
+
+
+class TestBatchAutoPlan(unittest.TestCase):
+    
+    def setUp(self):
+        self.app = create_app('testing')
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        
+        user = User(mobile_number='9999999999', name='Test Farmer')
+        user.set_password('secret')
+        db.session.add(user)
+        db.session.commit()
+        
+        self.client = self.app.test_client()
+        self.headers = {'Authorization': f"Bearer {create_access_token(identity=str(user.id))}"}
+    
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+    
+    def test_scores_every_plot(self):
+        plots = [{'plot_id': f'P{i}', 'soil_data': {'nitrogen': 100 + i, 'phosphorus': 20, 'potassium': 150}}
+                 for i in range(200)]
+        response = self.client.post('/api/crops/auto-plan/batch', headers=self.headers,
+                                    json={'plots': plots, 'month': 6, 'top_k': 3})
+        
+        self.assertEqual(response.status_code, 200)
+        results = response.get_json()['results']
+        self.assertEqual(len(results), 200)
+        self.assertEqual(results[0]['plot_id'], 'P0')
+        self.assertEqual([crop['crop_name'] for crop in results[5]['recommendations']],
+                         [crop['crop_name'] for crop in match_crop_to_soil(plots[5]['soil_data'], 6)[:3]])
+    
+    def test_rejects_bad_input(self):
+        response = self.client.post('/api/crops/auto-plan/batch', headers=self.headers, json={'plots': []})
+        self.assertEqual(response.status_code, 400)
+        
+        response = self.client.post('/api/crops/auto-plan/batch', headers=self.headers,
+                                    json={'plots': [{'soil_data': {'nitrogen': 'high'}}]})
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from app.services import summarization_service as module
+from app.services.summarization_service import summarization_service, summary_cache_key
+from app.utils.cache import DiskCache
+
+AGENT_OUTPUT = {
+    'crop_name': 'cotton',
+    'analysis_timestamp': '2026-10-01T10:00:00',
+    'fertilization': {'total_cost': 4200, 'schedule': [{'stage': 'sowing', 'urea_kg': 50}]},
+    'agent_timings': {'fertilization': {'status': 'success', 'duration_ms': 12.5}}
+}
+
+
+class TestSummaryCache(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.cache = DiskCache(os.path.join(self.tmpdir.name, 'summaries.sqlite3'), max_entries=2, default_ttl=60)
+        patcher = patch.object(module, '_summary_cache', self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def test_key_ignores_timestamps_and_timings(self):
+        rerun = dict(AGENT_OUTPUT, analysis_timestamp='2026-10-02T08:30:00',
+                     agent_timings={'fertilization': {'status': 'success', 'duration_ms': 40.1}})
+        
+        self.assertEqual(summary_cache_key('comprehensive_analysis', AGENT_OUTPUT, 'cotton'),
+                         summary_cache_key('comprehensive_analysis', rerun, 'cotton'))
+        self.assertNotEqual(summary_cache_key('comprehensive_analysis', AGENT_OUTPUT, 'cotton'),
+                            summary_cache_key('comprehensive_analysis', AGENT_OUTPUT, 'rice'))
+    
+    def test_repeated_summary_skips_gemini(self):
+        with patch.object(module.gemini_service, 'generate_text_response', create=True,
+                          return_value='Apply 50 kg urea at sowing.') as generate:
+            first = summarization_service.summarize_fertilization(AGENT_OUTPUT, 'cotton')
+            second = summarization_service.summarize_fertilization(dict(AGENT_OUTPUT), 'cotton')
+        
+        self.assertEqual(first, second)
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+    
+    def test_failures_are_not_cached(self):
+        with patch.object(module.gemini_service, 'generate_text_response', create=True,
+                          side_effect=[ValueError('quota'), 'Irrigate tomorrow.']) as generate:
+            with self.assertRaises(ValueError):
+                summarization_service.summarize_irrigation(AGENT_OUTPUT, 'cotton')
+            summary = summarization_service.summarize_irrigation(AGENT_OUTPUT, 'cotton')
+        
+        self.assertEqual(summary, 'Irrigate tomorrow.')
+        self.assertEqual(generate.call_count, 2)
+    
+    def test_disk_cache_evicts_least_recently_used(self):
+        self.cache.set('a', 'A')
+        self.cache.set('b', 'B')
+        self.cache.get('a')
+        self.cache.set('c', 'C')
+        
+        self.assertEqual(self.cache.get('a'), 'A')
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from unittest.mock import patch
+from app.agents.disease_agent import DiseaseDetectionAgent
+from app.knowledge.symptom_index import SymptomIndex, tokenize
+
+
+class TestSymptomIndex(unittest.TestCase):
+    
+    def setUp(self):
+        self.index = SymptomIndex()
+        self.index.build({
+            'cotton': {'common_diseases': {
+                'bacterial_blight': {'symptoms': ['water-soaked lesions', 'angular leaf spots', 'yellowing']},
+                'pink_bollworm': {'symptoms': ['pink caterpillars in bolls', 'rosette flowers', 'boll damage']}
+            }},
+            'rice': {'common_diseases': {
+                'blast': {'symptoms': ['diamond-shaped lesions', 'leaf spots', 'neck blast']}
+            }}
+        })
+    
+    def test_tokenize_drops_stop_words_and_stems(self):
+        self.assertEqual(tokenize('Spots on the leaves'), ['spot', 'leaf'])
+    
+    def test_stop_words_do_not_match(self):
+        # The old substring scan matched 'in' from 'pink caterpillars in bolls'
+        self.assertEqual(self.index.match('cotton', 'wilting in the field'), [])
+    
+    def test_ranks_best_disease_first(self):
+        matches = self.index.match('cotton', 'Angular spots on leaves, yellowing and lesions')
+        
+        self.assertEqual(matches[0]['disease_key'], 'bacterial_blight')
+        self.assertEqual(matches[0]['matches'], 3)
+        self.assertEqual(matches[0]['confidence'], 100)
+    
+    def test_matches_are_scoped_to_crop(self):
+        matches = self.index.match('rice', 'leaf spots')
+        
+        self.assertEqual([m['disease_key'] for m in matches], ['blast'])
+    
+    def test_new_crop_is_indexed_on_first_lookup(self):
+        crop_data = {'common_diseases': {'rust': {'symptoms': ['orange pustules', 'leaf drop']}}}
+        matches = self.index.match('Dragonfruit', 'orange pustules seen', crop_data)
+        
+        self.assertEqual(matches[0]['disease_key'], 'rust')
+        self.assertEqual(matches[0]['confidence'], 50)
+    
+    def test_agent_indexes_aliases_under_the_crop_id(self):
+        with patch('app.agents.disease_agent.symptom_index', self.index):
+            for name in ('rice', 'Paddy', 'तांदूळ', 'RICE '):
+                diagnosis = DiseaseDetectionAgent().execute(name, 'diamond shaped lesions on leaves')
+                self.assertEqual(diagnosis['disease_name'], 'Blast', name)
+        
+        self.assertEqual(self.index._crops, {'cotton', 'rice'})
+
+
+if __name__ == '__main__':
+    unittest.main()
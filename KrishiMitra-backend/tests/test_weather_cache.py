@@ -0,0 +1,62 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from app.services.weather_service import WeatherService
+from app.utils.cache import TTLCache
+
+
+def fake_response(payload):
+    response = MagicMock()
+    response.json.return_value = payload
+    response.raise_for_status.return_value = None
+    return response
+
+
+class TestWeatherCache(unittest.TestCase):
+    
+    def setUp(self):
+        self.service = WeatherService()
+        self.service.cache = TTLCache(max_entries=100, default_ttl=60)
+    
+    def test_nearby_farms_share_one_fetch(self):
+        forecast = {'list': [{'dt': i} for i in range(40)], 'cnt': 40}
+        
+        with patch('app.services.weather_service.http_client.get',
+                   return_value=fake_response(forecast)) as mock_get:
+            # Two farms ~1km apart in the same 5km cell
+            first = self.service.get_forecast(19.8801, 75.3401, days=3)
+            second = self.service.get_forecast(19.8850, 75.3450, days=1)
+        
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(len(first['list']), 24)
+        self.assertEqual(len(second['list']), 8)
+        self.assertEqual(self.service.cache.stats()['hits'], 1)
+    
+    def test_distant_farms_fetch_separately(self):
+        with patch('app.services.weather_service.http_client.get',
+                   return_value=fake_response({'main': {'temp': 30}})) as mock_get:
+            self.service.get_current_weather(19.88, 75.34)  # Aurangabad
+            self.service.get_current_weather(18.52, 73.86)  # Pune
+        
+        self.assertEqual(mock_get.call_count, 2)
+    
+    def test_lru_eviction(self):
+        cache = TTLCache(max_entries=2, default_ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+    
+    def test_expired_entries_are_misses(self):
+        cache = TTLCache(max_entries=10, default_ttl=60)
+        cache.set('current', {'temp': 30}, ttl=-1)
+        
+        self.assertIsNone(cache.get('current'))
+        self.assertEqual(cache.stats()['misses'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
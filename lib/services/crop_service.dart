@@ -104,9 +104,10 @@ class CropService {
         }),
       ).timeout(Duration(seconds: AppConstants.requestTimeout));
       
-      if (response.statusCode == 200 || response.statusCode == 201) {
+      // 202: crop saved, agents still running in the background (poll job_id)
+      if (response.statusCode == 200 || response.statusCode == 201 || response.statusCode == 202) {
         final data = jsonDecode(response.body);
-        return {'success': true, 'crop': CropModel.fromJson(data['crop'])};
+        return {'success': true, 'crop': CropModel.fromJson(data['crop']), 'jobId': data['job_id']};
       } else {
         final error = jsonDecode(response.body);
         return {'success': false, 'error': error['message'] ?? 'Failed to add crop'};